@@ -0,0 +1,53 @@
+"""
+Measures the throughput of the line protocol parser, on plain lines
+(fast path) and on lines with strings and escaped characters.
+
+    PYTHONPATH=. python benchmarks/bench_line_protocol_parser.py
+"""
+import timeit
+from influxable.parser import parse_columns, parse_dataframe
+
+NB_LINES = 200000
+NB_REPEATS = 3
+
+PLAIN_DATA = ''.join(
+    'cpu,host=server{},region=eu value={},count={}i {}\n'.format(
+        i % 100,
+        i / 7,
+        i,
+        1568970572000000000 + i,
+    )
+    for i in range(NB_LINES)
+).encode('utf-8')
+
+ESCAPED_DATA = ''.join(
+    'my\\ cpu,host=server\\ {} state="ok \\"{}\\"",value={} {}\n'.format(
+        i % 100,
+        i,
+        i / 7,
+        1568970572000000000 + i,
+    )
+    for i in range(NB_LINES)
+).encode('utf-8')
+
+
+def main():
+    for name, data in [('plain', PLAIN_DATA), ('escaped', ESCAPED_DATA)]:
+        for parse in [parse_columns, parse_dataframe]:
+            duration = min(timeit.repeat(
+                lambda: parse(data),
+                number=1,
+                repeat=NB_REPEATS,
+            ))
+            print('{:<8} {:<16} {:>8.3f}s {:>8.1f} MB/s {:>10.0f} lines/s'
+                  .format(
+                      name,
+                      parse.__name__,
+                      duration,
+                      len(data) / duration / 1e6,
+                      NB_LINES / duration,
+                  ))
+
+
+if __name__ == '__main__':
+    main()
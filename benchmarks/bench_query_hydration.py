@@ -0,0 +1,81 @@
+"""
+Compares the hydration of the rows of a query response into measurement
+points with the constructor and with Measurement._from_db().
+
+    PYTHONPATH=. python benchmarks/bench_query_hydration.py
+"""
+import timeit
+from influxable import attributes
+from influxable.measurement import Measurement
+from influxable.response import InfluxDBResponse
+from influxable.serializers import MeasurementPointSerializer
+
+NB_POINTS = 100000
+NB_REPEATS = 3
+
+
+class BenchmarkMeasurement(Measurement):
+    measurement_name = 'benchmark'
+
+    time = attributes.TimestampFieldAttribute(precision='s')
+    host = attributes.TagFieldAttribute()
+    phase = attributes.StringFieldAttribute(choices=['moon', 'sun'])
+    value = attributes.IntegerFieldAttribute(min_value=0, max_value=10000)
+    ratio = attributes.FloatFieldAttribute()
+
+
+COLUMNS = ['time', 'host', 'phase', 'value', 'ratio']
+
+VALUES = [
+    [
+        (1568970572 + i) * 10 ** 9,
+        'server{}'.format(i % 10),
+        'moon' if i % 2 else 'sun',
+        i % 10000,
+        i / 7,
+    ]
+    for i in range(NB_POINTS)
+]
+
+RESPONSE = InfluxDBResponse({'results': [{
+    'statement_id': 0,
+    'series': [{
+        'name': 'benchmark',
+        'columns': COLUMNS,
+        'values': VALUES,
+    }],
+}]})
+
+
+def hydrate_with_constructor():
+    points = []
+    for values in VALUES:
+        row = dict(zip(COLUMNS, values))
+        row['time'] /= 10 ** 9
+        points.append(BenchmarkMeasurement(**row))
+    return points
+
+
+def hydrate_with_serializer():
+    return MeasurementPointSerializer(RESPONSE, BenchmarkMeasurement).convert()
+
+
+def main():
+    results = {}
+    for name, func in [
+        ('constructor', hydrate_with_constructor),
+        ('_from_db', hydrate_with_serializer),
+    ]:
+        duration = min(timeit.repeat(func, number=1, repeat=NB_REPEATS))
+        results[name] = duration
+        print('{:<12} {:>8.3f}s {:>10.0f} points/s'.format(
+            name,
+            duration,
+            NB_POINTS / duration,
+        ))
+    speedup = results['constructor'] / results['_from_db']
+    print('speedup: {:.2f}x'.format(speedup))
+
+
+if __name__ == '__main__':
+    main()
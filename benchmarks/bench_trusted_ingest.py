@@ -0,0 +1,71 @@
+"""
+Compares the encoding of points into line protocol, and the creation of
+points from a DataFrame, with and without the trusted mode (no
+validation).
+
+    PYTHONPATH=. python benchmarks/bench_trusted_ingest.py
+"""
+import timeit
+import pandas as pd
+from influxable import attributes
+from influxable.measurement import Measurement
+
+NB_POINTS = 20000
+NB_REPEATS = 3
+
+
+class BenchmarkMeasurement(Measurement):
+    measurement_name = 'benchmark'
+
+    time = attributes.TimestampFieldAttribute(precision='s')
+    host = attributes.TagFieldAttribute()
+    phase = attributes.StringFieldAttribute(choices=['moon', 'sun'])
+    value = attributes.IntegerFieldAttribute(min_value=0, max_value=10000)
+    ratio = attributes.FloatFieldAttribute()
+
+
+RECORDS = [
+    {
+        'time': 1568970572 + i,
+        'host': 'server{}'.format(i % 10),
+        'phase': 'moon' if i % 2 else 'sun',
+        'value': i % 10000,
+        'ratio': i / 7,
+    }
+    for i in range(NB_POINTS)
+]
+
+
+DATAFRAME = pd.DataFrame(RECORDS)
+
+
+def encode(trusted):
+    points = [BenchmarkMeasurement(trusted=trusted, **r) for r in RECORDS]
+    return BenchmarkMeasurement.encode_points(points)
+
+
+def from_dataframe(trusted):
+    return BenchmarkMeasurement.from_dataframe(DATAFRAME, trusted=trusted)
+
+
+def main():
+    for name, func in [('encode', encode), ('from_dataframe', from_dataframe)]:
+        results = {}
+        for trusted in [False, True]:
+            duration = min(timeit.repeat(
+                lambda: func(trusted),
+                number=1,
+                repeat=NB_REPEATS,
+            ))
+            results[trusted] = duration
+            print('{:<15} trusted={:<5} {:>8.3f}s {:>10.0f} points/s'.format(
+                name,
+                str(trusted),
+                duration,
+                NB_POINTS / duration,
+            ))
+        print('speedup: {:.2f}x'.format(results[False] / results[True]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import socket
+import threading
+import requests
+from urllib.parse import quote, unquote, urlparse
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+UNIX_SOCKET_PREFIX = 'unix://'
+UNIX_SOCKET_SCHEME = 'http+unix'
+
+
+def is_unix_socket_url(url):
+    return isinstance(url, str) and url.startswith(UNIX_SOCKET_PREFIX)
+
+
+def get_unix_socket_url(base_url, url):
+    socket_path = base_url[len(UNIX_SOCKET_PREFIX):]
+    return '{}://{}{}'.format(
+        UNIX_SOCKET_SCHEME,
+        quote(socket_path, safe=''),
+        url,
+    )
+
+
+class UnixSocketConnection(HTTPConnection):
+    def __init__(self, socket_path, **kwargs):
+        super(UnixSocketConnection, self).__init__('localhost', **kwargs)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is None or isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class UnixSocketConnectionPool(HTTPConnectionPool):
+    def __init__(self, socket_path, **kwargs):
+        super(UnixSocketConnectionPool, self).__init__('localhost', **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self):
+        return UnixSocketConnection(
+            self.socket_path,
+            timeout=self.timeout.connect_timeout,
+        )
+
+
+class UnixSocketAdapter(requests.adapters.HTTPAdapter):
+    """
+    Transport adapter sending the requests of the `http+unix` scheme
+    through the Unix domain socket encoded in the host of the url.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        super(UnixSocketAdapter, self).__init__(*args, **kwargs)
+
+    def get_connection_with_tls_context(self, request, *args, **kwargs):
+        return self.get_connection(request.url)
+
+    def get_connection(self, url, proxies=None):
+        socket_path = unquote(urlparse(url).netloc)
+        with self._pools_lock:
+            if socket_path not in self._pools:
+                self._pools[socket_path] = UnixSocketConnectionPool(
+                    socket_path,
+                    maxsize=self._pool_maxsize,
+                )
+            return self._pools[socket_path]
+
+    def request_url(self, request, proxies):
+        return request.path_url
+
+    def close(self):
+        super(UnixSocketAdapter, self).close()
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
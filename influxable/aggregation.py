@@ -0,0 +1,340 @@
+import arrow
+import copy
+import math
+import random
+import threading
+import time
+from decimal import Decimal as D
+from . import Influxable
+from .attributes import DateTimeFieldAttribute, IntegerFieldAttribute
+from .exceptions import InfluxDBAttributeValueError
+
+DEFAULT_AGGREGATION_INTERVAL = 1
+DEFAULT_AGGREGATION_GRACE_PERIOD = 0
+DEFAULT_SKETCH_SIZE = 1024
+
+
+class Aggregation:
+    COUNT = 'count'
+    SUM = 'sum'
+    MIN = 'min'
+    MAX = 'max'
+    LAST = 'last'
+
+
+AGGREGATION_VALUES = [
+    Aggregation.COUNT,
+    Aggregation.SUM,
+    Aggregation.MIN,
+    Aggregation.MAX,
+    Aggregation.LAST,
+]
+
+
+class QuantileSketch:
+    """
+    Uniform reservoir sample of at most `size` values, the quantiles are
+    exact until `size` values have been added and estimated afterwards.
+    """
+
+    def __init__(self, size=DEFAULT_SKETCH_SIZE):
+        self.size = size
+        self.nb_values = 0
+        self.values = []
+
+    def add(self, value):
+        self.nb_values += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+            return
+        index = random.randrange(self.nb_values)
+        if index < self.size:
+            self.values[index] = value
+
+    def quantile(self, q):
+        values = sorted(self.values)
+        index = math.ceil(q * len(values)) - 1
+        return values[max(0, index)]
+
+
+class FieldAggregate:
+    def __init__(self, sketch_size=None):
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+        self.last = None
+        self.sketch = None
+        if sketch_size:
+            self.sketch = QuantileSketch(sketch_size)
+
+    def add(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.last = value
+        if self.sketch is not None:
+            self.sketch.add(value)
+
+
+class AggregatingWriter:
+    """
+    Aggregates the points of a measurement in memory and writes a single
+    point per series (tag set) and per `interval` seconds.
+
+    Every numeric field `<name>` is written as `<name>_count`,
+    `<name>_sum`, `<name>_min`, `<name>_max`, `<name>_last` and one
+    `<name>_p<q>` field per requested quantile. The other fields only
+    keep their last value. The point of an interval is written once the
+    interval is over plus `grace_period` seconds, at the timestamp of its
+    start. A sample of an interval which was already written is dropped
+    and counted, it would overwrite the point of the interval otherwise.
+    An interval written by a forced flush before it is over keeps its
+    aggregates instead, and is written again with its later samples.
+    """
+
+    def __init__(
+        self,
+        measurement_class,
+        interval=DEFAULT_AGGREGATION_INTERVAL,
+        grace_period=DEFAULT_AGGREGATION_GRACE_PERIOD,
+        aggregations=AGGREGATION_VALUES,
+        quantiles=None,
+        sketch_size=DEFAULT_SKETCH_SIZE,
+        **write_options
+    ):
+        if not interval or interval <= 0:
+            msg = 'interval must be a positive number of seconds'
+            raise InfluxDBAttributeValueError(msg)
+        if grace_period is None or grace_period < 0:
+            msg = 'grace_period must be a number of seconds'
+            raise InfluxDBAttributeValueError(msg)
+        for aggregation in aggregations:
+            if aggregation not in AGGREGATION_VALUES:
+                msg = 'aggregation `{}` must be one of value of {}'.format(
+                    aggregation,
+                    AGGREGATION_VALUES,
+                )
+                raise InfluxDBAttributeValueError(msg)
+        quantiles = list(quantiles or [])
+        for q in quantiles:
+            if not 0 < q < 1:
+                msg = 'quantiles must be between 0 and 1'
+                raise InfluxDBAttributeValueError(msg)
+
+        self.measurement_class = measurement_class
+        self.interval = interval
+        self.grace_period = grace_period
+        self.aggregations = list(aggregations)
+        self.quantiles = quantiles
+        self.sketch_size = sketch_size if quantiles else None
+        self.write_options = write_options
+
+        schema = measurement_class._schema
+        self.tag_attributes = list(schema.tags)
+        self.field_attributes = list(schema.fields)
+        self.timestamp_attribute = None
+        if schema.timestamps:
+            self.timestamp_attribute = schema.timestamps[0]
+
+        self.buckets = {}
+        # The intervals before this one have been written
+        self.closed_bucket = None
+        # The aggregates of the intervals written by a forced flush
+        # before they are over
+        self.flushed_buckets = {}
+        self.nb_samples = 0
+        self.nb_late_samples = 0
+        self.nb_points_written = 0
+        self._next_flush = time.monotonic() + interval
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_values(self, point):
+        from .measurement import Measurement
+        if isinstance(point, Measurement):
+            return {
+                attr.attribute_name: attr.raw_value
+                for attr in point.get_attributes()
+            }
+        if isinstance(point, dict):
+            return point
+        msg = 'type of point must be Measurement or dict'
+        raise InfluxDBAttributeValueError(msg)
+
+    def get_timestamp(self, values):
+        attr = self.timestamp_attribute
+        value = values.get(attr.attribute_name) if attr else None
+        if value is None:
+            return D(str(time.time()))
+        if isinstance(attr, DateTimeFieldAttribute):
+            value = attr.to_python(value)
+            return D(str(arrow.get(value).timestamp()))
+        return attr.convert_to_nanoseconds(value) / D(10 ** 9)
+
+    def get_series_key(self, values):
+        return tuple(
+            values.get(attr.attribute_name)
+            for attr in self.tag_attributes
+        )
+
+    def add(self, point):
+        values = self.get_values(point)
+        bucket = int(self.get_timestamp(values) // D(str(self.interval)))
+        series_key = self.get_series_key(values)
+        field_values = [
+            (attr, self.clean_field_value(attr, values[attr.attribute_name]))
+            for attr in self.field_attributes
+            if values.get(attr.attribute_name) is not None
+        ]
+        with self._lock:
+            if self.closed_bucket is not None and bucket < self.closed_bucket:
+                self.nb_late_samples += 1
+                return
+            key = (bucket, series_key)
+            field_aggregates = self.buckets.get(key)
+            if field_aggregates is None:
+                # The point written by a forced flush is overwritten by
+                # a point with all the samples of the interval
+                flushed_aggregates = self.flushed_buckets.pop(key, {})
+                field_aggregates = copy.deepcopy(flushed_aggregates)
+                self.buckets[key] = field_aggregates
+            for attr, value in field_values:
+                self._add_field_value(field_aggregates, attr, value)
+            self.nb_samples += 1
+        if time.monotonic() >= self._next_flush:
+            self.flush()
+
+    @staticmethod
+    def clean_field_value(attr, value):
+        if not isinstance(attr, IntegerFieldAttribute):
+            return value
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            msg = '<\'{}\'> : {} is not a number'.format(
+                attr.attribute_name,
+                value,
+            )
+            raise InfluxDBAttributeValueError(msg)
+
+    def _add_field_value(self, field_aggregates, attr, value):
+        attr_name = attr.attribute_name
+        if not isinstance(attr, IntegerFieldAttribute):
+            field_aggregates[attr_name] = value
+            return
+        aggregate = field_aggregates.get(attr_name)
+        if aggregate is None:
+            aggregate = FieldAggregate(self.sketch_size)
+            field_aggregates[attr_name] = aggregate
+        aggregate.add(value)
+
+    def get_field_values(self, attr, aggregate):
+        if not isinstance(aggregate, FieldAggregate):
+            field = attr.copy()
+            field.set_internal_value(aggregate, validate=False)
+            return [('', field.get_prep_value())]
+        field_values = []
+        for aggregation in self.aggregations:
+            value = getattr(aggregate, aggregation)
+            if aggregation == Aggregation.COUNT:
+                field_values.append((aggregation, '{}i'.format(value)))
+            else:
+                field_values.append((aggregation, repr(float(value))))
+        for q in self.quantiles:
+            suffix = 'p{:g}'.format(q * 100)
+            value = aggregate.sketch.quantile(q)
+            field_values.append((suffix, repr(float(value))))
+        return field_values
+
+    def encode_point(self, bucket, series_key, field_aggregates):
+        tags = [
+            '{}={}'.format(attr.name or attr.attribute_name, value)
+            for attr, value in zip(self.tag_attributes, series_key)
+            if value is not None
+        ]
+        fields = []
+        for attr in self.field_attributes:
+            aggregate = field_aggregates.get(attr.attribute_name)
+            if aggregate is None:
+                continue
+            field_name = attr.name or attr.attribute_name
+            for suffix, value in self.get_field_values(attr, aggregate):
+                if suffix:
+                    key = '{}_{}'.format(field_name, suffix)
+                else:
+                    key = field_name
+                fields.append('{}={}'.format(key, value))
+        timestamp = D(bucket) * D(str(self.interval)) * 10 ** 9
+        return '{} {} {}'.format(
+            ','.join([self.measurement_class.measurement_name] + tags),
+            ','.join(fields),
+            int(timestamp),
+        )
+
+    def pop_lines(self, force=False):
+        """
+        Removes the intervals which are over, or all the intervals when
+        `force` is True, and returns their points as line protocol.
+        """
+        now = D(str(time.time())) - D(str(self.grace_period))
+        current_bucket = int(now // D(str(self.interval)))
+        with self._lock:
+            if self.closed_bucket is None \
+               or current_bucket > self.closed_bucket:
+                self.closed_bucket = current_bucket
+            keys = [
+                key for key in self.buckets
+                if force or key[0] < current_bucket
+            ]
+            buckets = [
+                (key, self.buckets.pop(key))
+                for key in sorted(keys, key=lambda key: key[0])
+            ]
+            for key, field_aggregates in buckets:
+                if key[0] >= current_bucket:
+                    self.flushed_buckets[key] = field_aggregates
+            for key in list(self.flushed_buckets):
+                if key[0] < current_bucket:
+                    del self.flushed_buckets[key]
+            self._next_flush = time.monotonic() + self.interval
+        return [
+            self.encode_point(bucket, series_key, field_aggregates)
+            for (bucket, series_key), field_aggregates in buckets
+            if field_aggregates
+        ]
+
+    def flush(self, force=False):
+        lines = self.pop_lines(force)
+        if lines:
+            str_points = ''.join(line + '\n' for line in lines)
+            Influxable.get_instance().write_points(
+                points=str_points,
+                **self.write_options
+            )
+            self.nb_points_written += len(lines)
+        return len(lines)
+
+    @property
+    def stats(self):
+        return {
+            'samples': self.nb_samples,
+            'late_samples': self.nb_late_samples,
+            'points_written': self.nb_points_written,
+            'pending_series': len(self.buckets),
+        }
+
+    def close(self):
+        self.flush(force=True)
+        with self._lock:
+            # The intervals are sealed, later samples are dropped
+            if self.flushed_buckets:
+                last_bucket = max(key[0] for key in self.flushed_buckets)
+                self.closed_bucket = last_bucket + 1
+                self.flushed_buckets.clear()
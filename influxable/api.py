@@ -1,3 +1,45 @@
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from .dead_letter import get_dead_letter_handler, get_rejected_lines, \
+    is_partial_write
+from .exceptions import InfluxDBInvalidLineProtocolError
+from .payload import DEFAULT_MAX_BODY_SIZE, get_body_bytes, \
+    get_size_getter, iter_bodies
+from .response import merge_chunked_responses
+
+
+def write_concurrently(send_body, bodies, concurrency, max_workers=None):
+    """
+    Sends the bodies with at most `concurrency` requests in flight. It can
+    be a callable, which is read again before each body.
+    """
+    get_concurrency = get_size_getter(concurrency)
+    bodies = iter(bodies)
+    is_exhausted = False
+    pending = set()
+    with ThreadPoolExecutor(
+        max_workers=max_workers or get_concurrency(),
+        thread_name_prefix='influxable-write',
+    ) as executor:
+        try:
+            while True:
+                while not is_exhausted and len(pending) < get_concurrency():
+                    body = next(bodies, None)
+                    if body is None:
+                        is_exhausted = True
+                        break
+                    pending.add(executor.submit(send_body, body))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
 class InfluxDBApi:
     @staticmethod
     def get_debug_requests(request, seconds=10):
@@ -29,6 +71,8 @@ class InfluxDBApi:
         chunked=False,
         epoch='ns',
         pretty=False,
+        chunk_size=None,
+        bind_params=None,
     ):
         url = '/query'
         params = {
@@ -38,7 +82,15 @@ class InfluxDBApi:
             'chunked': chunked,
             'pretty': pretty,
         }
+        if chunked and chunk_size:
+            params['chunk_size'] = chunk_size
+        if bind_params:
+            params['params'] = json.dumps(bind_params)
         res = request.request(method, url, params=params)
+        if chunked:
+            lines = res.text.splitlines()
+            chunks = [json.loads(line) for line in lines if line]
+            return merge_chunked_responses(chunks)
         return res.json()
 
     @staticmethod
@@ -48,6 +100,9 @@ class InfluxDBApi:
         precision='ns',
         consistency='all',
         retention_policy_name='DEFAULT',
+        max_body_size=DEFAULT_MAX_BODY_SIZE,
+        dead_letter=None,
+        batch_controller=None,
     ):
         url = '/write'
         params = {
@@ -56,6 +111,79 @@ class InfluxDBApi:
             'consistency': consistency,
             'retention_policy_name': retention_policy_name,
         }
-        str_encoded_points = points.encode('utf-8')
-        request.post(url, params=params, data=str_encoded_points)
+        dead_letter = get_dead_letter_handler(dead_letter)
+
+        def send_body(body):
+            if dead_letter is None:
+                request.post(url, params=params, data=body)
+                return
+            lines = get_body_bytes(body).split(b'\n')
+            lines = [line.strip() for line in lines]
+            lines = [line for line in lines if line]
+            InfluxDBApi._write_lines_isolating_errors(
+                request,
+                url,
+                params,
+                lines,
+                dead_letter,
+            )
+
+        if batch_controller is not None:
+            def get_body_size():
+                return min(max_body_size, batch_controller.batch_size)
+            write_concurrently(
+                partial(batch_controller.send, send_body),
+                iter_bodies(points, get_body_size),
+                lambda: batch_controller.concurrency,
+                batch_controller.max_concurrency,
+            )
+            return True
+        for body in iter_bodies(points, max_body_size):
+            send_body(body)
         return True
+
+    @staticmethod
+    def _write_lines_isolating_errors(
+        request,
+        url,
+        params,
+        lines,
+        dead_letter,
+    ):
+        if not lines:
+            return
+        try:
+            request.post(url, params=params, data=b'\n'.join(lines))
+            return
+        except InfluxDBInvalidLineProtocolError as err:
+            error = err
+
+        if len(lines) == 1:
+            dead_letter(lines, error)
+            return
+
+        # On a partial write, the server has already stored the other
+        # lines: they must not be sent again, and when it does not name
+        # the rejected lines (ex: field type conflict), the dead letter
+        # only gets the error
+        rejected_lines = get_rejected_lines(lines, error.error)
+        if is_partial_write(error.error):
+            dead_letter(rejected_lines, error)
+            return
+
+        # Set aside the lines named by the server, and bisect otherwise
+        if rejected_lines:
+            dead_letter(rejected_lines, error)
+            lines = [line for line in lines if line not in rejected_lines]
+            batches = [lines]
+        else:
+            middle = len(lines) // 2
+            batches = [lines[:middle], lines[middle:]]
+        for batch in batches:
+            InfluxDBApi._write_lines_isolating_errors(
+                request,
+                url,
+                params,
+                batch,
+                dead_letter,
+            )
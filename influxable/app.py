@@ -1,5 +1,6 @@
 from .api import InfluxDBApi
 from .connection import Connection
+from .loader import load_file
 from .helpers.decorators import Singleton
 
 
@@ -21,8 +22,13 @@ class Influxable:
 
     def write_points(self, *args, **kwargs):
         request = self.connection.request
+        kwargs.setdefault('max_body_size', self.connection.max_body_size)
         return InfluxDBApi.write_points(request, *args, **kwargs)
 
+    def load_file(self, *args, **kwargs):
+        request = self.connection.request
+        return load_file(request, *args, **kwargs)
+
     @property
     def base_url(self):
         return self.connection.base_url
@@ -1,4 +1,6 @@
 import arrow
+import numpy as np
+import pandas as pd
 from datetime import datetime
 from decimal import Decimal as D, InvalidOperation
 from .helpers.utils import inv
@@ -23,6 +25,12 @@ TIMESTAMP_CONVERT_RATIO = {
     TimestampPrecision.SECONDS: 1,
 }
 
+NANOSECONDS_PER_SECOND = D(10 ** 9)
+
+
+def is_datetime64(value):
+    return isinstance(value, (pd.Timestamp, np.datetime64))
+
 
 class BaseAttribute:
     def __init__(self, **kwargs):
@@ -47,6 +55,12 @@ class BaseAttribute:
             instance.set_internal_value(self._value)
         return instance
 
+    def copy(self):
+        # Unlike clone(), the options are not validated again
+        instance = object.__new__(self.__class__)
+        instance.__dict__ = self.__dict__.copy()
+        return instance
+
     def get_internal_value(self):
         return self._value
 
@@ -67,8 +81,9 @@ class BaseAttribute:
     def reset(self):
         self._value = None
 
-    def set_internal_value(self, value):
-        self.validate(value)
+    def set_internal_value(self, value, validate=True):
+        if validate:
+            self.validate(value)
         self.raw_value = value
         if value is not None:
             try:
@@ -79,10 +94,20 @@ class BaseAttribute:
                 self._value = value
         self.clean(value)
 
+    def set_trusted_value(self, value):
+        self.raw_value = value
+        self._value = value if value is not None else self.default
+
     def validate(self, value):
         if value is None and self.default is None and not self.is_nullable:
             raise InfluxDBAttributeValueError('The field cannot be nullable')
 
+    def validate_column(self, values):
+        errors = []
+        if self.default is None and not self.is_nullable:
+            errors.append((values.isna(), 'The field cannot be nullable'))
+        return errors
+
     def validate_options(self):
         pass
 
@@ -108,6 +133,12 @@ class IntegerFieldAttribute(GenericFieldAttribute):
     def to_python(self, value):
         return int(value)
 
+    def set_trusted_value(self, value):
+        super(IntegerFieldAttribute, self).set_trusted_value(value)
+        if isinstance(self._value, float):
+            # A column with missing values is promoted to float by pandas
+            self._value = int(self._value)
+
     def validate(self, value):
         super(IntegerFieldAttribute, self).validate(value)
         if value is not None and self.min_value is not None \
@@ -121,6 +152,35 @@ class IntegerFieldAttribute(GenericFieldAttribute):
                 'The value must be lower than the max_value'
             )
 
+    def to_numeric_column(self, values):
+        return pd.to_numeric(values, errors='coerce')
+
+    def is_castable_column(self, numeric_values):
+        # A value with a fractional part would be truncated by int()
+        return np.isfinite(numeric_values) & \
+            (numeric_values == np.trunc(numeric_values))
+
+    def validate_column(self, values):
+        errors = super(IntegerFieldAttribute, self).validate_column(values)
+        not_null = values.notna()
+        numeric_values = self.to_numeric_column(values)
+        if self.enforce_cast:
+            errors.append((
+                not_null & ~self.is_castable_column(numeric_values),
+                'The value cannot be casted',
+            ))
+        if self.min_value is not None:
+            errors.append((
+                not_null & (numeric_values < self.min_value),
+                'The value must be greater than the min_value',
+            ))
+        if self.max_value is not None:
+            errors.append((
+                not_null & (numeric_values > self.max_value),
+                'The value must be lower than the max_value',
+            ))
+        return errors
+
     def validate_options(self):
         super(IntegerFieldAttribute, self).validate_options()
         if self.min_value is not None \
@@ -143,8 +203,16 @@ class FloatFieldAttribute(IntegerFieldAttribute):
     def clean(self, value):
         super(FloatFieldAttribute, self).clean(value)
         if self.max_nb_decimals is not None:
-            precision = '.' + '0' * (self.max_nb_decimals - 1) + '1'
-            self._value = self.to_python(value).quantize(D(precision))
+            self._value = self.quantize(value)
+
+    def quantize(self, value):
+        precision = '.' + '0' * (self.max_nb_decimals - 1) + '1'
+        return self.to_python(value).quantize(D(precision))
+
+    def set_trusted_value(self, value):
+        BaseAttribute.set_trusted_value(self, value)
+        if self._value is not None and self.max_nb_decimals is not None:
+            self._value = self.quantize(self._value)
 
     def to_influx(self, value):
         str_value = str(value)
@@ -153,6 +221,9 @@ class FloatFieldAttribute(IntegerFieldAttribute):
     def to_python(self, value):
         return D(value)
 
+    def is_castable_column(self, numeric_values):
+        return numeric_values.notna()
+
     def validate_options(self):
         super(FloatFieldAttribute, self).validate_options()
         if self.max_nb_decimals is not None \
@@ -173,8 +244,8 @@ class StringFieldAttribute(GenericFieldAttribute):
         super(StringFieldAttribute, self).__init__(**kwargs)
 
     def to_influx(self, value):
-        str_value = str(value)
-        return "\'{}\'".format(str_value)
+        str_value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        return '"{}"'.format(str_value)
 
     def to_python(self, value):
         return str(value)
@@ -190,6 +261,22 @@ class StringFieldAttribute(GenericFieldAttribute):
                 'the string length must be lower than the max_length'
             )
 
+    def validate_column(self, values):
+        errors = super(StringFieldAttribute, self).validate_column(values)
+        not_null = values.notna()
+        if self.choices is not None:
+            errors.append((
+                not_null & ~values.isin(self.choices),
+                'The value is not refered in choices',
+            ))
+        if self.max_length is not None:
+            lengths = values.astype(str).str.len()
+            errors.append((
+                not_null & (lengths > self.max_length),
+                'the string length must be lower than the max_length',
+            ))
+        return errors
+
     def validate_options(self):
         super(StringFieldAttribute, self).validate_options()
         if self.choices is not None and not isinstance(self.choices, list):
@@ -250,16 +337,40 @@ class TimestampFieldAttribute(BaseAttribute):
 
     def convert_to_precision(self, timestamp, precision):
         convert_ratio = TIMESTAMP_CONVERT_RATIO[precision]
+        if is_datetime64(timestamp):
+            # A datetime64 value of a DataFrame, exact in nanoseconds
+            nanoseconds = D(pd.Timestamp(timestamp).value)
+            if precision == TimestampPrecision.NANOSECONDS:
+                return nanoseconds
+            return nanoseconds / NANOSECONDS_PER_SECOND * convert_ratio
         return D(timestamp) * convert_ratio
 
+    def set_trusted_value(self, value):
+        if value is None:
+            return self.set_internal_value(value)
+        self.raw_value = value
+        self._value = self.to_python(value)
+        self.formatted_timestamp = self.convert_to_nanoseconds(value)
+
     def to_influx(self, value):
         timestamp = D(self.formatted_timestamp)
         str_value = str(timestamp)
         return "{}".format(str_value)
 
     def to_python(self, value):
-        timestamp = D(value)
-        return self.convert_to_precision(timestamp, self.precision)
+        return self.convert_to_precision(value, self.precision)
+
+    def validate_column(self, values):
+        errors = super(TimestampFieldAttribute, self).validate_column(values)
+        # A value which cannot be cast cannot be encoded either, whatever
+        # enforce_cast is
+        numeric_values = pd.to_numeric(values, errors='coerce')
+        is_castable = np.isfinite(numeric_values) | values.map(is_datetime64)
+        errors.append((
+            values.notna() & ~is_castable,
+            'The value cannot be casted',
+        ))
+        return errors
 
     def validate_options(self):
         super(TimestampFieldAttribute, self).validate_options()
@@ -288,6 +399,16 @@ class DateTimeFieldAttribute(TimestampFieldAttribute):
             return None
         return arrow.get(self._value).format(self.str_format)
 
+    def set_trusted_value(self, value):
+        if value is None:
+            return self.set_internal_value(value)
+        self.raw_value = value
+        self._value = self.to_python(value)
+
+    def validate_column(self, values):
+        # The dates are parsed with str_format, which is left to each row
+        return BaseAttribute.validate_column(self, values)
+
     def to_influx(self, value):
         timestamp = int(arrow.get(value).timestamp())
         nanoseconds = self.convert_to_nanoseconds(timestamp)
@@ -297,5 +418,8 @@ class DateTimeFieldAttribute(TimestampFieldAttribute):
     def to_python(self, value):
         if isinstance(value, datetime):
             return value
+        if isinstance(value, (int, float, D)):
+            # A timestamp in seconds, e.g. returned by the server
+            return arrow.get(float(value)).datetime
         dt = arrow.get(value, self.str_format).datetime
         return dt
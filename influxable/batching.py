@@ -0,0 +1,139 @@
+import threading
+import time
+from .api import DEFAULT_MAX_BODY_SIZE
+from .exceptions import InfluxDBAttributeValueError
+
+DEFAULT_TARGET_LATENCY = 1
+DEFAULT_INITIAL_BATCH_SIZE = 1000000
+DEFAULT_MIN_BATCH_SIZE = 10000
+DEFAULT_BATCH_SIZE_STEP = 100000
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_DECREASE_FACTOR = 0.5
+DEFAULT_SMOOTHING = 0.2
+
+
+class AdaptiveBatchController:
+    """
+    Adapts the size (in bytes) and the number of in-flight batches of the
+    writes with an AIMD (additive increase, multiplicative decrease) rule.
+
+    A batch which fails or takes longer than `target_latency` seconds
+    multiplies both settings by `decrease_factor`, once per congestion
+    event: the batches which were already in flight do not decrease them
+    again. Otherwise the batch size grows by `batch_size_step` and the
+    concurrency by one after a full window of successful batches.
+    """
+
+    def __init__(
+        self,
+        target_latency=DEFAULT_TARGET_LATENCY,
+        initial_batch_size=DEFAULT_INITIAL_BATCH_SIZE,
+        min_batch_size=DEFAULT_MIN_BATCH_SIZE,
+        max_batch_size=DEFAULT_MAX_BODY_SIZE,
+        batch_size_step=DEFAULT_BATCH_SIZE_STEP,
+        initial_concurrency=1,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        decrease_factor=DEFAULT_DECREASE_FACTOR,
+        smoothing=DEFAULT_SMOOTHING,
+    ):
+        if not 0 < min_batch_size <= initial_batch_size <= max_batch_size:
+            msg = 'batch sizes must verify ' \
+                '0 < min_batch_size <= initial_batch_size <= max_batch_size'
+            raise InfluxDBAttributeValueError(msg)
+        if not 1 <= initial_concurrency <= max_concurrency:
+            msg = 'concurrency must verify ' \
+                '1 <= initial_concurrency <= max_concurrency'
+            raise InfluxDBAttributeValueError(msg)
+        if not 0 < decrease_factor < 1:
+            msg = 'decrease_factor must be between 0 and 1'
+            raise InfluxDBAttributeValueError(msg)
+        self.target_latency = target_latency
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.batch_size_step = batch_size_step
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.smoothing = smoothing
+        self.batch_size = initial_batch_size
+        self.concurrency = initial_concurrency
+        self.latency = None
+        self.error_rate = 0
+        self.nb_batches = 0
+        self.nb_errors = 0
+        self._generation = 0
+        self._nb_successes = 0
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """
+        Returns the token of a batch about to be sent, to be given back
+        to `record()`.
+        """
+        with self._lock:
+            return self._generation
+
+    def record(self, token, latency, is_error=False):
+        with self._lock:
+            self.nb_batches += 1
+            self.nb_errors += int(is_error)
+            error = int(is_error) - self.error_rate
+            self.error_rate += self.smoothing * error
+            if not is_error:
+                if self.latency is None:
+                    self.latency = latency
+                else:
+                    self.latency += self.smoothing * (latency - self.latency)
+            if is_error or latency > self.target_latency:
+                if token == self._generation:
+                    self._decrease()
+            else:
+                self._increase()
+
+    def _decrease(self):
+        self._generation += 1
+        self._nb_successes = 0
+        self.batch_size = max(
+            self.min_batch_size,
+            int(self.batch_size * self.decrease_factor),
+        )
+        self.concurrency = max(
+            1,
+            int(self.concurrency * self.decrease_factor),
+        )
+
+    def _increase(self):
+        self.batch_size = min(
+            self.max_batch_size,
+            self.batch_size + self.batch_size_step,
+        )
+        self._nb_successes += 1
+        if self._nb_successes >= self.concurrency:
+            self._nb_successes = 0
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def send(self, send_func, *args, **kwargs):
+        """
+        Calls `send_func` and records its latency, or its error which is
+        raised again.
+        """
+        token = self.begin()
+        start = time.monotonic()
+        try:
+            result = send_func(*args, **kwargs)
+        except Exception:
+            self.record(token, time.monotonic() - start, is_error=True)
+            raise
+        self.record(token, time.monotonic() - start)
+        return result
+
+    @property
+    def metrics(self):
+        with self._lock:
+            return {
+                'batch_size': self.batch_size,
+                'concurrency': self.concurrency,
+                'latency': self.latency,
+                'error_rate': self.error_rate,
+                'batches': self.nb_batches,
+                'errors': self.nb_errors,
+            }
@@ -0,0 +1,330 @@
+import itertools
+import math
+import threading
+import time
+import requests
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from .api import InfluxDBApi
+from .exceptions import InfluxDBConnectionError, InfluxDBInvalidChoiceError
+from .request import InfluxDBRequest, RequestKind, get_request_kind
+
+DEFAULT_HEALTH_CHECK_INTERVAL = 10
+
+DEFAULT_HEDGING_PERCENTILE = 95
+DEFAULT_HEDGING_MIN_DELAY = 0.01
+DEFAULT_HEDGING_BUDGET_RATIO = 0.1
+DEFAULT_HEDGING_WINDOW_SIZE = 1000
+DEFAULT_HEDGING_MIN_SAMPLES = 20
+
+
+class BalancingStrategy:
+    ROUND_ROBIN = 'round_robin'
+    LEAST_OUTSTANDING_REQUESTS = 'least_outstanding_requests'
+
+
+class WritePolicy:
+    BALANCED = 'balanced'
+    PRIMARY = 'primary'
+
+
+WRITE_POLICY_VALUES = [WritePolicy.BALANCED, WritePolicy.PRIMARY]
+
+
+class InfluxDBNode:
+    def __init__(self, request):
+        self.request = request
+        self.is_healthy = True
+        self.outstanding_requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return self.request.base_url
+
+    def acquire(self):
+        with self._lock:
+            self.outstanding_requests += 1
+
+    def release(self):
+        with self._lock:
+            self.outstanding_requests -= 1
+
+    def admit(self):
+        self.is_healthy = True
+
+    def eject(self):
+        self.is_healthy = False
+
+    def check_health(self):
+        try:
+            InfluxDBApi.ping(self.request)
+            self.admit()
+        except (InfluxDBConnectionError, requests.exceptions.HTTPError):
+            self.eject()
+        return self.is_healthy
+
+
+class RoundRobinBalancer:
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def choose(self, nodes):
+        return nodes[next(self._counter) % len(nodes)]
+
+
+class LeastOutstandingRequestsBalancer:
+    def choose(self, nodes):
+        return min(nodes, key=lambda node: node.outstanding_requests)
+
+
+BALANCERS = {
+    BalancingStrategy.ROUND_ROBIN: RoundRobinBalancer,
+    BalancingStrategy.LEAST_OUTSTANDING_REQUESTS:
+        LeastOutstandingRequestsBalancer,
+}
+
+
+class HedgingPolicy:
+    """
+    Decides when a read should be duplicated on another node.
+
+    The hedge delay is the given percentile of the latest read latencies,
+    and the number of hedges is capped to `budget_ratio` of the reads
+    (at most 1.0, so that hedging can never more than double the load).
+    """
+
+    def __init__(
+        self,
+        percentile=DEFAULT_HEDGING_PERCENTILE,
+        min_delay=DEFAULT_HEDGING_MIN_DELAY,
+        budget_ratio=DEFAULT_HEDGING_BUDGET_RATIO,
+        window_size=DEFAULT_HEDGING_WINDOW_SIZE,
+        min_samples=DEFAULT_HEDGING_MIN_SAMPLES,
+    ):
+        if not 0 < percentile <= 100:
+            msg = 'percentile must be between 0 and 100'
+            raise InfluxDBInvalidChoiceError(msg)
+        if not 0 <= budget_ratio <= 1:
+            msg = 'budget_ratio must be between 0 and 1'
+            raise InfluxDBInvalidChoiceError(msg)
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.latencies = deque(maxlen=window_size)
+        self.nb_reads = 0
+        self.nb_hedges = 0
+        self._lock = threading.Lock()
+
+    def record_latency(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+
+    def record_read(self):
+        with self._lock:
+            self.nb_reads += 1
+
+    def get_delay(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if len(latencies) < self.min_samples:
+            return self.min_delay
+        index = math.ceil(self.percentile / 100 * len(latencies)) - 1
+        return max(self.min_delay, latencies[index])
+
+    def acquire_budget(self):
+        with self._lock:
+            if self.nb_hedges + 1 > self.budget_ratio * self.nb_reads:
+                return False
+            self.nb_hedges += 1
+            return True
+
+
+class HealthChecker(threading.Thread):
+    def __init__(self, nodes, interval=DEFAULT_HEALTH_CHECK_INTERVAL):
+        super(HealthChecker, self).__init__(daemon=True)
+        self.nodes = nodes
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check_nodes()
+
+    def check_nodes(self):
+        for node in self.nodes:
+            node.check_health()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class InfluxDBClusterRequest:
+    def __init__(
+        self,
+        base_urls,
+        database_name,
+        auth=None,
+        token=None,
+        balancing=BalancingStrategy.ROUND_ROBIN,
+        write_policy=WritePolicy.PRIMARY,
+        health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL,
+        hedging=None,
+        retry_policies=None,
+    ):
+        if not len(base_urls):
+            msg = 'base_urls should not be empty'
+            raise InfluxDBInvalidChoiceError(msg)
+        if balancing not in BALANCERS:
+            msg = 'balancing `{}` must be one of value of {}'.format(
+                balancing,
+                list(BALANCERS),
+            )
+            raise InfluxDBInvalidChoiceError(msg)
+        if write_policy not in WRITE_POLICY_VALUES:
+            msg = 'write_policy `{}` must be one of value of {}'.format(
+                write_policy,
+                WRITE_POLICY_VALUES,
+            )
+            raise InfluxDBInvalidChoiceError(msg)
+
+        self.base_urls = list(base_urls)
+        self.database_name = database_name
+        self.nodes = [
+            InfluxDBNode(InfluxDBRequest(
+                base_url,
+                database_name,
+                auth=auth,
+                token=token,
+                retry_policies=retry_policies,
+            ))
+            for base_url in self.base_urls
+        ]
+        self.balancer = BALANCERS[balancing]()
+        self.write_policy = write_policy
+        self.hedging = hedging
+        self._executor = None
+        if hedging is not None:
+            self._executor = ThreadPoolExecutor(
+                thread_name_prefix='influxable-hedging',
+            )
+        self.health_checker = None
+        if health_check_interval:
+            self.health_checker = HealthChecker(
+                self.nodes,
+                health_check_interval,
+            )
+            self.health_checker.start()
+
+    @property
+    def base_url(self):
+        return self.base_urls[0]
+
+    @property
+    def healthy_nodes(self):
+        return [node for node in self.nodes if node.is_healthy]
+
+    @staticmethod
+    def is_read_request(method, url, params=None):
+        return get_request_kind(url, params) == RequestKind.QUERY
+
+    def get_candidate_nodes(self, is_read):
+        healthy_nodes = self.healthy_nodes
+        ejected_nodes = [n for n in self.nodes if not n.is_healthy]
+        is_balanced = is_read or self.write_policy == WritePolicy.BALANCED
+        if is_balanced and healthy_nodes:
+            chosen_node = self.balancer.choose(healthy_nodes)
+            healthy_nodes.remove(chosen_node)
+            healthy_nodes.insert(0, chosen_node)
+        # Ejected nodes are kept as a last resort
+        return healthy_nodes + ejected_nodes
+
+    def request(self, method, url, **kwargs):
+        params = kwargs.get('params', {})
+        is_read = self.is_read_request(method, url, params)
+        nodes = self.get_candidate_nodes(is_read)
+        if is_read and self.hedging is not None and len(nodes) > 1:
+            return self._hedged_request(nodes, method, url, **kwargs)
+        return self._send(nodes, method, url, **kwargs)
+
+    def _send(self, nodes, method, url, **kwargs):
+        error = None
+        for node in nodes:
+            node.acquire()
+            try:
+                return node.request.request(method, url, **kwargs)
+            except InfluxDBConnectionError as err:
+                node.eject()
+                error = err
+            finally:
+                node.release()
+        raise error
+
+    def _timed_send(self, nodes, method, url, **kwargs):
+        start = time.monotonic()
+        res = self._send(nodes, method, url, **kwargs)
+        self.hedging.record_latency(time.monotonic() - start)
+        return res
+
+    def _hedged_request(self, nodes, method, url, **kwargs):
+        self.hedging.record_read()
+        hedge_nodes = nodes[1:] + nodes[:1]
+        futures = [self._executor.submit(
+            self._timed_send, nodes, method, url, **kwargs,
+        )]
+        done, _ = wait(futures, timeout=self.hedging.get_delay())
+        if not done and self.hedging.acquire_budget():
+            futures.append(self._executor.submit(
+                self._timed_send, hedge_nodes, method, url, **kwargs,
+            ))
+
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._cancel(pending)
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    @staticmethod
+    def _cancel(futures):
+        def close_response(future):
+            if not future.cancelled() and future.exception() is None:
+                future.result().close()
+
+        # A request already sent cannot be interrupted, its response is
+        # discarded as soon as it comes back
+        for future in futures:
+            if not future.cancel():
+                future.add_done_callback(close_response)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        if self.health_checker is not None:
+            self.health_checker.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        for node in self.nodes:
+            node.request.close()
@@ -1,7 +1,10 @@
 import arrow
 import click
 from influxable.commands.auto_generate import AutoGenerateMeasurement
+from influxable.commands.load import Load
 from influxable.commands.populate import Populate
+from influxable.loader import DEFAULT_LOAD_BATCH_SIZE, \
+    DEFAULT_LOAD_CONCURRENCY
 
 
 DEFAULT_OUTPUT_FILE_NAME = 'auto_generate_measurement.py'
@@ -112,3 +115,51 @@ def populate(*args, **kwargs):
     This command will exectute the populate command.
     """
     Populate.run(*args, **kwargs)
+
+
+@main.command(name='load')
+@click.argument(
+    'file_path',
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    '-p',
+    '--precision',
+    'precision',
+    default='ns',
+    type=click.Choice(['ns', 'u', 'ms', 's', 'm', 'h']),
+    help='precision of the timestamps of the file',
+)
+@click.option(
+    '-b',
+    '--batch_size',
+    'batch_size',
+    type=int,
+    default=DEFAULT_LOAD_BATCH_SIZE,
+    help='maximum size of a batch in bytes',
+)
+@click.option(
+    '-c',
+    '--concurrency',
+    'concurrency',
+    type=int,
+    default=DEFAULT_LOAD_CONCURRENCY,
+    help='number of batches sent in parallel',
+)
+@click.option(
+    '--checkpoint',
+    'checkpoint_path',
+    default=None,
+    help='path of the checkpoint file (default: <file>.checkpoint)',
+)
+@click.option(
+    '--dead_letter',
+    'dead_letter',
+    default=None,
+    help='path of the file receiving the lines rejected by the server',
+)
+def load(*args, **kwargs):
+    """
+    This command will load a line protocol file, which can be gzipped.
+    """
+    Load.run(*args, **kwargs)
@@ -0,0 +1,21 @@
+from influxable import Influxable
+
+
+class Load():
+    @staticmethod
+    def run(*args, **kwargs):
+        client = Influxable.get_instance()
+        stats = client.load_file(
+            kwargs.get('file_path'),
+            precision=kwargs.get('precision'),
+            max_body_size=kwargs.get('batch_size'),
+            concurrency=kwargs.get('concurrency'),
+            checkpoint_path=kwargs.get('checkpoint_path'),
+            dead_letter=kwargs.get('dead_letter'),
+        )
+        if stats['resumed_from']:
+            print('Resumed from byte {}'.format(stats['resumed_from']))
+        print('Loaded {} bytes in {} batches'.format(
+            stats['bytes'],
+            stats['batches'],
+        ))
@@ -1,11 +1,18 @@
+import time
+import requests
 from . import settings
-from .api import InfluxDBApi
-from .request import InfluxDBRequest
+from .api import InfluxDBApi, DEFAULT_MAX_BODY_SIZE
+from .cluster import BalancingStrategy, InfluxDBClusterRequest, \
+    WritePolicy, DEFAULT_HEALTH_CHECK_INTERVAL
+from .exceptions import InfluxDBConnectionError
+from .request import InfluxDBRequest, REQUEST_KINDS
 
 
 class Connection:
     def __init__(self, *args, **kwargs):
-        self.base_url = kwargs.get('base_url', settings.INFLUXDB_URL)
+        self.base_url = self._parse_base_url(
+            kwargs.get('base_url', settings.INFLUXDB_URL),
+        )
         self.user = kwargs.get('user', settings.INFLUXDB_USER)
         self.password = kwargs.get('password', settings.INFLUXDB_PASSWORD)
         self.database_name = kwargs.get(
@@ -19,22 +26,113 @@ class Connection:
         else:
             self.auth = None
 
-        self.request = InfluxDBRequest(
-            self.base_url,
-            self.database_name,
-            auth=self.auth,
-            token=self.token,
+        self.lazy = kwargs.get('lazy', settings.INFLUXDB_LAZY_CONNECTION)
+        self.health_check_ttl = kwargs.get(
+            'health_check_ttl',
+            settings.INFLUXDB_HEALTH_CHECK_TTL,
+        )
+        self.balancing = kwargs.get(
+            'balancing',
+            BalancingStrategy.ROUND_ROBIN,
         )
+        self.write_policy = kwargs.get('write_policy', WritePolicy.PRIMARY)
+        self.health_check_interval = kwargs.get(
+            'health_check_interval',
+            DEFAULT_HEALTH_CHECK_INTERVAL,
+        )
+        self.hedging = kwargs.get('hedging', None)
+        self.retry_policies = {
+            kind: kwargs['{}_retry_policy'.format(kind)]
+            for kind in REQUEST_KINDS
+            if kwargs.get('{}_retry_policy'.format(kind)) is not None
+        }
+        self.max_body_size = kwargs.get('max_body_size', DEFAULT_MAX_BODY_SIZE)
+        self._request = None
+        self._is_healthy = None
+        self._last_health_check = None
+
         self.stream = False
-        self.check_if_connection_reached()
+        if not self.lazy:
+            self.check_if_connection_reached()
 
     @staticmethod
     def create(base_url, database_name, user='', password=''):
         return Connection(base_url, database_name, user, password)
 
+    @staticmethod
+    def _parse_base_url(base_url):
+        if isinstance(base_url, str) and ',' in base_url:
+            return [url.strip() for url in base_url.split(',') if url.strip()]
+        return base_url
+
+    @property
+    def is_cluster(self):
+        return isinstance(self.base_url, (list, tuple))
+
+    @property
+    def request(self):
+        request = self._get_or_create_request()
+        if self.lazy:
+            self.ensure_connection_reached()
+        return request
+
+    def _get_or_create_request(self):
+        if self._request is None and self.is_cluster:
+            self._request = InfluxDBClusterRequest(
+                self.base_url,
+                self.database_name,
+                auth=self.auth,
+                token=self.token,
+                balancing=self.balancing,
+                write_policy=self.write_policy,
+                health_check_interval=self.health_check_interval,
+                hedging=self.hedging,
+                retry_policies=self.retry_policies,
+            )
+        elif self._request is None:
+            self._request = InfluxDBRequest(
+                self.base_url,
+                self.database_name,
+                auth=self.auth,
+                token=self.token,
+                retry_policies=self.retry_policies,
+            )
+        return self._request
+
     def check_if_connection_reached(self):
         query = 'SHOW DATABASES'
-        InfluxDBApi.execute_query(self.request, query)
+        request = self._get_or_create_request()
+        InfluxDBApi.execute_query(request, query)
+
+    def check_health(self, force=False):
+        now = time.monotonic()
+        is_cached = self._last_health_check is not None and \
+            now - self._last_health_check < self.health_check_ttl
+        if is_cached and not force:
+            return self._is_healthy
+
+        request = self._get_or_create_request()
+        try:
+            InfluxDBApi.ping(request)
+            self._is_healthy = True
+        except (InfluxDBConnectionError, requests.exceptions.HTTPError):
+            self._is_healthy = False
+        self._last_health_check = now
+        return self._is_healthy
+
+    def ensure_connection_reached(self):
+        if not self.check_health():
+            msg = 'InfluxDB server is unreachable : {}'.format(self.base_url)
+            raise InfluxDBConnectionError(msg)
+
+    def close(self):
+        """
+        Stops the health checks of a cluster and closes the sessions,
+        a new request is created on next use.
+        """
+        if self._request is not None:
+            self._request.close()
+            self._request = None
 
     @property
     def policy_name(self):
@@ -1,11 +1,12 @@
 from .admin import InfluxDBAdmin
-from .criteria import Field
+from .criteria import Field, Param
 from .query import Query, RawQuery, BulkInsertQuery
 
 
 __all__ = [
     'InfluxDBAdmin',
     'Field',
+    'Param',
     'Query',
     'RawQuery',
     'BulkInsertQuery',
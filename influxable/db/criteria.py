@@ -55,6 +55,22 @@ class Field:
         return self.field_name
 
 
+class Param:
+    """
+    Placeholder of a bind parameter, its value is sent apart from the
+    query with Query.bind().
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def evaluate(self):
+        return '${}'.format(self.name)
+
+    def __str__(self):
+        return self.evaluate()
+
+
 class Criteria:
     def __init__(self, left_operand, right_operand, operator):
         self.left_operand = left_operand
@@ -76,7 +92,9 @@ class Criteria:
         left_operand = '"{}"'.format(self.left_operand)
         operator = EVALUATED_OPERATORS[self.operator]
         right_operand = self.right_operand
-        if isinstance(right_operand, str):
+        if isinstance(right_operand, Param):
+            right_operand = right_operand.evaluate()
+        elif isinstance(right_operand, str):
             right_operand = '\'{}\''.format(self.right_operand)
         return '{} {} {}'.format(left_operand, operator, right_operand)
 
@@ -1,14 +1,72 @@
-from functools import lru_cache
-from .criteria import Criteria
-from .function import aggregations
+import copy
+import hashlib
+import json
+import time
+from functools import lru_cache, wraps
+from .criteria import Criteria, Field
+from .function import aggregations, selectors
 from ..response import InfluxDBResponse
 from ..serializers import BaseSerializer
 from .. import Influxable, exceptions
 
+DEFAULT_FOLLOW_INTERVAL = 10
+
+BIND_PARAM_TYPES = (str, int, float, bool)
+
+AGGREGATION_FUNCTIONS = {
+    'count': aggregations.Count,
+    'distinct': aggregations.Distinct,
+    'integral': aggregations.Integral,
+    'mean': aggregations.Mean,
+    'median': aggregations.Median,
+    'mode': aggregations.Mode,
+    'spread': aggregations.Spread,
+    'std_dev': aggregations.StdDev,
+    'stddev': aggregations.StdDev,
+    'sum': aggregations.Sum,
+    'first': selectors.First,
+    'last': selectors.Last,
+    'max': selectors.Max,
+    'min': selectors.Min,
+}
+
+
+def query_builder(method):
+    """
+    Makes a builder method of an immutable query work on a copy of it,
+    which shares the clauses that the method does not change.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.is_immutable:
+            self = self._clone()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def execute_query(str_query, bind_params=None):
+    instance = Influxable.get_instance()
+    response = instance.execute_query(
+        query=str_query,
+        method='post',
+        bind_params=bind_params,
+    )
+    if InfluxDBResponse(response).is_partial:
+        # The max-row-limit of the server only applies to the
+        # non-chunked queries
+        response = instance.execute_query(
+            query=str_query,
+            method='post',
+            chunked=True,
+            bind_params=bind_params,
+        )
+    return response
+
 
 class RawQuery:
-    def __init__(self, str_query=''):
+    def __init__(self, str_query='', bind_params=None):
         self.str_query = str_query
+        self.bind_params = dict(bind_params or {})
 
     def execute(self):
         return self.raw_response
@@ -23,8 +81,7 @@ class RawQuery:
 
     @lru_cache(maxsize=None)
     def _resolve(self, *args, **kwargs):
-        instance = Influxable.get_instance()
-        return instance.execute_query(query=self.str_query, method='post')
+        return execute_query(self.str_query, self.bind_params)
 
 
 class SelectQueryClause:
@@ -39,6 +96,7 @@ class SelectQueryClause:
             msg = 'field type must be <str>'
             raise exceptions.InfluxDBInvalidTypeError(msg)
 
+    @query_builder
     def select(self, *fields):
         selected_fields = []
         for field in fields:
@@ -70,6 +128,7 @@ class IntoQueryClause:
             msg = 'measurement type must be <str>'
             raise exceptions.InfluxDBInvalidTypeError(msg)
 
+    @query_builder
     def into(self, measurement):
         self.validate_measurement(measurement)
         self.selected_into_measurement = measurement
@@ -99,6 +158,7 @@ class FromQueryClause:
                 msg = 'measurement type must be <str>'
                 raise exceptions.InfluxDBInvalidTypeError(msg)
 
+    @query_builder
     def from_measurements(self, *measurements):
         self.validate_measurements(measurements)
         quoted_measurements = ['"{}"'.format(m) for m in measurements]
@@ -124,6 +184,7 @@ class WhereQueryClause:
                 msg = 'Invalid criteria'
                 raise exceptions.InfluxDBInvalidTypeError(msg)
 
+    @query_builder
     def where(self, *criteria):
         self.validate_criteria(criteria)
         self.selected_criteria = list(criteria)
@@ -148,6 +209,7 @@ class LimitQueryClause:
             msg = 'value must be a positive integer'
             raise exceptions.InfluxDBInvalidTypeError(msg)
 
+    @query_builder
     def limit(self, value):
         self.validate_value(value)
         self.limit_value = value
@@ -170,6 +232,7 @@ class SLimitQueryClause:
             msg = 'value must be a positive integer'
             raise exceptions.InfluxDBInvalidTypeError(msg)
 
+    @query_builder
     def slimit(self, value):
         self.validate_value(value)
         self.slimit_value = value
@@ -192,6 +255,7 @@ class OffsetQueryClause:
             msg = 'value must be a positive integer'
             raise exceptions.InfluxDBInvalidTypeError(msg)
 
+    @query_builder
     def offset(self, value):
         self.validate_value(value)
         self.offset_value = value
@@ -214,6 +278,7 @@ class SOffsetQueryClause:
             msg = 'value must be a positive integer'
             raise exceptions.InfluxDBInvalidTypeError(msg)
 
+    @query_builder
     def soffset(self, value):
         self.validate_value(value)
         self.soffset_value = value
@@ -262,6 +327,7 @@ class GroupByQueryClause:
         if fill is not None:
             self.validate_fill(fill)
 
+    @query_builder
     def group_by(self, *tags):
         if len(tags):
             self.validate_tags(tags)
@@ -270,6 +336,7 @@ class GroupByQueryClause:
         self.has_group_by_tags = True
         return self
 
+    @query_builder
     def range_by(self, interval, shift=None, fill=None, tags=[]):
         self.validate_range_by(interval, shift, fill, tags)
         if len(tags):
@@ -293,7 +360,7 @@ class GroupByQueryClause:
 
     def _prepare_fill_subclause(self):
         fill_subclause = ''
-        if self.fill_value:
+        if self.fill_value is not None:
             fill_subclause = self.fill_subclause.format(fill=self.fill_value)
         return fill_subclause
 
@@ -330,10 +397,12 @@ class OrderByQueryClause:
         super(OrderByQueryClause, self).__init__()
         self.is_chronological_sort = None
 
+    @query_builder
     def asc(self):
         self.is_chronological_sort = True
         return self
 
+    @query_builder
     def desc(self):
         self.is_chronological_sort = False
         return self
@@ -362,6 +431,7 @@ class TimezoneClause:
             msg = 'value is an invalid timezone'
             raise exceptions.InfluxDBInvalidTypeError(msg)
 
+    @query_builder
     def tz(self, value):
         self.validate_timezone(value)
         self.timezone_value = value
@@ -404,6 +474,37 @@ class SelectAggregation:
     def sum(self, value='*'):
         return self.select(aggregations.Sum(value))
 
+    @query_builder
+    def aggregate(self, **aggregations_by_alias):
+        """
+        Selects several aggregations in the same query, each one named by
+        its alias: alias=function(...), or alias='field' when the alias is
+        the name of the function, e.g. mean='value'.
+        """
+        if not aggregations_by_alias:
+            msg = 'aggregations should not be empty'
+            raise exceptions.InfluxDBInvalidTypeError(msg)
+        selected_fields = []
+        for alias, function in aggregations_by_alias.items():
+            if isinstance(function, str):
+                function_class = AGGREGATION_FUNCTIONS.get(alias.lower())
+                if function_class is None:
+                    msg = '{} is not a function, it must be one of {}'.format(
+                        alias,
+                        sorted(AGGREGATION_FUNCTIONS),
+                    )
+                    raise exceptions.InfluxDBInvalidChoiceError(msg)
+                function = function_class(function)
+            elif not hasattr(function, 'evaluate'):
+                msg = 'aggregation type must be <str> or a function'
+                raise exceptions.InfluxDBInvalidTypeError(msg)
+            selected_fields.append('{} AS "{}"'.format(
+                function.evaluate(),
+                alias,
+            ))
+        self.selected_fields = selected_fields
+        return self
+
 
 class GenericQuery(
     SelectQueryClause,
@@ -421,6 +522,26 @@ class GenericQuery(
 ):
     def __init__(self):
         super(GenericQuery, self).__init__()
+        self.is_immutable = False
+        self._compiled_query = None
+        self._cache_key = None
+
+    def immutable(self):
+        """
+        Returns an immutable copy of the query, whose builder methods
+        return a new query instead of modifying it.
+        """
+        query = self._clone()
+        query.is_immutable = True
+        return query
+
+    def _clone(self):
+        # The builder methods assign new values to the attributes, so the
+        # clauses which are not changed are shared with the copy
+        query = copy.copy(self)
+        query._compiled_query = None
+        query._cache_key = None
+        return query
 
 
 class Query(GenericQuery, RawQuery):
@@ -444,6 +565,8 @@ class Query(GenericQuery, RawQuery):
         return initial_query
 
     def _get_prepared_query(self):
+        if self._compiled_query is not None:
+            return self._compiled_query
         initial_query = self._get_initial_query()
         select_clause = self._prepare_select_clause()
         into_clause = self._prepare_into_clause()
@@ -471,14 +594,57 @@ class Query(GenericQuery, RawQuery):
         )
         prepared_query = ' '.join(prepared_query.split())
         prepared_query = prepared_query.strip()
+        if self.is_immutable:
+            self._compiled_query = prepared_query
         return prepared_query
 
+    @property
+    def cache_key(self):
+        """
+        Hash of the compiled query, equal for the queries which compile
+        to the same InfluxQL.
+        """
+        if self._cache_key is not None:
+            return self._cache_key
+        key = self._get_prepared_query()
+        if self.bind_params:
+            key += '\n' + json.dumps(self.bind_params, sort_keys=True)
+        cache_key = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        if self.is_immutable:
+            self._cache_key = cache_key
+        return cache_key
+
     def execute(self):
         prepared_query = self._get_prepared_query()
         # print('prepared_query', prepared_query)
         self.str_query = prepared_query
+        if self.is_immutable or self.bind_params:
+            # An immutable query, or a query whose bound values can change,
+            # is meant to be executed again, its response is not kept
+            return execute_query(prepared_query, self.bind_params)
         return super().execute()
 
+    def bind(self, **bind_params):
+        """
+        Sets the values of the bind parameters of the query, sent apart
+        from the query so that it is not compiled again.
+        """
+        if not bind_params:
+            msg = 'bind parameters should not be empty'
+            raise exceptions.InfluxDBInvalidTypeError(msg)
+        for value in bind_params.values():
+            if not isinstance(value, BIND_PARAM_TYPES):
+                msg = 'bind parameter type must be <str>, <int>, ' \
+                    '<float> or <bool>'
+                raise exceptions.InfluxDBInvalidTypeError(msg)
+        query = self
+        if self.is_immutable:
+            # The compiled query does not depend on the values
+            query = copy.copy(self)
+            query._cache_key = None
+        query.bind_params = dict(self.bind_params, **bind_params)
+        return query
+
     def format(self, result, parser_class=BaseSerializer, **kwargs):
         return parser_class(result, **kwargs).convert()
 
@@ -488,9 +654,209 @@ class Query(GenericQuery, RawQuery):
         formatted_result = self.format(result, parser_class, **kwargs)
         return formatted_result
 
+    def follow(
+        self,
+        interval=DEFAULT_FOLLOW_INTERVAL,
+        lookback=0,
+        start=None,
+        max_polls=None,
+        **format_kwargs
+    ):
+        """
+        Runs the query every `interval` seconds and yields the formatted
+        rows which were not yielded yet.
+
+        After the first poll, only the rows after the last seen time
+        minus `lookback` seconds are selected, so that the points which
+        arrive late are caught without selecting the whole window again.
+        `start` (a timestamp in nanoseconds) restricts the first poll.
+        """
+        lookback_ns = int(lookback * 10 ** 9)
+        last_seen_time = start
+        seen_rows = {}
+        nb_polls = 0
+        while max_polls is None or nb_polls < max_polls:
+            poll_start = time.monotonic()
+            criteria = list(self.selected_criteria)
+            if last_seen_time is not None:
+                since = last_seen_time - lookback_ns
+                criteria.append(Field('time') > since)
+            response = InfluxDBResponse(execute_query(
+                self._get_follow_query(criteria),
+                self.bind_params,
+            ))
+            response.raise_if_error()
+            raw_json, last_seen_time = self._get_new_rows(
+                response,
+                seen_rows,
+                last_seen_time,
+            )
+            # The rows which cannot be selected anymore are forgotten
+            if last_seen_time is not None:
+                since = last_seen_time - lookback_ns
+                seen_rows = {
+                    key: row_time
+                    for key, row_time in seen_rows.items()
+                    if row_time > since
+                }
+            if raw_json is not None:
+                result = InfluxDBResponse(raw_json)
+                yield self.format(result, **format_kwargs)
+            nb_polls += 1
+            if max_polls is None or nb_polls < max_polls:
+                elapsed = time.monotonic() - poll_start
+                time.sleep(max(0, interval - elapsed))
+
+    def _get_follow_query(self, criteria):
+        query = self._clone()
+        query.selected_criteria = criteria
+        return query._get_prepared_query()
+
+    def _get_new_rows(self, response, seen_rows, last_seen_time):
+        new_series = []
+        for serie in response.series:
+            raw_serie = serie.raw
+            columns = raw_serie.get('columns', [])
+            if 'time' not in columns:
+                continue
+            time_index = columns.index('time')
+            tags = tuple(sorted((raw_serie.get('tags') or {}).items()))
+            new_values = []
+            for values in raw_serie.get('values') or []:
+                row_time = values[time_index]
+                key = (raw_serie.get('name'), tags, tuple(values))
+                if key in seen_rows:
+                    continue
+                seen_rows[key] = row_time
+                new_values.append(values)
+                if last_seen_time is None or row_time > last_seen_time:
+                    last_seen_time = row_time
+            if new_values:
+                new_series.append(dict(raw_serie, values=new_values))
+        if not new_series:
+            return None, last_seen_time
+        raw_json = {'results': [{'statement_id': 0, 'series': new_series}]}
+        return raw_json, last_seen_time
+
+    def exists(self):
+        """
+        Returns whether the query selects at least one row, only the
+        first row is read.
+        """
+        str_query = self._get_shortcut_query(
+            self._prepare_select_clause(),
+            limit=1,
+        )
+        response = self._execute_shortcut_query(str_query)
+        return any(serie.values for serie in response.series)
+
+    def count_fast(self, field=None):
+        """
+        Returns the number of points, counted by the server over `field`.
+        Without field, the largest count of the fields of each measurement
+        is returned. The counts of the measurements are summed.
+        """
+        field = field or self._get_count_field()
+        if field != '*':
+            field = '"{}"'.format(field)
+        select_clause = self.select_clause.format(
+            fields=aggregations.Count(field).evaluate(),
+        )
+        str_query = self._get_shortcut_query(select_clause)
+        response = self._execute_shortcut_query(str_query)
+        count = 0
+        for serie in response.series:
+            time_index = serie.columns.index('time')
+            for values in serie.values or []:
+                counts = [
+                    value
+                    for index, value in enumerate(values)
+                    if index != time_index and value is not None
+                ]
+                count += max([0] + counts)
+        return count
+
+    def latest(self, group_by_tags=None):
+        """
+        Returns the last row as a dict, or the last row of each series
+        as {(tag_value, ...): row} when `group_by_tags` is given.
+        """
+        return self._get_edge_rows(group_by_tags, 'DESC')
+
+    def earliest(self, group_by_tags=None):
+        """
+        Returns the first row as a dict, or the first row of each series
+        as {(tag_value, ...): row} when `group_by_tags` is given.
+        """
+        return self._get_edge_rows(group_by_tags, 'ASC')
+
+    def _get_count_field(self):
+        return '*'
+
+    def _get_edge_rows(self, group_by_tags, order):
+        if group_by_tags is not None:
+            self.validate_tags(group_by_tags)
+        str_query = self._get_shortcut_query(
+            self._prepare_select_clause(),
+            group_by_tags=group_by_tags,
+            order_by_clause='ORDER BY time {}'.format(order),
+            limit=1,
+        )
+        response = self._execute_shortcut_query(str_query)
+        names = {serie.raw.get('name') for serie in response.series}
+        if len(names) > 1:
+            msg = 'latest() and earliest() must select a single measurement'
+            raise exceptions.InfluxDBInvalidChoiceError(msg)
+        rows = {}
+        for serie in response.series:
+            if not serie.values:
+                continue
+            tags = serie.raw.get('tags') or {}
+            key = tuple(tags.get(tag) for tag in group_by_tags or [])
+            rows[key] = dict(zip(serie.columns, serie.values[0]))
+        if group_by_tags is None:
+            return rows.get((), None)
+        return rows
+
+    def _get_shortcut_query(
+        self,
+        select_clause,
+        group_by_tags=None,
+        order_by_clause='',
+        limit=None,
+    ):
+        # The clauses are laid out in the order expected by InfluxQL
+        clauses = [
+            select_clause,
+            self._prepare_from_clause(),
+            self._prepare_where_clause(),
+        ]
+        if group_by_tags:
+            tags = ', '.join(group_by_tags)
+            clauses.append(self.group_by_clause.format(tags))
+        clauses.append(order_by_clause)
+        if limit is not None:
+            clauses.append('LIMIT {}'.format(limit))
+        clauses.append(self._prepare_timezone_clause())
+        return ' '.join(clause for clause in clauses if clause)
+
+    def _execute_shortcut_query(self, str_query):
+        response = InfluxDBResponse(
+            execute_query(str_query, self.bind_params),
+        )
+        response.raise_if_error()
+        return response
+
 
 class BulkInsertQuery(RawQuery):
-    @lru_cache(maxsize=None)
+    def __init__(self, str_query='', **write_options):
+        super(BulkInsertQuery, self).__init__(str_query)
+        self.write_options = write_options
+
+    # A write is not memoized: the cache would keep the payload alive
     def _resolve(self, *args, **kwargs):
         instance = Influxable.get_instance()
-        return instance.write_points(points=self.str_query)
+        return instance.write_points(
+            points=self.str_query,
+            **self.write_options,
+        )
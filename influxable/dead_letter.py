@@ -0,0 +1,51 @@
+import re
+import threading
+
+PARTIAL_WRITE_PREFIX = 'partial write:'
+
+# The server names each rejected line on its own error line, and the line
+# itself may contain "': ", so match up to the last one
+REJECTED_LINE_PATTERN = re.compile(r"unable to parse '(.*)': ")
+
+
+class DeadLetterFile:
+    """
+    Appends the lines rejected by the server to a line protocol file,
+    so that they can be fixed and replayed later. When the server does
+    not name them, its error is appended as a comment instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, lines, error):
+        with self._lock:
+            with open(self.path, 'ab') as dead_letter_file:
+                if not lines:
+                    comment = '# unidentified rejected lines : {}\n'.format(
+                        ' '.join(str(error.error).split()),
+                    )
+                    dead_letter_file.write(comment.encode('utf-8'))
+                for line in lines:
+                    dead_letter_file.write(line + b'\n')
+
+
+def get_dead_letter_handler(dead_letter):
+    if dead_letter is None or callable(dead_letter):
+        return dead_letter
+    return DeadLetterFile(dead_letter)
+
+
+def get_rejected_lines(lines, error):
+    if not error:
+        return []
+    rejected_lines = set(
+        line.encode('utf-8')
+        for line in REJECTED_LINE_PATTERN.findall(error)
+    )
+    return [line for line in lines if line in rejected_lines]
+
+
+def is_partial_write(error):
+    return bool(error) and error.startswith(PARTIAL_WRITE_PREFIX)
@@ -33,12 +33,23 @@ def raise_if_error(func):
             if json_res and 'error' in json_res and\
                json_res['error'].endswith('invalid number'):
                 points = kwargs['data']
-                raise exceptions.InfluxDBInvalidNumberError(points)
+                error = json_res['error']
+                raise exceptions.InfluxDBInvalidNumberError(points, error)
 
             if json_res and 'error' in json_res and\
                json_res['error'].endswith('bad timestamp'):
                 points = kwargs['data']
-                raise exceptions.InfluxDBInvalidTimestampError(points)
+                error = json_res['error']
+                raise exceptions.InfluxDBInvalidTimestampError(points, error)
+
+            if res is not None and res.status_code == 400 and \
+               'data' in kwargs:
+                points = kwargs['data']
+                error = json_res.get('error') if json_res else None
+                raise exceptions.InfluxDBInvalidLineProtocolError(
+                    points,
+                    error,
+                )
 
             if res and res.status_code == 400:
                 query = params['q']
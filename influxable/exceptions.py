@@ -10,6 +10,14 @@ class InfluxDBConnectionError(InfluxDBError):
     pass
 
 
+class InfluxDBCircuitOpenError(InfluxDBConnectionError):
+    MESSAGE_PLACEHOLDER = 'Circuit breaker is open for : {endpoint}'
+
+    def __init__(self, endpoint):
+        self.message = self.MESSAGE_PLACEHOLDER.format(endpoint=endpoint)
+        super().__init__(self.message)
+
+
 class InfluxDBInvalidResponseError(InfluxDBError):
     pass
 
@@ -57,20 +65,22 @@ class InfluxDBBadQueryError(InfluxDBError):
         super().__init__(self.message)
 
 
-class InfluxDBInvalidNumberError(InfluxDBError):
-    MESSAGE_PLACEHOLDER = 'Invalid number : {points}'
+class InfluxDBInvalidLineProtocolError(InfluxDBError):
+    MESSAGE_PLACEHOLDER = 'Invalid line protocol : {points}'
 
-    def __init__(self, points):
+    def __init__(self, points, error=None):
+        self.points = points
+        self.error = error
         self.message = self.MESSAGE_PLACEHOLDER.format(points=points)
         super().__init__(self.message)
 
 
-class InfluxDBInvalidTimestampError(InfluxDBError):
-    MESSAGE_PLACEHOLDER = 'Invalid timestamp : {points}'
+class InfluxDBInvalidNumberError(InfluxDBInvalidLineProtocolError):
+    MESSAGE_PLACEHOLDER = 'Invalid number : {points}'
 
-    def __init__(self, points):
-        self.message = self.MESSAGE_PLACEHOLDER.format(points=points)
-        super().__init__(self.message)
+
+class InfluxDBInvalidTimestampError(InfluxDBInvalidLineProtocolError):
+    MESSAGE_PLACEHOLDER = 'Invalid timestamp : {points}'
 
 
 class InfluxDBUnauthorizedError(InfluxDBError):
@@ -83,3 +93,18 @@ class InfluxDBUnauthorizedError(InfluxDBError):
 
 class InfluxDBAttributeValueError(InfluxDBError):
     pass
+
+
+class InfluxDBBatchValidationError(InfluxDBAttributeValueError):
+    MESSAGE_PLACEHOLDER = 'Invalid values in rows : {row_indexes}'
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.message = self.MESSAGE_PLACEHOLDER.format(
+            row_indexes=self.row_indexes,
+        )
+        super().__init__(self.message)
+
+    @property
+    def row_indexes(self):
+        return sorted(set(error['index'] for error in self.errors))
@@ -0,0 +1,186 @@
+import gzip
+import json
+import mmap
+import os
+import threading
+from .api import InfluxDBApi, write_concurrently
+from .payload import get_body_end, get_size_getter, iter_chunked_bodies
+
+DEFAULT_LOAD_BATCH_SIZE = 5000000
+DEFAULT_LOAD_CONCURRENCY = 4
+CHECKPOINT_SUFFIX = '.checkpoint'
+GZIP_MAGIC_NUMBER = b'\x1f\x8b'
+GZIP_READ_SIZE = 1024 * 1024
+
+
+def is_gzip_file(path):
+    with open(path, 'rb') as f:
+        return f.read(len(GZIP_MAGIC_NUMBER)) == GZIP_MAGIC_NUMBER
+
+
+class LoadCheckpoint:
+    """
+    Persists the offset up to which the file has been written.
+
+    The batches are written concurrently and may complete out of order,
+    the offset only moves forward once every batch before it is done.
+    """
+
+    def __init__(self, path, file_path):
+        self.path = path
+        stat = os.stat(file_path)
+        self.fingerprint = {
+            'file': os.path.abspath(file_path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+        }
+        self.offset = 0
+        self._done_batches = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        # A checkpoint of another version of the file is ignored, the
+        # writes of InfluxDB are idempotent so the file is loaded again
+        try:
+            with open(self.path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except (OSError, ValueError):
+            return self.offset
+        if checkpoint.get('fingerprint') == self.fingerprint:
+            self.offset = checkpoint.get('offset', 0)
+        return self.offset
+
+    def mark_done(self, start, end):
+        with self._lock:
+            self._done_batches[start] = end
+            offset = self.offset
+            while offset in self._done_batches:
+                offset = self._done_batches.pop(offset)
+            if offset != self.offset:
+                self.offset = offset
+                self.save()
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as checkpoint_file:
+            json.dump({
+                'fingerprint': self.fingerprint,
+                'offset': self.offset,
+            }, checkpoint_file)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def iter_mapped_batches(mapped_file, start, max_body_size):
+    view = memoryview(mapped_file)
+    get_max_body_size = get_size_getter(max_body_size)
+    while start < len(mapped_file):
+        end = get_body_end(mapped_file, start, get_max_body_size())
+        yield start, end, view[start:end]
+        start = end
+
+
+def iter_gzip_batches(path, start, max_body_size):
+    def iter_chunks(gzip_file):
+        while True:
+            chunk = gzip_file.read(GZIP_READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    with gzip.open(path, 'rb') as gzip_file:
+        # The offset of a checkpoint is in the uncompressed data
+        skipped_size = 0
+        while skipped_size < start:
+            chunk = gzip_file.read(min(GZIP_READ_SIZE, start - skipped_size))
+            if not chunk:
+                return
+            skipped_size += len(chunk)
+        offset = start
+        for body in iter_chunked_bodies(iter_chunks(gzip_file), max_body_size):
+            size = body.size
+            yield offset, offset + size, body
+            offset += size
+
+
+def load_file(
+    request,
+    path,
+    precision='ns',
+    max_body_size=DEFAULT_LOAD_BATCH_SIZE,
+    concurrency=DEFAULT_LOAD_CONCURRENCY,
+    checkpoint_path=None,
+    batch_controller=None,
+    dead_letter=None,
+):
+    """
+    Writes a line protocol file, which can be gzip-compressed, in
+    batches cut on line boundaries and sent concurrently. An interrupted
+    load is resumed from its checkpoint file.
+    """
+    checkpoint = LoadCheckpoint(
+        checkpoint_path or path + CHECKPOINT_SUFFIX,
+        path,
+    )
+    start = checkpoint.load()
+    stats = {'resumed_from': start, 'batches': 0, 'bytes': 0}
+    stats_lock = threading.Lock()
+
+    body_size = max_body_size
+    batch_concurrency = concurrency
+    max_workers = concurrency
+    if batch_controller is not None:
+        def body_size():
+            return min(max_body_size, batch_controller.batch_size)
+
+        def batch_concurrency():
+            return batch_controller.concurrency
+        max_workers = batch_controller.max_concurrency
+
+    def write_body(body, size):
+        InfluxDBApi.write_points(
+            request,
+            body,
+            precision=precision,
+            max_body_size=size,
+            dead_letter=dead_letter,
+        )
+
+    def send_batch(batch):
+        batch_start, batch_end, body = batch
+        size = batch_end - batch_start
+        if batch_controller is not None:
+            batch_controller.send(write_body, body, size)
+        else:
+            write_body(body, size)
+        checkpoint.mark_done(batch_start, batch_end)
+        with stats_lock:
+            stats['batches'] += 1
+            stats['bytes'] += size
+
+    if is_gzip_file(path):
+        batches = iter_gzip_batches(path, start, body_size)
+        write_concurrently(send_batch, batches, batch_concurrency, max_workers)
+    elif os.path.getsize(path) > start:
+        with open(path, 'rb') as f:
+            mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            batches = iter_mapped_batches(mapped_file, start, body_size)
+            write_concurrently(
+                send_batch,
+                batches,
+                batch_concurrency,
+                max_workers,
+            )
+        finally:
+            try:
+                mapped_file.close()
+            except BufferError:
+                # Batches still referenced, e.g. by a traceback, keep the
+                # file mapped until they are collected
+                pass
+    checkpoint.remove()
+    return stats
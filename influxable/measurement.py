@@ -1,37 +1,152 @@
 import os
+import pandas as pd
+from collections import namedtuple
+from decimal import Decimal as D
+from types import MappingProxyType
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader
 from .attributes import BaseAttribute, GenericFieldAttribute, \
-    TagFieldAttribute, TimestampFieldAttribute
-from .db.query import Query, BulkInsertQuery
+    TagFieldAttribute, TimestampFieldAttribute, NANOSECONDS_PER_SECOND
+from .db.query import Query, BulkInsertQuery, query_builder
+from .parser import parse_lines
 from .response import InfluxDBResponse
 from .serializers import MeasurementPointSerializer
-from .exceptions import InfluxDBAttributeValueError
+from .exceptions import InfluxDBAttributeValueError, \
+    InfluxDBBatchValidationError
 
 EXTENDED_ATTRIBUTE_PREFIX_NAME = '__attribute__'
 
 TEMPLATE_FILE_NAME = 'simple_measurement.py.jinja'
 
+MeasurementSchema = namedtuple('MeasurementSchema', [
+    'attributes',
+    'tags',
+    'fields',
+    'timestamps',
+    'attribute_names',
+    'timestamp_names',
+    'required_attribute_names',
+    'ext_attribute_names',
+])
+
+
+def build_schema(attributes):
+    """
+    Computes once the schema of a measurement class from its attributes,
+    in their declaration order.
+    """
+    attributes = tuple(attributes)
+    return MeasurementSchema(
+        attributes=attributes,
+        tags=tuple(
+            attr for attr in attributes
+            if isinstance(attr, TagFieldAttribute)
+        ),
+        fields=tuple(
+            attr for attr in attributes
+            if isinstance(attr, GenericFieldAttribute)
+        ),
+        timestamps=tuple(
+            attr for attr in attributes
+            if isinstance(attr, TimestampFieldAttribute)
+        ),
+        attribute_names=tuple(attr.attribute_name for attr in attributes),
+        timestamp_names=tuple(
+            attr.attribute_name for attr in attributes
+            if isinstance(attr, TimestampFieldAttribute)
+        ),
+        required_attribute_names=tuple(
+            attr.attribute_name for attr in attributes
+            if not attr.default and not attr.is_nullable
+        ),
+        ext_attribute_names=MappingProxyType({
+            attr.attribute_name: attr.ext_attribute_name
+            for attr in attributes
+        }),
+    )
+
 
 class MeasurementMeta(type):
     def __init__(cls, name, *args, **kwargs):
         super(MeasurementMeta, cls).__init__(name, *args, **kwargs)
         attribute_names = cls._get_attribute_names()
         cls._extend_attributes(attribute_names)
+        cls._schema = build_schema(
+            getattr(cls, EXTENDED_ATTRIBUTE_PREFIX_NAME + attribute_name)
+            for attribute_name in attribute_names
+        )
 
         get_query = cls._factory_get_query()
         setattr(cls, 'get_query', get_query)
 
-    def __call__(cls, *args, **kwargs):
-        setattr(cls, '_get_attributes', cls._get_attributes)
-        instance = type.__call__(cls, *args, **kwargs)
-        return instance
-
     def _factory_get_query(cls):
         def get_query():
             class MeasurementQuery(Query):
                 def __init__(self):
                     super(MeasurementQuery, self).__init__()
+                    # The time is always returned by the server
+                    self._set_projection([
+                        name
+                        for name in cls._schema.attribute_names
+                        if name not in cls._schema.timestamp_names
+                    ])
+
+                def validate_attribute_names(self, attribute_names):
+                    for name in attribute_names:
+                        if name not in cls._schema.ext_attribute_names:
+                            msg = '\'{}\' is not an attribute of {}'.format(
+                                name,
+                                cls.__name__,
+                            )
+                            raise InfluxDBAttributeValueError(msg)
+
+                def validate_projection(self, attribute_names):
+                    # The server returns no rows without any field
+                    field_names = {
+                        attr.attribute_name for attr in cls._schema.fields
+                    }
+                    if field_names.isdisjoint(attribute_names):
+                        msg = 'at least one field must be selected'
+                        raise InfluxDBAttributeValueError(msg)
+
+                @query_builder
+                def only(self, *attribute_names):
+                    self.validate_attribute_names(attribute_names)
+                    projected_attribute_names = [
+                        name
+                        for name in attribute_names
+                        if name not in cls._schema.timestamp_names
+                    ]
+                    self.validate_projection(projected_attribute_names)
+                    self._set_projection(projected_attribute_names)
+                    return self
+
+                @query_builder
+                def defer(self, *attribute_names):
+                    self.validate_attribute_names(attribute_names)
+                    projected_attribute_names = [
+                        name
+                        for name in self.projected_attribute_names
+                        if name not in attribute_names
+                    ]
+                    self.validate_projection(projected_attribute_names)
+                    self._set_projection(projected_attribute_names)
+                    return self
+
+                def _get_count_field(self):
+                    for attr in cls._schema.fields:
+                        name = attr.attribute_name
+                        if name in self.projected_attribute_names:
+                            return name
+                    return '*'
+
+                def _set_projection(self, attribute_names):
+                    self.projected_attribute_names = list(attribute_names)
+                    if attribute_names:
+                        self.default_selected_fields = ','.join(
+                            '"{}"'.format(name.replace('"', '\\"'))
+                            for name in attribute_names
+                        )
 
                 def format(self, result, parser_class=cls.parser_class):
                     return parser_class(result, cls).convert()
@@ -51,20 +166,6 @@ class MeasurementMeta(type):
         attribute_names = list(filter(filter_func, variables))
         return attribute_names
 
-    def _get_attributes(cls):
-        def filter_func(x):
-            return isinstance(x, BaseAttribute)
-        variables = cls.__dict__.values()
-        attributes = list(filter(filter_func, variables))
-        return attributes
-
-    def _get_timestamp_attributes(cls):
-        def filter_func(x):
-            return isinstance(x, TimestampFieldAttribute)
-        attributes = cls._get_attributes()
-        timestamp_attributes = list(filter(filter_func, attributes))
-        return timestamp_attributes
-
     def _extend_attributes(cls, attribute_names):
         def generate_getter_and_setter(attr_name):
             def getx(self):
@@ -92,94 +193,74 @@ class Measurement(object, metaclass=MeasurementMeta):
     parser_class = MeasurementPointSerializer
     measurement_name = 'default'
 
-    def __init__(self, **kwargs):
+    def __init__(self, trusted=False, **kwargs):
+        if trusted:
+            self.clone_attributes()
+            self.fill_trusted_values(**kwargs)
+            return
         self.check_attribute_values(**kwargs)
         self.clone_attributes()
         self.fill_values(**kwargs)
 
+    @classmethod
+    def _get_attributes(cls):
+        return list(cls._schema.attributes)
+
+    @classmethod
+    def _get_timestamp_attributes(cls):
+        return list(cls._schema.timestamps)
+
     def check_attribute_values(self, **kwargs):
-        def filter_required_attributes(x):
-            return not x.default and not x.is_nullable
-
-        attributes = self._get_attributes()
-        required_attributes = list(filter(
-            filter_required_attributes,
-            attributes,
-        ))
-        required_attributes_names = [
-            r.attribute_name
-            for r in required_attributes
-        ]
-        for key in required_attributes_names:
+        for key in self._schema.required_attribute_names:
             if key not in kwargs:
                 raise InfluxDBAttributeValueError(
                     'The attribute \'{}\' cannot be nullable'.format(key)
                 )
 
     def clone_attributes(self):
-        attributes = self._get_attributes()
-        for attr in attributes:
-            cloned_attribute = attr.clone()
-            cloned_attribute.attribute_name = attr.attribute_name
-            cloned_attribute.ext_attribute_name = attr.ext_attribute_name
-            setattr(self, attr.ext_attribute_name, cloned_attribute)
+        # The attributes of the class are validated when it is created and
+        # never hold a value, copying them is enough
+        self.__dict__.update({
+            attr.ext_attribute_name: attr.copy()
+            for attr in self._schema.attributes
+        })
 
     def dict(self):
-        dict_values = {}
-        attributes = self.get_attributes()
-        for attr in attributes:
-            dict_values[attr.attribute_name] = getattr(self, attr.attribute_name)
-        return dict_values
+        return {
+            attr.attribute_name: attr.get_internal_value()
+            for attr in self.get_attributes()
+        }
 
     def get_attributes(self):
-        def filter_func(x):
-            return isinstance(x, BaseAttribute)
-        variables = self.__dict__.values()
-        attributes = list(filter(filter_func, variables))
-        return attributes
+        values = self.__dict__
+        return [
+            values[attr.ext_attribute_name]
+            for attr in self._schema.attributes
+        ]
 
     def get_attribute_names(self):
-        attributes = self.get_attributes()
-        attribute_names = [attr.attribute_name for attr in attributes]
-        return attribute_names
+        return list(self._schema.attribute_names)
 
     def get_ext_attribute_names(self):
-        attributes = self.get_attributes()
-        attribute_names = [attr.ext_attribute_name for attr in attributes]
-        return attribute_names
+        return list(self._schema.ext_attribute_names.values())
 
     def get_timestamp_attributes(self):
-        def filter_func(x):
-            return isinstance(x, TimestampFieldAttribute)
-        attributes = self.get_attributes()
-        timestamp_attributes = list(filter(filter_func, attributes))
-        return timestamp_attributes
+        values = self.__dict__
+        return [
+            values[attr.ext_attribute_name]
+            for attr in self._schema.timestamps
+        ]
 
     def get_prep_value(self):
-        def factory_filter_func(cls):
-            def filter_func(attr):
-                return isinstance(attr, cls)
-            return filter_func
-
-        attributes = self.get_attributes()
-        field_attributes = list(filter(
-            factory_filter_func(GenericFieldAttribute),
-            attributes,
-        ))
-        tag_attributes = list(filter(
-            factory_filter_func(TagFieldAttribute),
-            attributes,
-        ))
-        timestamp_attributes = list(filter(
-            factory_filter_func(TimestampFieldAttribute),
-            attributes,
-        ))
+        schema = self._schema
+        values = self.__dict__
 
         prep_value_groups = []
-        attributes_groups = [tag_attributes, field_attributes, timestamp_attributes]
+        attributes_groups = [schema.tags, schema.fields, schema.timestamps]
         for attr_group in attributes_groups:
             prep_value_group = []
-            for attr in attr_group:
+            for cls_attr in attr_group:
+                attr = values[cls_attr.ext_attribute_name]
                 if attr.raw_value is not None:
                     attr_prep_value = attr.get_prep_value()
                     attr_name = attr.name or attr.attribute_name
@@ -209,23 +290,243 @@ class Measurement(object, metaclass=MeasurementMeta):
             msg = '<\'{key}\'> : {msg}'.format(key=key, msg=err)
             raise InfluxDBAttributeValueError(msg)
 
+    def fill_trusted_values(self, **kwargs):
+        ext_attribute_names = self._schema.ext_attribute_names
+        for key, value in kwargs.items():
+            ext_attribute_name = ext_attribute_names.get(key)
+            attribute_field = self.__dict__.get(ext_attribute_name)
+            if attribute_field is None:
+                setattr(self, key, value)
+            else:
+                attribute_field.set_trusted_value(value)
+
+    def fill_validated_values(self, **kwargs):
+        ext_attribute_names = self._schema.ext_attribute_names
+        try:
+            for key, value in kwargs.items():
+                ext_attribute_name = ext_attribute_names.get(key)
+                attribute_field = self.__dict__.get(ext_attribute_name)
+                if attribute_field is None:
+                    setattr(self, key, value)
+                else:
+                    attribute_field.set_internal_value(value, validate=False)
+        except Exception as err:
+            msg = '<\'{key}\'> : {msg}'.format(key=key, msg=err)
+            raise InfluxDBAttributeValueError(msg)
+
     def items(self):
         return self.dict().items()
 
-    @staticmethod
-    def bulk_save(points):
+    @classmethod
+    def validate_batch(cls, data):
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        errors = []
+        for attr in cls._schema.attributes:
+            attr_name = attr.attribute_name
+            if attr_name in df.columns:
+                values = df[attr_name]
+            else:
+                values = pd.Series(None, index=df.index, dtype=object)
+            for mask, message in attr.validate_column(values):
+                mask = mask.fillna(False).to_numpy(dtype=bool)
+                errors.extend({
+                    'index': index,
+                    'attribute': attr_name,
+                    'message': message,
+                } for index in df.index[mask])
+        if errors:
+            raise InfluxDBBatchValidationError(errors)
+
+    @classmethod
+    def _from_values(cls, values, trusted=False):
+        if trusted:
+            return cls(trusted=True, **values)
+        # The values have already been validated with validate_batch()
+        instance = cls(trusted=True)
+        instance.fill_validated_values(**values)
+        return instance
+
+    @classmethod
+    def _from_db(cls, columns, values):
+        """
+        Creates the points of a serie returned by the server, whose
+        timestamps are in nanoseconds. The columns are mapped to the
+        attributes once and the values are cast without being validated.
+        """
+        schema = cls._schema
+        timestamp_names = set(schema.timestamp_names)
+        attribute_columns = []
+        other_columns = []
+        for index, column in enumerate(columns):
+            ext_attribute_name = schema.ext_attribute_names.get(column)
+            if ext_attribute_name is None:
+                other_columns.append((index, column))
+            else:
+                is_timestamp = column in timestamp_names
+                attribute_columns.append(
+                    (index, ext_attribute_name, is_timestamp),
+                )
+
+        points = []
+        for row in values:
+            point = cls.__new__(cls)
+            point.clone_attributes()
+            point_attributes = point.__dict__
+            for index, ext_attribute_name, is_timestamp in attribute_columns:
+                value = row[index]
+                if is_timestamp and value is not None:
+                    value = D(value) / NANOSECONDS_PER_SECOND
+                point_attributes[ext_attribute_name].set_internal_value(
+                    value,
+                    validate=False,
+                )
+            for index, column in other_columns:
+                setattr(point, column, row[index])
+            points.append(point)
+        return points
+
+    @classmethod
+    def _from_db_value(cls, attribute_name, value):
+        """
+        Returns the python value of a value of `attribute_name` returned
+        by the server, as `_from_db()` would set it.
+        """
+        schema = cls._schema
+        ext_attribute_name = schema.ext_attribute_names[attribute_name]
+        if value is not None and attribute_name in schema.timestamp_names:
+            value = D(value) / NANOSECONDS_PER_SECOND
+        attribute_field = getattr(cls, ext_attribute_name).copy()
+        attribute_field.set_internal_value(value, validate=False)
+        return attribute_field.get_internal_value()
+
+    @classmethod
+    def iter_encoded_points(cls, points, trusted=False):
         if not isinstance(points, list):
             raise InfluxDBAttributeValueError('points must be a list')
-        str_points = ''
+        dict_points = [point for point in points if isinstance(point, dict)]
+        if dict_points and not trusted:
+            cls.validate_batch(dict_points)
         for point in points:
+            if isinstance(point, dict):
+                point = cls._from_values(point, trusted)
             if not isinstance(point, Measurement):
                 raise InfluxDBAttributeValueError(
                     'type of point must be Measurement'
                 )
-            prep_value = point.get_prep_value()
-            str_points += prep_value
-            str_points += '\n'
-        return BulkInsertQuery(str_points).execute()
+            yield point.get_prep_value()
+
+    @classmethod
+    def encode_points(cls, points, trusted=False):
+        return list(cls.iter_encoded_points(points, trusted))
+
+    @classmethod
+    def encode_points_to_buffer(cls, points, buffer=None, trusted=False):
+        """
+        Appends the line protocol of the points to `buffer`, a bytearray
+        or a binary stream such as io.BytesIO, and returns it.
+        """
+        if buffer is None:
+            buffer = bytearray()
+        write = getattr(buffer, 'write', None) or buffer.extend
+        for line in cls.iter_encoded_points(points, trusted):
+            write(line.encode('utf-8'))
+            write(b'\n')
+        return buffer
+
+    @classmethod
+    def bulk_save(
+        cls,
+        points,
+        dead_letter=None,
+        trusted=False,
+        batch_controller=None,
+    ):
+        encoded_points = cls.encode_points_to_buffer(points, trusted=trusted)
+        write_options = {}
+        if dead_letter is not None:
+            write_options['dead_letter'] = dead_letter
+        if batch_controller is not None:
+            write_options['batch_controller'] = batch_controller
+        return BulkInsertQuery(encoded_points, **write_options).execute()
+
+    @classmethod
+    def from_dataframe(cls, df, trusted=False):
+        if not trusted:
+            cls.validate_batch(df)
+        df = df.astype(object).where(df.notna(), None)
+        columns = [str(column) for column in df.columns]
+        rows = zip(*[df[column].tolist() for column in df.columns])
+        return cls._from_rows(columns, rows, trusted)
+
+    @classmethod
+    def _from_rows(cls, columns, rows, trusted=False):
+        """
+        Creates the points of rows of values which are either trusted or
+        already validated, the columns being mapped to the attributes
+        once.
+        """
+        ext_attribute_names = cls._schema.ext_attribute_names
+        attribute_columns = []
+        other_columns = []
+        for index, column in enumerate(columns):
+            ext_attribute_name = ext_attribute_names.get(column)
+            if ext_attribute_name is None:
+                other_columns.append((index, column))
+            else:
+                attribute_columns.append((index, ext_attribute_name))
+
+        points = []
+        for row in rows:
+            point = cls.__new__(cls)
+            point.clone_attributes()
+            point_attributes = point.__dict__
+            for index, ext_attribute_name in attribute_columns:
+                attribute_field = point_attributes[ext_attribute_name]
+                if trusted:
+                    attribute_field.set_trusted_value(row[index])
+                    continue
+                try:
+                    attribute_field.set_internal_value(
+                        row[index],
+                        validate=False,
+                    )
+                except Exception as err:
+                    msg = '<\'{key}\'> : {msg}'.format(
+                        key=columns[index],
+                        msg=err,
+                    )
+                    raise InfluxDBAttributeValueError(msg)
+            for index, column in other_columns:
+                setattr(point, column, row[index])
+            points.append(point)
+        return points
+
+    @classmethod
+    def from_line_protocol(cls, data, precision='ns', trusted=False):
+        """
+        Creates the measurement points of the lines of `data` whose
+        measurement is `measurement_name`, the other lines are skipped.
+        """
+        points = parse_lines(data, precision)
+        return cls._from_parsed_points(points, trusted)
+
+    @classmethod
+    def _from_parsed_points(cls, points, trusted=False):
+        timestamp_names = cls._schema.timestamp_names
+        records = []
+        for point in points:
+            if point.measurement != cls.measurement_name:
+                continue
+            record = dict(point.tags)
+            record.update(point.fields)
+            if point.time is not None:
+                seconds = D(point.time) / NANOSECONDS_PER_SECOND
+                for timestamp_name in timestamp_names:
+                    record[timestamp_name] = seconds
+            records.append(record)
+        if records and not trusted:
+            cls.validate_batch(records)
+        return [cls._from_values(record, trusted) for record in records]
 
 
 def SimpleMeasurement(measurement_name, field_names, tag_names=[]):
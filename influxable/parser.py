@@ -0,0 +1,238 @@
+import codecs
+import re
+import pandas as pd
+from collections import namedtuple
+from .exceptions import InfluxDBInvalidLineProtocolError
+
+READ_SIZE = 1024 * 1024
+
+NANOSECONDS_PER_UNIT = {
+    'ns': 1,
+    'u': 1000,
+    'ms': 1000 * 1000,
+    's': 1000 * 1000 * 1000,
+    'm': 60 * 1000 * 1000 * 1000,
+    'h': 60 * 60 * 1000 * 1000 * 1000,
+}
+
+TRUE_VALUES = frozenset(['t', 'T', 'true', 'True', 'TRUE'])
+FALSE_VALUES = frozenset(['f', 'F', 'false', 'False', 'FALSE'])
+
+STRING_ESCAPE_PATTERN = re.compile(r'\\(["\\])')
+
+KEY_REGEX = r'(?:\\.|[^\\,= ])+'
+FIELD_VALUE_REGEX = r'"(?:\\.|[^"\\])*"|[^,\s"]+'
+TAG_PATTERN = re.compile(r',({key})=({key})'.format(key=KEY_REGEX))
+FIELD_PATTERN = re.compile(r'({key})=({value})'.format(
+    key=KEY_REGEX,
+    value=FIELD_VALUE_REGEX,
+))
+LINE_PATTERN = re.compile(
+    r'(?P<measurement>(?:\\.|[^\\, ])+)'
+    r'(?P<tags>(?:,{key}={key})*)'
+    r' (?P<fields>{field}(?:,{field})*)'
+    r'(?: (?P<time>-?[0-9]+))?'.format(
+        key=KEY_REGEX,
+        field=FIELD_PATTERN.pattern,
+    )
+)
+
+ParsedPoint = namedtuple(
+    'ParsedPoint',
+    ['measurement', 'tags', 'fields', 'time'],
+)
+
+
+def unescape_key(key):
+    if '\\' not in key:
+        return key
+    return key.replace('\\,', ',').replace('\\=', '=').replace('\\ ', ' ')
+
+
+def unescape_string(value):
+    if '\\' not in value:
+        return value
+    if '\\\\' in value:
+        return STRING_ESCAPE_PATTERN.sub(r'\1', value)
+    return value.replace('\\"', '"')
+
+
+def parse_field_value(value):
+    if not value:
+        raise ValueError('missing field value')
+    if value[0] == '"':
+        if len(value) < 2 or value[-1] != '"':
+            raise ValueError('unterminated string {}'.format(value))
+        return unescape_string(value[1:-1])
+    last_char = value[-1]
+    if last_char == 'i' or last_char == 'u':
+        return int(value[:-1])
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return float(value)
+
+
+def parse_line(line, multiplier=1):
+    """
+    Parses a line of line protocol into a ParsedPoint whose time is in
+    nanoseconds, `multiplier` being the number of nanoseconds of the
+    precision of the line.
+    """
+    if '\\' not in line and '"' not in line:
+        # Fast path for the lines without escaped characters nor strings
+        sections = line.split(' ')
+        if len(sections) not in (2, 3) or not sections[1]:
+            raise ValueError('invalid number of sections')
+        keys = sections[0].split(',')
+        tags = dict(tag.split('=', 1) for tag in keys[1:])
+        fields = {}
+        for field in sections[1].split(','):
+            key, value = field.split('=', 1)
+            fields[key] = parse_field_value(value)
+        time = None
+        if len(sections) == 3:
+            time = int(sections[2]) * multiplier
+        return ParsedPoint(keys[0], tags, fields, time)
+
+    match = LINE_PATTERN.fullmatch(line)
+    if match is None:
+        raise ValueError('invalid syntax')
+    measurement = unescape_key(match.group('measurement'))
+    tags = {
+        unescape_key(key): unescape_key(value)
+        for key, value in TAG_PATTERN.findall(match.group('tags'))
+    }
+    fields = {
+        unescape_key(key): parse_field_value(value)
+        for key, value in FIELD_PATTERN.findall(match.group('fields'))
+    }
+    time = None
+    if match.group('time'):
+        time = int(match.group('time')) * multiplier
+    return ParsedPoint(measurement, tags, fields, time)
+
+
+def iter_text_lines(data):
+    if isinstance(data, str):
+        yield from data.splitlines()
+        return
+    try:
+        yield from str(memoryview(data), 'utf-8').splitlines()
+        return
+    except TypeError:
+        pass
+
+    if hasattr(data, 'read'):
+        def iter_chunks():
+            while True:
+                chunk = data.read(READ_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+        chunks = iter_chunks()
+    else:
+        chunks = iter(data)
+
+    # The chunks of a stream are not cut on line nor character boundaries
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    tail = ''
+    for chunk in chunks:
+        if not isinstance(chunk, str):
+            chunk = decoder.decode(chunk)
+        lines = (tail + chunk).split('\n')
+        tail = lines.pop()
+        yield from lines
+    tail += decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def parse_lines(data, precision='ns'):
+    """
+    Parses line protocol from a str, a bytes-like object, a file opened
+    in text or binary mode or an iterable of chunks. The empty lines and
+    the comments are skipped.
+    """
+    multiplier = NANOSECONDS_PER_UNIT[precision]
+    try:
+        for line_number, line in enumerate(iter_text_lines(data), 1):
+            line = line.strip()
+            if not line or line[0] == '#':
+                continue
+            try:
+                yield parse_line(line, multiplier)
+            except ValueError as err:
+                error = 'line {} : {}'.format(line_number, err)
+                raise InfluxDBInvalidLineProtocolError(line, error)
+    except UnicodeDecodeError as err:
+        error = 'invalid UTF-8 : {}'.format(err)
+        raise InfluxDBInvalidLineProtocolError(bytes(err.object[:80]), error)
+
+
+def get_columns(points):
+    """
+    Groups parsed points into columns for each measurement:
+    {measurement: {'time': [...], tag_or_field: [...]}}. The missing
+    values are None. A key cannot be both a tag and a field of a
+    measurement, nor be 'time', since they would share a column.
+    """
+    batches = {}
+    for point in points:
+        batch = batches.get(point.measurement)
+        if batch is None:
+            batch = batches[point.measurement] = [0, {'time': []}, {}]
+        nb_rows, columns, key_kinds = batch
+        for kind, values in (('tag', point.tags), ('field', point.fields)):
+            for key, value in values.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * nb_rows
+                    key_kinds[key] = kind
+                elif key_kinds.get(key) != kind:
+                    error = 'the key \'{}\' of \'{}\' is {}'.format(
+                        key,
+                        point.measurement,
+                        'reserved' if key == 'time' else 'a tag and a field',
+                    )
+                    raise InfluxDBInvalidLineProtocolError(point, error)
+                column.append(value)
+        columns['time'].append(point.time)
+        nb_rows += 1
+        batch[0] = nb_rows
+        if len(columns) > len(point.tags) + len(point.fields) + 1:
+            for column in columns.values():
+                if len(column) < nb_rows:
+                    column.append(None)
+    return {
+        measurement: columns
+        for measurement, (nb_rows, columns, key_kinds) in batches.items()
+    }
+
+
+def parse_columns(data, precision='ns'):
+    """
+    Parses line protocol into columns for each measurement, see
+    get_columns().
+    """
+    return get_columns(parse_lines(data, precision))
+
+
+def parse_dataframe(data, precision='ns', measurement=None):
+    """
+    Parses line protocol into a DataFrame with a `measurement` column, or
+    only the points of `measurement` when it is given.
+    """
+    batches = parse_columns(data, precision)
+    if measurement is not None:
+        return pd.DataFrame(batches.get(measurement, {'time': []}))
+    dfs = [
+        pd.DataFrame(columns).assign(measurement=measurement_name)
+        for measurement_name, columns in batches.items()
+    ]
+    if not dfs:
+        return pd.DataFrame({'measurement': [], 'time': []})
+    df = pd.concat(dfs, ignore_index=True, sort=False)
+    columns = ['measurement'] + [c for c in df.columns if c != 'measurement']
+    return df[columns]
@@ -0,0 +1,179 @@
+import io
+
+DEFAULT_MAX_BODY_SIZE = 25000000
+NEWLINE_SEARCH_WINDOW = 65536
+STREAM_CHUNK_SIZE = 65536
+
+
+def get_byte_view(buffer):
+    if isinstance(buffer, io.BytesIO):
+        buffer = buffer.getbuffer()
+    return memoryview(buffer).cast('B')
+
+
+def is_buffer(points):
+    try:
+        memoryview(points)
+    except TypeError:
+        return isinstance(points, io.BytesIO)
+    return True
+
+
+def rfind_newline(buffer, start, end):
+    if not isinstance(buffer, memoryview):
+        return buffer.rfind(b'\n', start, end)
+    # A memoryview has no rfind(), only small windows of it are copied
+    while end > start:
+        window_start = max(start, end - NEWLINE_SEARCH_WINDOW)
+        index = bytes(buffer[window_start:end]).rfind(b'\n')
+        if index >= 0:
+            return window_start + index
+        end = window_start
+    return -1
+
+
+def find_newline(buffer, start):
+    if not isinstance(buffer, memoryview):
+        return buffer.find(b'\n', start)
+    while start < len(buffer):
+        window_end = min(len(buffer), start + NEWLINE_SEARCH_WINDOW)
+        index = bytes(buffer[start:window_end]).find(b'\n')
+        if index >= 0:
+            return start + index
+        start = window_end
+    return -1
+
+
+def get_body_end(encoded_points, start, max_body_size):
+    total_size = len(encoded_points)
+    end = start + max_body_size
+    if end >= total_size:
+        return total_size
+    newline_index = rfind_newline(encoded_points, start, end)
+    if newline_index >= start:
+        return newline_index + 1
+    # A single line larger than the ceiling is sent alone
+    newline_index = find_newline(encoded_points, max(start, end))
+    return total_size if newline_index < 0 else newline_index + 1
+
+
+def get_size_getter(max_body_size):
+    if callable(max_body_size):
+        return max_body_size
+    return lambda: max_body_size
+
+
+def split_points(encoded_points, max_body_size=DEFAULT_MAX_BODY_SIZE):
+    """
+    Splits a bytes-like payload on line boundaries into memoryviews of
+    at most `max_body_size` bytes, which can be a callable read before
+    each body. The payload is never copied.
+    """
+    get_max_body_size = get_size_getter(max_body_size)
+    view = get_byte_view(encoded_points)
+    search_buffer = encoded_points
+    if not hasattr(search_buffer, 'rfind'):
+        search_buffer = view
+    start = 0
+    total_size = len(view)
+    if not total_size:
+        yield view
+    while start < total_size:
+        end = get_body_end(search_buffer, start, get_max_body_size())
+        yield view[start:end]
+        start = end
+
+
+class ChunkedBody:
+    """
+    Body made of byte chunks, sent with the chunked transfer encoding.
+    It can be iterated several times, so that the request can be retried.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            for start in range(0, len(chunk), STREAM_CHUNK_SIZE):
+                yield chunk[start:start + STREAM_CHUNK_SIZE]
+
+    @property
+    def size(self):
+        return sum(len(chunk) for chunk in self.chunks)
+
+    def tobytes(self):
+        return b''.join(self.chunks)
+
+
+def iter_chunked_bodies(chunks, max_body_size=DEFAULT_MAX_BODY_SIZE):
+    """
+    Groups an iterable of byte chunks into chunked bodies of at most
+    `max_body_size` bytes, cut on line boundaries. The chunks are only
+    sliced, never copied.
+    """
+    get_max_body_size = get_size_getter(max_body_size)
+    pieces = []
+    size = 0
+    # Position just after the last newline of the body being built
+    boundary = None
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        view = get_byte_view(chunk)
+        start = 0
+        while start < len(view):
+            end = start + get_max_body_size() - size
+            if end >= len(view):
+                piece = view[start:]
+                newline_index = rfind_newline(piece, 0, len(piece))
+                if newline_index >= 0:
+                    boundary = (len(pieces), newline_index + 1)
+                pieces.append(piece)
+                size += len(piece)
+                break
+
+            newline_index = rfind_newline(view, start, end)
+            if newline_index >= start:
+                pieces.append(view[start:newline_index + 1])
+                yield ChunkedBody(pieces)
+                pieces, size, boundary = [], 0, None
+                start = newline_index + 1
+            elif boundary is not None:
+                index, offset = boundary
+                yield ChunkedBody(pieces[:index] + [pieces[index][:offset]])
+                pieces = [pieces[index][offset:]] + pieces[index + 1:]
+                pieces = [piece for piece in pieces if len(piece)]
+                size = sum(len(piece) for piece in pieces)
+                boundary = None
+            else:
+                # A single line larger than the ceiling is sent alone
+                newline_index = find_newline(view, max(start, end))
+                if newline_index < 0:
+                    pieces.append(view[start:])
+                    size += len(view) - start
+                    break
+                pieces.append(view[start:newline_index + 1])
+                yield ChunkedBody(pieces)
+                pieces, size, boundary = [], 0, None
+                start = newline_index + 1
+    if pieces:
+        yield ChunkedBody(pieces)
+
+
+def iter_bodies(points, max_body_size=DEFAULT_MAX_BODY_SIZE):
+    """
+    Yields the bodies of the requests writing `points`, which can be a
+    str, a bytes-like object, an io.BytesIO or an iterable of chunks.
+    """
+    if isinstance(points, str):
+        points = points.encode('utf-8')
+    if is_buffer(points):
+        return split_points(points, max_body_size)
+    return iter_chunked_bodies(points, max_body_size)
+
+
+def get_body_bytes(body):
+    if isinstance(body, bytes):
+        return body
+    return body.tobytes()
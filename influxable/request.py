@@ -1,10 +1,45 @@
 import requests
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+from .adapters import UNIX_SOCKET_SCHEME, UnixSocketAdapter, \
+    get_unix_socket_url, is_unix_socket_url
 from .decorators import raise_if_error
 
+READ_QUERY_PREFIXES = ('SELECT', 'SHOW')
+
+
+class RequestKind:
+    ADMIN = 'admin'
+    QUERY = 'query'
+    WRITE = 'write'
+
+
+REQUEST_KINDS = [RequestKind.ADMIN, RequestKind.QUERY, RequestKind.WRITE]
+
+IDEMPOTENT_REQUEST_KINDS = [RequestKind.QUERY, RequestKind.WRITE]
+
+
+def get_request_kind(url, params=None):
+    path = urlparse(url).path
+    if path.endswith('/write'):
+        return RequestKind.WRITE
+    if path.endswith('/query'):
+        query = (params or {}).get('q', '')
+        query = ' '.join(str(query).split()).upper()
+        is_read_query = query.startswith(READ_QUERY_PREFIXES) \
+            and ' INTO ' not in query
+        return RequestKind.QUERY if is_read_query else RequestKind.ADMIN
+    return RequestKind.QUERY
+
 
 class InfluxDBRequest(requests.Session):
-    def __init__(self, base_url, database_name, auth=None, token=None):
+    def __init__(
+        self,
+        base_url,
+        database_name,
+        auth=None,
+        token=None,
+        retry_policies=None,
+    ):
         super().__init__()
         self.base_url = base_url
         self.database_name = database_name
@@ -18,37 +53,69 @@ class InfluxDBRequest(requests.Session):
         elif auth:
             self.auth = auth
 
+        if is_unix_socket_url(base_url):
+            self.mount(UNIX_SOCKET_SCHEME + '://', UnixSocketAdapter())
+
+        self.retry_policies = retry_policies or {}
+        self.circuit_breakers = {}
+        for kind, retry_policy in self.retry_policies.items():
+            endpoint = '{} ({})'.format(base_url, kind)
+            circuit_breaker = retry_policy.create_circuit_breaker(endpoint)
+            self.circuit_breakers[kind] = circuit_breaker
+
+    def build_url(self, url):
+        if urlparse(url).scheme:
+            return url
+        if is_unix_socket_url(self.base_url):
+            return get_unix_socket_url(self.base_url, url)
+        return urljoin(self.base_url, url)
+
     @raise_if_error
     def request(self, method, url, **kwargs):
-        full_url = urljoin(self.base_url, url)
-        return super().request(method, url=full_url, **kwargs)
+        full_url = self.build_url(url)
+        kind = get_request_kind(full_url, kwargs.get('params'))
+        retry_policy = self.retry_policies.get(kind)
+        if retry_policy is None:
+            return super().request(method, url=full_url, **kwargs)
+
+        def send():
+            return super(InfluxDBRequest, self).request(
+                method,
+                url=full_url,
+                **kwargs,
+            )
+        return retry_policy.execute(
+            send,
+            is_idempotent=kind in IDEMPOTENT_REQUEST_KINDS,
+            circuit_breaker=self.circuit_breakers.get(kind),
+        )
 
     @raise_if_error
     def head(self, url, **kwargs):
-        full_url = urljoin(self.base_url, url)
+        full_url = self.build_url(url)
         return super().head(full_url, **kwargs)
 
     @raise_if_error
     def get(self, url, **kwargs):
-        full_url = urljoin(self.base_url, url)
+        full_url = self.build_url(url)
         return super().get(full_url, **kwargs)
 
     @raise_if_error
     def post(self, url, **kwargs):
-        full_url = urljoin(self.base_url, url)
+        full_url = self.build_url(url)
         return super().post(full_url, **kwargs)
 
     @raise_if_error
     def put(self, url, **kwargs):
-        full_url = urljoin(self.base_url, url)
+        full_url = self.build_url(url)
         return super().put(full_url, **kwargs)
 
     @raise_if_error
     def patch(self, url, **kwargs):
-        full_url = urljoin(self.base_url, url)
+        full_url = self.build_url(url)
         return super().patch(full_url, **kwargs)
 
     @raise_if_error
     def delete(self, url, **kwargs):
-        full_url = urljoin(self.base_url, url)
+        full_url = self.build_url(url)
         return super().delete(full_url, **kwargs)
@@ -1,3 +1,38 @@
+import json
+
+
+def merge_chunked_responses(raw_jsons):
+    merged_results = {}
+    merged_series = {}
+    for raw_json in raw_jsons:
+        if 'error' in raw_json:
+            return raw_json
+        for result in raw_json.get('results', []):
+            statement_id = result.get('statement_id', 0)
+            merged_result = merged_results.setdefault(
+                statement_id,
+                {'statement_id': statement_id},
+            )
+            if 'error' in result:
+                merged_result['error'] = result['error']
+            for serie in result.get('series', []):
+                key = (
+                    statement_id,
+                    serie.get('name'),
+                    json.dumps(serie.get('tags'), sort_keys=True),
+                )
+                if key not in merged_series:
+                    merged_serie = dict(serie, values=[])
+                    merged_serie.pop('partial', None)
+                    merged_series[key] = merged_serie
+                    merged_result.setdefault('series', []).append(
+                        merged_serie,
+                    )
+                values = serie.get('values') or []
+                merged_series[key]['values'].extend(values)
+    return {'results': list(merged_results.values())}
+
+
 class InfluxDBResponse:
     def __init__(self, raw_json):
         self._raw_json = raw_json
@@ -6,6 +41,16 @@ class InfluxDBResponse:
     def raw(self):
         return self._raw_json
 
+    @property
+    def is_partial(self):
+        for result in self.raw.get('results', []):
+            if result.get('partial', False):
+                return True
+            for serie in result.get('series', []):
+                if serie.get('partial', False):
+                    return True
+        return False
+
     @property
     def main_serie(self):
         series = self.series
@@ -0,0 +1,177 @@
+import random
+import threading
+import time
+import requests
+from email.utils import parsedate_to_datetime
+from urllib3.exceptions import NewConnectionError
+from .exceptions import InfluxDBCircuitOpenError
+
+DEFAULT_MAX_RETRIES = 0
+DEFAULT_BACKOFF_FACTOR = 0.1
+DEFAULT_MAX_BACKOFF = 30
+DEFAULT_RETRY_STATUSES = (429, 502, 503, 504)
+DEFAULT_RECOVERY_TIMEOUT = 30
+
+
+class CircuitBreakerState:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name,
+        failure_threshold,
+        recovery_timeout=DEFAULT_RECOVERY_TIMEOUT,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CircuitBreakerState.CLOSED
+        self.nb_failures = 0
+        self.opened_at = None
+        self._is_probing = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        with self._lock:
+            if self.state == CircuitBreakerState.OPEN:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < self.recovery_timeout:
+                    raise InfluxDBCircuitOpenError(self.name)
+                self.state = CircuitBreakerState.HALF_OPEN
+            if self.state == CircuitBreakerState.HALF_OPEN:
+                if self._is_probing:
+                    raise InfluxDBCircuitOpenError(self.name)
+                self._is_probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = CircuitBreakerState.CLOSED
+            self.nb_failures = 0
+            self._is_probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.nb_failures += 1
+            self._is_probing = False
+            is_half_open = self.state == CircuitBreakerState.HALF_OPEN
+            if is_half_open or self.nb_failures >= self.failure_threshold:
+                self.state = CircuitBreakerState.OPEN
+                self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Retries failed requests with an exponential backoff and full jitter.
+
+    Non idempotent requests are only retried when they could not reach the
+    server. When `failure_threshold` is set, a circuit breaker is opened
+    after that many consecutive failures and fails fast for
+    `recovery_timeout` seconds before letting one probe request through.
+    """
+
+    def __init__(
+        self,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        retry_statuses=DEFAULT_RETRY_STATUSES,
+        respect_retry_after=True,
+        failure_threshold=None,
+        recovery_timeout=DEFAULT_RECOVERY_TIMEOUT,
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+        self.respect_retry_after = respect_retry_after
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+    def create_circuit_breaker(self, name):
+        if not self.failure_threshold:
+            return None
+        return CircuitBreaker(
+            name,
+            self.failure_threshold,
+            self.recovery_timeout,
+        )
+
+    def get_backoff(self, attempt):
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** attempt)
+        return random.uniform(0, backoff)
+
+    def get_retry_after(self, response):
+        retry_after = response.headers.get('Retry-After')
+        if not self.respect_retry_after or retry_after is None:
+            return None
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_date = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                return None
+            delay = retry_date.timestamp() - time.time()
+        return min(self.max_backoff, max(0, delay))
+
+    @staticmethod
+    def is_connect_error(err):
+        if isinstance(err, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(err.args[0], 'reason', None) if err.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def can_retry(self, attempt, is_idempotent, err=None):
+        if attempt >= self.max_retries:
+            return False
+        if is_idempotent:
+            return True
+        return err is not None and self.is_connect_error(err)
+
+    def is_failure(self, response):
+        return response.status_code in self.retry_statuses \
+            or response.status_code >= 500
+
+    def execute(self, send, is_idempotent=True, circuit_breaker=None):
+        attempt = 0
+        while True:
+            if circuit_breaker is not None:
+                circuit_breaker.before_request()
+            try:
+                response = send()
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as err:
+                if circuit_breaker is not None:
+                    circuit_breaker.record_failure()
+                if not self.can_retry(attempt, is_idempotent, err):
+                    raise
+                delay = self.get_backoff(attempt)
+            except Exception:
+                # Any other error must release the probe of a half open
+                # circuit, it would stay half open forever otherwise
+                if circuit_breaker is not None:
+                    circuit_breaker.record_failure()
+                raise
+            else:
+                if not self.is_failure(response):
+                    if circuit_breaker is not None:
+                        circuit_breaker.record_success()
+                    return response
+                if circuit_breaker is not None:
+                    circuit_breaker.record_failure()
+                is_retryable = response.status_code in self.retry_statuses
+                if not is_retryable or \
+                   not self.can_retry(attempt, is_idempotent):
+                    return response
+                delay = self.get_retry_after(response)
+                if delay is None:
+                    delay = self.get_backoff(attempt)
+                response.close()
+            time.sleep(delay)
+            attempt += 1
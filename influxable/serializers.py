@@ -86,18 +86,123 @@ class MeasurementPointSerializer(FlatFormattedSerieSerializer):
         self.measurement = measurement
 
     def convert(self):
-        flat_formatted_series = super().convert()
-        timestamp_attributes = self.measurement._get_timestamp_attributes()
-        timestamp_attributes_names = [
-            ta.attribute_name
-            for ta in timestamp_attributes
-        ]
-        self.convert_to_seconds(timestamp_attributes_names, flat_formatted_series)
-        points = [self.measurement(**ffs) for ffs in flat_formatted_series]
-        return points
-
-    def convert_to_seconds(self, attr_names, series):
-        NANO_TO_SEC_RATIO = 1000 * 1000 * 1000
-        for field in series:
-            for attr_name in attr_names:
-                field[attr_name] /= NANO_TO_SEC_RATIO
+        series = self.response.series
+        if len(series) != 1:
+            return []
+        serie = series[0]
+        return self.measurement._from_db(serie.columns, serie.values or [])
+
+
+class MeasurementRowProxy:
+    """
+    A row of a LazyMeasurementResult. An attribute is converted the first
+    time it is read and then cached.
+    """
+    __slots__ = ('_result', '_row', '_cache')
+
+    def __init__(self, result, row):
+        self._result = result
+        self._row = row
+        self._cache = None
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self._cache is None:
+            self._cache = {}
+        elif name in self._cache:
+            return self._cache[name]
+        value = self._result.get_value(self._row, name)
+        self._cache[name] = value
+        return value
+
+    def __repr__(self):
+        return '<{} row proxy {}>'.format(
+            self._result.measurement.__name__,
+            self._row,
+        )
+
+    def dict(self):
+        return {
+            name: getattr(self, name)
+            for name in self._result.attribute_names
+        }
+
+    def items(self):
+        return self.dict().items()
+
+    def to_measurement(self):
+        result = self._result
+        return result.measurement._from_db(
+            result.columns,
+            [result.values[self._row]],
+        )[0]
+
+
+class LazyMeasurementResult:
+    """
+    The rows of a serie kept as returned by the server. The rows are
+    handed out as MeasurementRowProxy, which convert the values of the
+    attributes only when they are read.
+    """
+
+    def __init__(self, measurement, columns, values):
+        self.measurement = measurement
+        self.columns = columns
+        self.values = values
+        self.column_indexes = {
+            column: index
+            for index, column in enumerate(columns)
+        }
+        self.attribute_names = measurement._schema.attribute_names
+        self._proxies = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('row index out of range')
+        proxy = self._proxies.get(index)
+        if proxy is None:
+            proxy = self._proxies[index] = MeasurementRowProxy(self, index)
+        return proxy
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_value(self, row, name):
+        index = self.column_indexes.get(name)
+        if name in self.measurement._schema.ext_attribute_names:
+            if index is None:
+                return None
+            value = self.values[row][index]
+            return self.measurement._from_db_value(name, value)
+        if index is None:
+            msg = '\'{}\' object has no attribute \'{}\''.format(
+                self.measurement.__name__,
+                name,
+            )
+            raise AttributeError(msg)
+        return self.values[row][index]
+
+    def to_measurements(self):
+        return self.measurement._from_db(self.columns, self.values)
+
+
+class LazyMeasurementSerializer(MeasurementPointSerializer):
+    def convert(self):
+        series = self.response.series
+        if len(series) != 1:
+            return LazyMeasurementResult(self.measurement, [], [])
+        serie = series[0]
+        return LazyMeasurementResult(
+            self.measurement,
+            serie.columns,
+            serie.values or [],
+        )
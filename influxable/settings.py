@@ -5,3 +5,7 @@ INFLUXDB_USER = os.getenv('INFLUXDB_USER', 'admin')
 INFLUXDB_PASSWORD = os.getenv('INFLUXDB_PASSWORD', 'changeme')
 INFLUXDB_DATABASE_NAME = os.getenv('INFLUXDB_DATABASE_NAME', 'default')
 INFLUXDB_AUTH_TOKEN = os.getenv('INFLUXDB_AUTH_TOKEN', '')
+INFLUXDB_LAZY_CONNECTION = os.getenv(
+    'INFLUXDB_LAZY_CONNECTION', '',
+).lower() in ('1', 'true', 'yes')
+INFLUXDB_HEALTH_CHECK_TTL = float(os.getenv('INFLUXDB_HEALTH_CHECK_TTL', 10))
@@ -0,0 +1,281 @@
+import gzip
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from .exceptions import (
+    InfluxDBAttributeValueError,
+    InfluxDBInvalidLineProtocolError,
+)
+from .parser import NANOSECONDS_PER_UNIT, get_columns, parse_lines
+
+DEFAULT_SUBSCRIPTION_HOST = '0.0.0.0'
+DEFAULT_SUBSCRIPTION_HTTP_PORT = 9090
+MAX_DATAGRAM_SIZE = 65535
+
+# The writes of a subscription use the precision names of the HTTP API
+PRECISION_ALIASES = {'n': 'ns'}
+
+
+class SubscriptionHTTPHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def send_empty_response(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_error_response(self, status, error):
+        data = json.dumps({'error': error}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self):
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        else:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        return body
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/ping':
+            self.send_empty_response(204)
+        else:
+            self.send_empty_response(404)
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        parsed_url = urlparse(self.path)
+        if parsed_url.path != '/write':
+            self.send_empty_response(404)
+            return
+        params = {k: v[0] for k, v in parse_qs(parsed_url.query).items()}
+        receiver = self.server.receiver
+        try:
+            body = self.read_body()
+            receiver.receive(body, params.get('precision'))
+        except InfluxDBInvalidLineProtocolError as err:
+            self.send_error_response(400, err.error or err.message)
+            return
+        except OSError as err:
+            self.send_error_response(400, str(err))
+            return
+        self.send_empty_response(204)
+
+
+class SubscriptionUDPHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        datagram = self.request[0]
+        try:
+            self.server.receiver.receive(datagram)
+        except InfluxDBInvalidLineProtocolError:
+            # There is nobody to answer to, the datagram is only counted
+            pass
+
+
+class ThreadingSubscriptionHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class SubscriptionUDPServer(socketserver.UDPServer):
+    max_packet_size = MAX_DATAGRAM_SIZE
+
+
+class Subscriber:
+    def __init__(self, callback, measurement=None, columns=False,
+                 trusted=False):
+        self.callback = callback
+        self.measurement_class = None
+        self.measurement_name = measurement
+        if isinstance(measurement, type):
+            self.measurement_class = measurement
+            self.measurement_name = measurement.measurement_name
+        self.columns = columns
+        self.trusted = trusted
+
+    def get_payload(self, points):
+        if self.measurement_name is not None:
+            points = [
+                point
+                for point in points
+                if point.measurement == self.measurement_name
+            ]
+        if not points:
+            return None
+        if self.columns:
+            return get_columns(points)
+        if self.measurement_class is not None:
+            return self.measurement_class._from_parsed_points(
+                points,
+                self.trusted,
+            )
+        return points
+
+
+class SubscriptionReceiver:
+    """
+    Receives the writes that InfluxDB forwards to a subscription, over
+    HTTP and/or UDP, and dispatches the points to the registered
+    callbacks.
+
+    The callbacks are called one at a time, in the order the writes are
+    received, so that they can update local state without locking. An
+    exception raised by a callback is counted and does not reject the
+    write.
+    """
+
+    def __init__(
+        self,
+        host=DEFAULT_SUBSCRIPTION_HOST,
+        http_port=DEFAULT_SUBSCRIPTION_HTTP_PORT,
+        udp_port=None,
+        precision='ns',
+    ):
+        if http_port is None and udp_port is None:
+            msg = 'http_port or udp_port must be set'
+            raise InfluxDBAttributeValueError(msg)
+        if PRECISION_ALIASES.get(precision, precision) \
+                not in NANOSECONDS_PER_UNIT:
+            msg = 'precision must be one of {}'.format(
+                list(NANOSECONDS_PER_UNIT),
+            )
+            raise InfluxDBAttributeValueError(msg)
+        self.host = host
+        self.http_port = http_port
+        self.udp_port = udp_port
+        self.precision = precision
+        self.subscribers = []
+        self.http_server = None
+        self.udp_server = None
+        self.threads = []
+        self.nb_writes = 0
+        self.nb_points = 0
+        self.nb_invalid_writes = 0
+        self.nb_callback_errors = 0
+        self._dispatch_lock = threading.Lock()
+
+    def register(self, callback, measurement=None, columns=False,
+                 trusted=False):
+        """
+        Registers `callback`, called with the points of each write, or
+        only those of `measurement` (a name or a Measurement class):
+        - a list of ParsedPoint,
+        - a list of instances when `measurement` is a Measurement class,
+        - {measurement: {'time': [...], ...}} when `columns` is True.
+        """
+        subscriber = Subscriber(callback, measurement, columns, trusted)
+        with self._dispatch_lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unregister(self, subscriber):
+        with self._dispatch_lock:
+            self.subscribers.remove(subscriber)
+
+    def receive(self, data, precision=None):
+        """
+        Parses a write and dispatches its points, returns the number of
+        points. A write with an invalid line is rejected as a whole.
+        """
+        precision = precision or self.precision
+        precision = PRECISION_ALIASES.get(precision, precision)
+        try:
+            if precision not in NANOSECONDS_PER_UNIT:
+                error = 'invalid precision {}'.format(precision)
+                raise InfluxDBInvalidLineProtocolError(data, error)
+            points = list(parse_lines(data, precision))
+        except InfluxDBInvalidLineProtocolError:
+            with self._dispatch_lock:
+                self.nb_invalid_writes += 1
+            raise
+        with self._dispatch_lock:
+            self.nb_writes += 1
+            self.nb_points += len(points)
+            for subscriber in self.subscribers:
+                try:
+                    payload = subscriber.get_payload(points)
+                    if payload is not None:
+                        subscriber.callback(payload)
+                except Exception:
+                    self.nb_callback_errors += 1
+        return len(points)
+
+    @property
+    def url(self):
+        if self.http_server is None:
+            return None
+        host, port = self.http_server.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    @property
+    def udp_url(self):
+        if self.udp_server is None:
+            return None
+        host, port = self.udp_server.server_address[:2]
+        return 'udp://{}:{}'.format(host, port)
+
+    def start(self):
+        if self.http_port is not None:
+            self.http_server = ThreadingSubscriptionHTTPServer(
+                (self.host, self.http_port),
+                SubscriptionHTTPHandler,
+            )
+            self.http_server.receiver = self
+        if self.udp_port is not None:
+            self.udp_server = SubscriptionUDPServer(
+                (self.host, self.udp_port),
+                SubscriptionUDPHandler,
+            )
+            self.udp_server.receiver = self
+        for server in (self.http_server, self.udp_server):
+            if server is None:
+                continue
+            thread = threading.Thread(
+                target=server.serve_forever,
+                kwargs={'poll_interval': 0.1},
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in (self.http_server, self.udp_server):
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def stats(self):
+        with self._dispatch_lock:
+            return {
+                'writes': self.nb_writes,
+                'points': self.nb_points,
+                'invalid_writes': self.nb_invalid_writes,
+                'callback_errors': self.nb_callback_errors,
+            }
@@ -0,0 +1,100 @@
+import socket
+from .exceptions import InfluxDBAttributeValueError
+from .payload import get_byte_view, is_buffer
+
+DEFAULT_UDP_HOST = 'localhost'
+DEFAULT_UDP_PORT = 8089
+DEFAULT_MTU = 1400
+MAX_DATAGRAM_SIZE = 65507
+
+
+class UDPWriter:
+    """
+    Writes points to the UDP listener of InfluxDB, packing whole lines
+    into datagrams of at most `mtu` bytes. A datagram which cannot be
+    sent right away is dropped and counted.
+    """
+
+    def __init__(self, host=DEFAULT_UDP_HOST, port=DEFAULT_UDP_PORT,
+                 mtu=DEFAULT_MTU):
+        if not isinstance(mtu, int) or not 0 < mtu <= MAX_DATAGRAM_SIZE:
+            msg = 'mtu must be an integer between 1 and {}'.format(
+                MAX_DATAGRAM_SIZE,
+            )
+            raise InfluxDBAttributeValueError(msg)
+        # The host is resolved once, not on each datagram
+        family, _, _, _, address = socket.getaddrinfo(
+            host,
+            port,
+            type=socket.SOCK_DGRAM,
+        )[0]
+        self.address = address
+        self.mtu = mtu
+        self.bytes_sent = 0
+        self.datagrams_sent = 0
+        self.datagrams_dropped = 0
+        self.socket = socket.socket(family, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def encode_lines(points):
+        from .measurement import Measurement
+        if isinstance(points, str):
+            points = points.encode('utf-8')
+        elif is_buffer(points):
+            points = get_byte_view(points).tobytes()
+        if isinstance(points, bytes):
+            lines = [line.strip() for line in points.split(b'\n')]
+            return [line for line in lines if line]
+        lines = Measurement.encode_points(points)
+        return [line.encode('utf-8') for line in lines]
+
+    def iter_datagrams(self, lines):
+        datagram = bytearray()
+        for line in lines:
+            if len(line) > MAX_DATAGRAM_SIZE:
+                msg = 'line is larger than the maximum datagram size'
+                raise InfluxDBAttributeValueError(msg)
+            if datagram and len(datagram) + 1 + len(line) > self.mtu:
+                yield bytes(datagram)
+                datagram = bytearray()
+            if datagram:
+                datagram += b'\n'
+            datagram += line
+        if datagram:
+            yield bytes(datagram)
+
+    def send_datagram(self, datagram):
+        try:
+            nb_bytes = self.socket.sendto(datagram, self.address)
+        except (BlockingIOError, InterruptedError):
+            self.datagrams_dropped += 1
+            return False
+        self.bytes_sent += nb_bytes
+        self.datagrams_sent += 1
+        return True
+
+    def write(self, points):
+        lines = self.encode_lines(points)
+        nb_datagrams = 0
+        for datagram in self.iter_datagrams(lines):
+            if self.send_datagram(datagram):
+                nb_datagrams += 1
+        return nb_datagrams
+
+    @property
+    def stats(self):
+        return {
+            'bytes_sent': self.bytes_sent,
+            'datagrams_sent': self.datagrams_sent,
+            'datagrams_dropped': self.datagrams_dropped,
+        }
+
+    def close(self):
+        self.socket.close()
@@ -0,0 +1,24 @@
+import pytest
+from influxable import Influxable
+from .stub_server import StubInfluxDBServer
+
+
+@pytest.fixture
+def stub_influxable(monkeypatch):
+    """
+    Starts a stub server, stopped after the test, and makes the
+    Influxable instance connect to it: stub_influxable(responder)
+    returns the server.
+    """
+    servers = []
+
+    def start(responder=None):
+        server = StubInfluxDBServer(responder).__enter__()
+        servers.append(server)
+        instance = Influxable._decorated(base_url=server.url, lazy=True)
+        monkeypatch.setattr(Influxable, '_instance', instance, False)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
@@ -0,0 +1,137 @@
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+EMPTY_RESULTS = {'results': [{'statement_id': 0}]}
+
+
+class StubInfluxDBHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        parsed_url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed_url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            body = self._read_chunked_body()
+        if body and 'q' not in params and parsed_url.path == '/query':
+            params.update({
+                k: v[0] for k, v in parse_qs(body.decode('utf-8')).items()
+            })
+        self.server.stub.record(self.command, parsed_url.path, params, body)
+        status, headers, payload = self.server.stub.respond(
+            self.command,
+            parsed_url.path,
+            params,
+            body,
+        )
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if payload is None:
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if isinstance(payload, bytes):
+            data = payload
+        else:
+            data = json.dumps(payload).encode('utf-8')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_chunked_body(self):
+        body = b''
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                return body
+            body += self.rfile.read(size)
+            self.rfile.readline()
+
+    do_GET = _handle
+    do_POST = _handle
+    do_HEAD = _handle
+
+
+class ThreadingUnixHTTPServer(
+    socketserver.ThreadingMixIn,
+    socketserver.UnixStreamServer,
+):
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('local', 0)
+
+
+class StubInfluxDBServer:
+    """
+    A minimal stand-in for the InfluxDB HTTP API used by the tests
+    which do not need a real server.
+    """
+
+    def __init__(self, responder=None, delay=0, socket_path=None):
+        self.responder = responder
+        self.delay = delay
+        self.socket_path = socket_path
+        self.requests = []
+        self._lock = threading.Lock()
+        if socket_path is not None:
+            self.server = ThreadingUnixHTTPServer(
+                socket_path,
+                StubInfluxDBHandler,
+            )
+        else:
+            self.server = ThreadingHTTPServer(
+                ('127.0.0.1', 0),
+                StubInfluxDBHandler,
+            )
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={'poll_interval': 0.05},
+            daemon=True,
+        )
+
+    @property
+    def url(self):
+        if self.socket_path is not None:
+            return 'unix://{}'.format(self.socket_path)
+        host, port = self.server.server_address
+        return 'http://{}:{}'.format(host, port)
+
+    def record(self, method, path, params, body):
+        with self._lock:
+            self.requests.append((method, path, params, body))
+
+    def count(self, path):
+        return len([r for r in self.requests if r[1] == path])
+
+    def get_params(self, path):
+        return [r[2] for r in self.requests if r[1] == path]
+
+    def respond(self, method, path, params, body):
+        if self.delay:
+            time.sleep(self.delay)
+        if self.responder is not None:
+            response = self.responder(method, path, params, body)
+            if response is not None:
+                return response
+        if path == '/query':
+            return 200, {}, EMPTY_RESULTS
+        return 204, {}, None
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
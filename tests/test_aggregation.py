@@ -0,0 +1,195 @@
+import time
+import pytest
+from influxable import attributes, exceptions
+from influxable.aggregation import AggregatingWriter, QuantileSketch
+from influxable.measurement import Measurement
+
+
+class TestAggregatingWriter:
+    def create_measurement_class(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            phase = attributes.TagFieldAttribute()
+            value = attributes.FloatFieldAttribute()
+            state = attributes.StringFieldAttribute()
+        return MySampleMeasurement
+
+    def test_aggregate_series_success(self):
+        measurement_cls = self.create_measurement_class()
+        writer = AggregatingWriter(measurement_cls)
+        for i in range(10):
+            writer.add({
+                'time': 1463289075 + i / 10,
+                'phase': 'moon',
+                'value': i,
+                'state': 'ok',
+            })
+        writer.add(measurement_cls(time=1463289075, phase='sun', value=2))
+        assert writer.stats['samples'] == 11
+        assert writer.stats['pending_series'] == 2
+        lines = writer.pop_lines()
+        assert lines == [
+            'mysamplemeasurement,phase=moon value_count=10i,value_sum=45.0,'
+            'value_min=0.0,value_max=9.0,value_last=9.0,state="ok" '
+            '1463289075000000000',
+            'mysamplemeasurement,phase=sun value_count=1i,value_sum=2.0,'
+            'value_min=2.0,value_max=2.0,value_last=2.0 '
+            '1463289075000000000',
+        ]
+        assert writer.stats['pending_series'] == 0
+
+    def test_aggregate_intervals_success(self):
+        measurement_cls = self.create_measurement_class()
+        writer = AggregatingWriter(
+            measurement_cls,
+            interval=10,
+            aggregations=['count', 'max'],
+        )
+        for timestamp in [1463289071, 1463289079, 1463289080]:
+            writer.add({'time': timestamp, 'phase': 'moon', 'value': 1})
+        assert writer.pop_lines() == [
+            'mysamplemeasurement,phase=moon value_count=2i,value_max=1.0 '
+            '1463289070000000000',
+            'mysamplemeasurement,phase=moon value_count=1i,value_max=1.0 '
+            '1463289080000000000',
+        ]
+
+    def test_current_interval_is_kept_success(self):
+        measurement_cls = self.create_measurement_class()
+        writer = AggregatingWriter(measurement_cls, interval=3600)
+        writer.add({'phase': 'moon', 'value': 1})
+        assert writer.pop_lines() == []
+        assert len(writer.pop_lines(force=True)) == 1
+
+    def test_datetime_timestamp_success(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.DateTimeFieldAttribute()
+            value = attributes.FloatFieldAttribute()
+        writer = AggregatingWriter(MySampleMeasurement, interval=10)
+        writer.add({'time': '2016-05-15 05:11:15', 'value': 1})
+        writer.add(MySampleMeasurement(time='2016-05-15 05:11:19', value=2))
+        assert writer.pop_lines() == [
+            'mysamplemeasurement value_count=2i,value_sum=3.0,'
+            'value_min=1.0,value_max=2.0,value_last=2.0 '
+            '1463289070000000000',
+        ]
+
+    def test_late_samples_are_dropped_success(self):
+        measurement_cls = self.create_measurement_class()
+        writer = AggregatingWriter(measurement_cls, interval=10)
+        writer.add({'time': 1463289071, 'value': 1})
+        assert len(writer.pop_lines()) == 1
+        writer.add({'time': 1463289072, 'value': 2})
+        assert writer.pop_lines() == []
+        assert writer.stats['samples'] == 1
+        assert writer.stats['late_samples'] == 1
+
+    def test_samples_after_forced_flush_are_merged_success(self):
+        measurement_cls = self.create_measurement_class()
+        writer = AggregatingWriter(
+            measurement_cls,
+            interval=3600,
+            aggregations=['count', 'sum'],
+        )
+        writer.add({'phase': 'moon', 'value': 1})
+        lines = writer.pop_lines(force=True)
+        assert 'value_count=1i,value_sum=1.0' in lines[0]
+        writer.add({'phase': 'moon', 'value': 2})
+        next_lines = writer.pop_lines(force=True)
+        assert 'value_count=2i,value_sum=3.0' in next_lines[0]
+        assert lines[0].split(' ')[2] == next_lines[0].split(' ')[2]
+        assert writer.stats['late_samples'] == 0
+
+    def test_samples_after_close_are_dropped_success(self, stub_influxable):
+        measurement_cls = self.create_measurement_class()
+        stub_influxable()
+        writer = AggregatingWriter(measurement_cls, interval=3600)
+        writer.add({'phase': 'moon', 'value': 1})
+        writer.close()
+        writer.add({'phase': 'moon', 'value': 2})
+        assert writer.pop_lines(force=True) == []
+        assert writer.stats['late_samples'] == 1
+
+    def test_grace_period_success(self):
+        measurement_cls = self.create_measurement_class()
+        writer = AggregatingWriter(
+            measurement_cls,
+            interval=1,
+            grace_period=3600,
+        )
+        writer.add({'time': time.time() - 60, 'value': 1})
+        assert writer.pop_lines() == []
+        writer.add({'time': time.time() - 60, 'value': 2})
+        lines = writer.pop_lines(force=True)
+        assert len(lines) == 1
+        assert 'value_count=2i' in lines[0]
+        assert writer.stats['late_samples'] == 0
+
+    def test_flush_writes_points_success(self, stub_influxable):
+        measurement_cls = self.create_measurement_class()
+        server = stub_influxable()
+        writer = AggregatingWriter(measurement_cls, aggregations=['count'])
+        writer.add({'time': 1463289075, 'value': 1})
+        assert writer.flush() == 1
+        bodies = [r[3] for r in server.requests if r[1] == '/write']
+        assert bodies == [
+            b'mysamplemeasurement value_count=1i 1463289075000000000\n',
+        ]
+        assert writer.stats['points_written'] == 1
+
+    def test_quantiles_success(self):
+        measurement_cls = self.create_measurement_class()
+        writer = AggregatingWriter(
+            measurement_cls,
+            aggregations=[],
+            quantiles=[0.5, 0.99],
+        )
+        for i in range(1, 101):
+            writer.add({'time': 1463289075, 'value': i})
+        assert writer.pop_lines() == [
+            'mysamplemeasurement value_p50=50.0,value_p99=99.0 '
+            '1463289075000000000',
+        ]
+
+    def test_quantile_sketch_is_bounded_success(self):
+        sketch = QuantileSketch(size=100)
+        for i in range(10000):
+            sketch.add(i)
+        assert len(sketch.values) == 100
+        assert sketch.nb_values == 10000
+        assert 2000 < sketch.quantile(0.5) < 8000
+
+    def test_flush_without_points_success(self):
+        measurement_cls = self.create_measurement_class()
+        writer = AggregatingWriter(measurement_cls)
+        assert writer.flush(force=True) == 0
+        assert writer.stats['points_written'] == 0
+
+    def test_invalid_value_fail(self):
+        measurement_cls = self.create_measurement_class()
+        writer = AggregatingWriter(measurement_cls)
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            writer.add({'phase': 'moon', 'value': 'abc'})
+        assert writer.stats['samples'] == 0
+
+    def test_invalid_aggregation_fail(self):
+        measurement_cls = self.create_measurement_class()
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            AggregatingWriter(measurement_cls, aggregations=['median'])
+
+    def test_invalid_quantile_fail(self):
+        measurement_cls = self.create_measurement_class()
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            AggregatingWriter(measurement_cls, quantiles=[1.5])
+
+    def test_invalid_interval_fail(self):
+        measurement_cls = self.create_measurement_class()
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            AggregatingWriter(measurement_cls, interval=0)
+
+    def test_invalid_grace_period_fail(self):
+        measurement_cls = self.create_measurement_class()
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            AggregatingWriter(measurement_cls, grace_period=-1)
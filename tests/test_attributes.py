@@ -1,5 +1,6 @@
 import arrow
 import pytest
+import pandas as pd
 from datetime import datetime
 from decimal import Decimal as D
 from influxable import attributes, exceptions
@@ -118,6 +119,20 @@ class TestIntegerFieldAttribute:
         with pytest.raises(exceptions.InfluxDBAttributeValueError):
             attributes.IntegerFieldAttribute(max_value='ok')
 
+    def test_validate_column_success(self):
+        attr = attributes.IntegerFieldAttribute(min_value=0, max_value=5)
+        values = pd.Series([-1, 0, 5, 6, None, 'ok', '1.5', 2.5])
+        masks = {msg: list(mask) for mask, msg in attr.validate_column(values)}
+        assert masks['The value must be greater than the min_value'] == [
+            True, False, False, False, False, False, False, False,
+        ]
+        assert masks['The value must be lower than the max_value'] == [
+            False, False, False, True, False, False, False, False,
+        ]
+        assert masks['The value cannot be casted'] == [
+            False, False, False, False, False, True, True, True,
+        ]
+
 
 class TestFloatFieldAttribute:
     def test_clean_success(self):
@@ -146,6 +161,14 @@ class TestFloatFieldAttribute:
         with pytest.raises(exceptions.InfluxDBAttributeValueError):
             attributes.FloatFieldAttribute(max_nb_decimals=-5)
 
+    def test_validate_column_success(self):
+        attr = attributes.FloatFieldAttribute()
+        values = pd.Series([1.5, '2.5', None, 'ok'])
+        masks = {msg: list(mask) for mask, msg in attr.validate_column(values)}
+        assert masks['The value cannot be casted'] == [
+            False, False, False, True,
+        ]
+
 
 class TestStringFieldAttribute:
     def test_to_python_success(self):
@@ -154,7 +177,8 @@ class TestStringFieldAttribute:
 
     def test_to_influx_success(self):
         attr = attributes.StringFieldAttribute()
-        assert attr.to_influx('5') == "\'5\'"
+        assert attr.to_influx('5') == '"5"'
+        assert attr.to_influx('say "hi" \\o/') == '"say \\"hi\\" \\\\o/"'
 
     def test_validate_invalid_choices_type_fail(self):
         with pytest.raises(exceptions.InfluxDBAttributeValueError):
@@ -182,6 +206,23 @@ class TestStringFieldAttribute:
             attr = attributes.StringFieldAttribute(max_length=5)
             attr.set_internal_value('test_value')
 
+    def test_validate_column_success(self):
+        attr = attributes.StringFieldAttribute(
+            choices=['first', 'last', 'longest'],
+            max_length=5,
+            is_nullable=False,
+        )
+        values = pd.Series(['first', 'ok', 'longest', None])
+        masks = {msg: list(mask) for mask, msg in attr.validate_column(values)}
+        assert masks['The value is not refered in choices'] == [
+            False, True, False, False,
+        ]
+        assert masks['the string length must be lower than the max_length'] \
+            == [False, False, True, False]
+        assert masks['The field cannot be nullable'] == [
+            False, False, False, True,
+        ]
+
 
 class TestBooleanFieldAttribute:
     def test_to_python_success(self):
@@ -229,6 +270,22 @@ class TestTimestampFieldAttribute:
         attr.set_internal_value(1570209691)
         assert attr.convert_to_precision(1570209691, 'ms') == D('1570209691000')
 
+    def test_set_datetime64_value_success(self):
+        attr = attributes.TimestampFieldAttribute(precision='ms')
+        attr.set_internal_value(pd.Timestamp(1570209691500000000))
+        assert attr.get_internal_value() == D('1570209691500')
+        assert attr.get_prep_value() == '1570209691500000000'
+
+    def test_validate_column_success(self):
+        attr = attributes.TimestampFieldAttribute()
+        values = pd.Series([
+            1570209691, '1570209691', pd.Timestamp(0), None, 'bad',
+        ])
+        masks = {msg: list(mask) for mask, msg in attr.validate_column(values)}
+        assert masks['The value cannot be casted'] == [
+            False, False, False, False, True,
+        ]
+
     def test_validate_fail(self):
         with pytest.raises(exceptions.InfluxDBAttributeValueError):
             attributes.TimestampFieldAttribute(precision='k')
@@ -0,0 +1,85 @@
+import pytest
+from influxable import exceptions
+from influxable.batching import AdaptiveBatchController
+
+
+class TestAdaptiveBatchController:
+    def create_controller(self, **kwargs):
+        options = {
+            'target_latency': 1,
+            'initial_batch_size': 1000,
+            'min_batch_size': 100,
+            'max_batch_size': 2000,
+            'batch_size_step': 500,
+            'max_concurrency': 4,
+        }
+        options.update(kwargs)
+        return AdaptiveBatchController(**options)
+
+    def test_additive_increase_success(self):
+        controller = self.create_controller()
+        controller.record(controller.begin(), 0.1)
+        assert controller.batch_size == 1500
+        assert controller.concurrency == 2
+        controller.record(controller.begin(), 0.1)
+        assert controller.batch_size == 2000
+        assert controller.concurrency == 2
+        controller.record(controller.begin(), 0.1)
+        assert controller.batch_size == 2000
+        assert controller.concurrency == 3
+
+    def test_multiplicative_decrease_success(self):
+        controller = self.create_controller(initial_concurrency=4)
+        controller.record(controller.begin(), 2)
+        assert controller.batch_size == 500
+        assert controller.concurrency == 2
+        controller.record(controller.begin(), 0, is_error=True)
+        assert controller.batch_size == 250
+        assert controller.concurrency == 1
+        for _ in range(5):
+            controller.record(controller.begin(), 0, is_error=True)
+        assert controller.batch_size == 100
+        assert controller.concurrency == 1
+
+    def test_decrease_once_per_congestion_success(self):
+        controller = self.create_controller(initial_concurrency=4)
+        tokens = [controller.begin() for _ in range(4)]
+        for token in tokens:
+            controller.record(token, 2)
+        assert controller.batch_size == 500
+        assert controller.concurrency == 2
+
+    def test_send_records_errors_success(self):
+        controller = self.create_controller()
+
+        def send(body):
+            raise exceptions.InfluxDBConnectionError('unreachable')
+
+        with pytest.raises(exceptions.InfluxDBConnectionError):
+            controller.send(send, b'body')
+        assert controller.send(len, b'body') == 4
+        metrics = controller.metrics
+        assert metrics['batches'] == 2
+        assert metrics['errors'] == 1
+        assert 0 < metrics['error_rate'] < 1
+        assert metrics['latency'] is not None
+        assert set(metrics) == {
+            'batch_size',
+            'concurrency',
+            'latency',
+            'error_rate',
+            'batches',
+            'errors',
+        }
+
+    def test_invalid_batch_sizes_fail(self):
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            self.create_controller(initial_batch_size=50)
+
+    def test_invalid_concurrency_fail(self):
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            self.create_controller(initial_concurrency=8)
+
+    def test_invalid_decrease_factor_fail(self):
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            self.create_controller(decrease_factor=1)
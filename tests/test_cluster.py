@@ -0,0 +1,185 @@
+import time
+import pytest
+from influxable import InfluxDBApi, exceptions
+from influxable.cluster import BalancingStrategy, InfluxDBClusterRequest, \
+    InfluxDBNode, HedgingPolicy, LeastOutstandingRequestsBalancer, \
+    WritePolicy
+from influxable.connection import Connection
+from .stub_server import StubInfluxDBServer
+
+UNREACHABLE_URL = 'http://127.0.0.1:9'
+
+
+class TestCluster:
+    def create_cluster_request(self, base_urls, **kwargs):
+        kwargs.setdefault('health_check_interval', None)
+        return InfluxDBClusterRequest(base_urls, 'default', **kwargs)
+
+    def test_is_read_request_success(self):
+        is_read_request = InfluxDBClusterRequest.is_read_request
+        assert is_read_request('GET', '/ping')
+        assert is_read_request('GET', '/query', {'q': 'SELECT * FROM "m"'})
+        assert is_read_request('POST', '/query', {'q': ' show databases'})
+        assert not is_read_request('POST', '/write')
+        assert not is_read_request('POST', '/query', {'q': 'DROP DATABASE a'})
+        assert not is_read_request(
+            'POST',
+            '/query',
+            {'q': 'SELECT * INTO "b" FROM "a"'},
+        )
+
+    def test_create_with_empty_urls_fail(self):
+        with pytest.raises(exceptions.InfluxDBInvalidChoiceError):
+            self.create_cluster_request([])
+
+    def test_create_with_bad_balancing_fail(self):
+        with pytest.raises(exceptions.InfluxDBInvalidChoiceError):
+            self.create_cluster_request([UNREACHABLE_URL], balancing='random')
+
+    def test_create_with_bad_write_policy_fail(self):
+        with pytest.raises(exceptions.InfluxDBInvalidChoiceError):
+            self.create_cluster_request([UNREACHABLE_URL], write_policy='all')
+
+    def test_round_robin_reads_success(self):
+        with StubInfluxDBServer() as s1, StubInfluxDBServer() as s2:
+            request = self.create_cluster_request([s1.url, s2.url])
+            for _ in range(4):
+                InfluxDBApi.execute_query(request, 'SHOW DATABASES')
+            assert s1.count('/query') == 2
+            assert s2.count('/query') == 2
+
+    def test_least_outstanding_requests_balancer_success(self):
+        balancer = LeastOutstandingRequestsBalancer()
+        nodes = [InfluxDBNode(None), InfluxDBNode(None)]
+        nodes[0].acquire()
+        assert balancer.choose(nodes) is nodes[1]
+        nodes[1].acquire()
+        nodes[1].acquire()
+        assert balancer.choose(nodes) is nodes[0]
+
+    def test_primary_write_policy_success(self):
+        with StubInfluxDBServer() as s1, StubInfluxDBServer() as s2:
+            request = self.create_cluster_request([s1.url, s2.url])
+            for _ in range(3):
+                InfluxDBApi.write_points(request, 'm value=1')
+            assert s1.count('/write') == 3
+            assert s2.count('/write') == 0
+
+    def test_balanced_write_policy_success(self):
+        with StubInfluxDBServer() as s1, StubInfluxDBServer() as s2:
+            request = self.create_cluster_request(
+                [s1.url, s2.url],
+                write_policy=WritePolicy.BALANCED,
+            )
+            for _ in range(4):
+                InfluxDBApi.write_points(request, 'm value=1')
+            assert s1.count('/write') == 2
+            assert s2.count('/write') == 2
+
+    def test_failover_and_ejection_success(self):
+        with StubInfluxDBServer() as s1:
+            request = self.create_cluster_request([UNREACHABLE_URL, s1.url])
+            InfluxDBApi.write_points(request, 'm value=1')
+            assert s1.count('/write') == 1
+            assert not request.nodes[0].is_healthy
+            assert request.healthy_nodes == [request.nodes[1]]
+
+    def test_all_nodes_unreachable_fail(self):
+        request = self.create_cluster_request([UNREACHABLE_URL])
+        with pytest.raises(exceptions.InfluxDBConnectionError):
+            InfluxDBApi.execute_query(request, 'SHOW DATABASES')
+
+    def test_node_readmitted_after_recovery_success(self):
+        with StubInfluxDBServer() as s1:
+            request = self.create_cluster_request([s1.url])
+            node = request.nodes[0]
+            node.eject()
+            assert request.healthy_nodes == []
+            assert node.check_health()
+            assert request.healthy_nodes == [node]
+
+    def test_connection_with_url_list_success(self):
+        with StubInfluxDBServer() as s1, StubInfluxDBServer() as s2:
+            connection = Connection(
+                base_url='{},{}'.format(s1.url, s2.url),
+                balancing=BalancingStrategy.LEAST_OUTSTANDING_REQUESTS,
+                health_check_interval=None,
+            )
+            assert connection.is_cluster
+            assert isinstance(connection.request, InfluxDBClusterRequest)
+            assert s1.count('/query') + s2.count('/query') == 1
+
+    def test_connection_close_stops_health_checker_success(self):
+        with StubInfluxDBServer() as s1, StubInfluxDBServer() as s2:
+            connection = Connection(
+                base_url='{},{}'.format(s1.url, s2.url),
+                health_check_interval=0.01,
+            )
+            health_checker = connection.request.health_checker
+            assert health_checker.is_alive()
+            connection.close()
+            health_checker.join(timeout=1)
+            assert not health_checker.is_alive()
+
+    def test_hedging_policy_delay_success(self):
+        hedging = HedgingPolicy(percentile=50, min_delay=0.01, min_samples=4)
+        assert hedging.get_delay() == 0.01
+        for latency in [0.1, 0.2, 0.3, 0.4]:
+            hedging.record_latency(latency)
+        assert hedging.get_delay() == 0.2
+
+    def test_hedging_policy_budget_success(self):
+        hedging = HedgingPolicy(budget_ratio=0.5)
+        hedging.record_read()
+        assert not hedging.acquire_budget()
+        hedging.record_read()
+        assert hedging.acquire_budget()
+        assert not hedging.acquire_budget()
+
+    def test_hedging_policy_bad_budget_ratio_fail(self):
+        with pytest.raises(exceptions.InfluxDBInvalidChoiceError):
+            HedgingPolicy(budget_ratio=2)
+
+    def test_hedged_read_success(self):
+        slow_server = StubInfluxDBServer(delay=1)
+        with slow_server as s1, StubInfluxDBServer() as s2:
+            hedging = HedgingPolicy(min_delay=0.05, budget_ratio=1)
+            request = self.create_cluster_request(
+                [s1.url, s2.url],
+                hedging=hedging,
+            )
+            start = time.monotonic()
+            res = InfluxDBApi.execute_query(request, 'SHOW DATABASES')
+            assert time.monotonic() - start < 0.5
+            assert 'results' in res
+            assert s2.count('/query') == 1
+            assert hedging.nb_hedges == 1
+            request.close()
+
+    def test_hedged_read_without_budget_success(self):
+        slow_server = StubInfluxDBServer(delay=0.3)
+        with slow_server as s1, StubInfluxDBServer() as s2:
+            hedging = HedgingPolicy(min_delay=0.05, budget_ratio=0)
+            request = self.create_cluster_request(
+                [s1.url, s2.url],
+                hedging=hedging,
+            )
+            start = time.monotonic()
+            InfluxDBApi.execute_query(request, 'SHOW DATABASES')
+            assert time.monotonic() - start >= 0.3
+            assert s2.count('/query') == 0
+            assert hedging.nb_hedges == 0
+            request.close()
+
+    def test_hedging_is_not_used_for_writes_success(self):
+        slow_server = StubInfluxDBServer(delay=0.2)
+        with slow_server as s1, StubInfluxDBServer() as s2:
+            hedging = HedgingPolicy(min_delay=0.01, budget_ratio=1)
+            request = self.create_cluster_request(
+                [s1.url, s2.url],
+                hedging=hedging,
+            )
+            InfluxDBApi.write_points(request, 'm value=1')
+            assert s2.count('/write') == 0
+            assert hedging.nb_reads == 0
+            request.close()
@@ -1,6 +1,7 @@
 import pytest
 from influxable import InfluxDBApi, exceptions
 from influxable.connection import Connection
+from .stub_server import StubInfluxDBServer
 
 
 class TestConnection:
@@ -29,3 +30,48 @@ class TestConnection:
         pytest.skip()
         with pytest.raises(exceptions.InfluxDBInvalidURLError):
             Connection(database_name="invalid_database_name")
+
+    def test_create_lazy_instance_with_unreachable_url_success(self):
+        connection = Connection(base_url='http://127.0.0.1:9', lazy=True)
+        assert connection is not None
+        assert connection._request is None
+
+    def test_lazy_instance_first_use_with_unreachable_url_fail(self):
+        connection = Connection(base_url='http://127.0.0.1:9', lazy=True)
+        with pytest.raises(exceptions.InfluxDBConnectionError):
+            connection.request
+
+    def test_lazy_instance_health_check_is_cached_success(self):
+        connection = Connection(
+            base_url='http://127.0.0.1:9',
+            lazy=True,
+            health_check_ttl=60,
+        )
+        assert connection.check_health() is False
+        last_health_check = connection._last_health_check
+        assert connection.check_health() is False
+        assert connection._last_health_check == last_health_check
+
+    def test_lazy_instance_health_check_force_success(self):
+        connection = Connection(
+            base_url='http://127.0.0.1:9',
+            lazy=True,
+            health_check_ttl=60,
+        )
+        connection.check_health()
+        last_health_check = connection._last_health_check
+        connection.check_health(force=True)
+        assert connection._last_health_check > last_health_check
+
+    def test_create_instance_with_unix_socket_success(self, tmp_path):
+        socket_path = str(tmp_path / 'influxdb.sock')
+        with StubInfluxDBServer(socket_path=socket_path) as server:
+            connection = Connection(base_url=server.url)
+            request = connection.request
+            assert InfluxDBApi.ping(request) is True
+            res = InfluxDBApi.execute_query(request, 'SHOW DATABASES')
+            assert 'results' in res
+            assert InfluxDBApi.write_points(request, 'm value=1') is True
+            assert server.count('/query') == 2
+            assert server.count('/write') == 1
+            assert server.requests[-1][3] == b'm value=1'
@@ -1,6 +1,8 @@
+import json
 import pytest
-from influxable.db.criteria import Field
+from influxable.db.criteria import Field, Param
 from influxable.db.query import RawQuery, Query, BulkInsertQuery
+from influxable.db.function.selectors import Max, Percentile
 from influxable.db.function.transformations import Abs
 from influxable import exceptions
 
@@ -26,6 +28,50 @@ class TestDBRawQuery:
             raw_query.execute()
 
 
+class TestDBPartialQuery:
+    def create_responder(self):
+        # The max-row-limit truncates the query, not its chunked version
+        def responder(method, path, params, body):
+            if path != '/query':
+                return None
+            serie = {'name': 'cpu', 'columns': ['time', 'value']}
+            if params['chunked'] != 'True':
+                return 200, {}, {'results': [{'statement_id': 0, 'series': [
+                    dict(serie, values=[[1, 1.0], [2, 2.0]], partial=True),
+                ]}]}
+            chunks = [
+                {'results': [{'statement_id': 0, 'series': [
+                    dict(serie, values=[[1, 1.0], [2, 2.0]], partial=True),
+                ], 'partial': True}]},
+                {'results': [{'statement_id': 0, 'series': [
+                    dict(serie, values=[[3, 3.0]]),
+                ]}]},
+            ]
+            lines = '\n'.join(json.dumps(chunk) for chunk in chunks)
+            return 200, {}, lines.encode('utf-8')
+        return responder
+
+    def test_partial_response_is_refetched_success(self, stub_influxable):
+        server = stub_influxable(self.create_responder())
+        str_query = 'SELECT value FROM "cpu"'
+        res = RawQuery(str_query).execute()
+        serie = res['results'][0]['series'][0]
+        assert serie['values'] == [[1, 1.0], [2, 2.0], [3, 3.0]]
+        assert not serie.get('partial')
+        queries = server.get_params('/query')
+        assert [params['q'] for params in queries] == [str_query, str_query]
+        assert [params['chunked'] for params in queries] == ['False', 'True']
+
+
+class TestDBBulkInsertQuery:
+    def test_execute_is_not_memoized_success(self, stub_influxable):
+        server = stub_influxable()
+        query = BulkInsertQuery(b'cpu value=1 1463289075000000000\n')
+        assert query.execute() is True
+        assert query.execute() is True
+        assert len(server.get_params('/write')) == 2
+
+
 class TestDBSelectQuery:
     def test_all_fields_success(self):
         query = Query()\
@@ -736,3 +782,366 @@ class TestSelectAggregation:
         assert prepared_query == 'SELECT MEDIAN(*) FROM "default"'
         res = query.execute()
         assert 'results' in res
+
+
+class TestDBFollowQuery:
+    def create_responder(self, polls):
+        def responder(method, path, params, body):
+            if path != '/query':
+                return None
+            values = polls.pop(0) if polls else []
+            serie = {
+                'name': 'cpu',
+                'columns': ['time', 'value'],
+                'values': values,
+            }
+            return 200, {}, {'results': [{
+                'statement_id': 0,
+                'series': [serie],
+            }]}
+        return responder
+
+    def follow(self, stub_influxable, polls, **kwargs):
+        server = stub_influxable(self.create_responder(polls))
+        query = Query()\
+            .select('value')\
+            .from_measurements('cpu')\
+            .where(Field('host') == 'server01')
+        results = list(query.follow(interval=0, **kwargs))
+        queries = [params['q'] for params in server.get_params('/query')]
+        return results, queries
+
+    def test_follow_yields_new_rows_success(self, stub_influxable):
+        polls = [
+            [[10, 1.0], [20, 2.0]],
+            [[20, 2.0], [30, 3.0]],
+            [],
+            [[15, 1.5], [40, 4.0]],
+        ]
+        results, queries = self.follow(
+            stub_influxable,
+            polls,
+            lookback=10 / 10 ** 9,
+            max_polls=4,
+        )
+        values = [r['results'][0]['series'][0]['values'] for r in results]
+        assert values == [
+            [[10, 1.0], [20, 2.0]],
+            [[30, 3.0]],
+            [[15, 1.5], [40, 4.0]],
+        ]
+        assert queries == [
+            'SELECT value FROM "cpu" WHERE "host" = \'server01\'',
+            'SELECT value FROM "cpu" WHERE "host" = \'server01\' '
+            'AND "time" > 10',
+            'SELECT value FROM "cpu" WHERE "host" = \'server01\' '
+            'AND "time" > 20',
+            'SELECT value FROM "cpu" WHERE "host" = \'server01\' '
+            'AND "time" > 20',
+        ]
+
+    def test_follow_from_start_success(self, stub_influxable):
+        results, queries = self.follow(
+            stub_influxable,
+            [[[10, 1.0]]],
+            start=5,
+            max_polls=1,
+        )
+        assert len(results) == 1
+        assert queries == [
+            'SELECT value FROM "cpu" WHERE "host" = \'server01\' '
+            'AND "time" > 5',
+        ]
+
+
+class TestDBAggregateQuery:
+    def test_aggregate_success(self):
+        query = Query()\
+            .from_measurements('default')\
+            .aggregate(
+                mean='value',
+                max='value',
+                count='value',
+                p95=Percentile(95, 'value'),
+            )
+        prepared_query = query._get_prepared_query()
+        assert prepared_query == 'SELECT MEAN(value) AS "mean",' \
+            'MAX(value) AS "max",COUNT(value) AS "count",' \
+            'PERCENTILE(value, 95) AS "p95" FROM "default"'
+
+    def test_aggregate_with_range_by_success(self):
+        query = Query()\
+            .from_measurements('default')\
+            .aggregate(min='value', max_value=Max('value'))\
+            .range_by('1h', fill=0, tags=['phase'])
+        prepared_query = query._get_prepared_query()
+        assert prepared_query == 'SELECT MIN(value) AS "min",' \
+            'MAX(value) AS "max_value" FROM "default" ' \
+            'GROUP BY time(1h),phase fill(0)'
+
+    def test_aggregate_unknown_function_fail(self):
+        with pytest.raises(exceptions.InfluxDBInvalidChoiceError):
+            Query().aggregate(average='value')
+
+    def test_aggregate_invalid_type_fail(self):
+        with pytest.raises(exceptions.InfluxDBInvalidTypeError):
+            Query().aggregate(mean=1)
+        with pytest.raises(exceptions.InfluxDBInvalidTypeError):
+            Query().aggregate()
+
+
+class TestDBShortcutQuery:
+    def execute(self, stub_influxable, func, series):
+        def responder(method, path, params, body):
+            if path == '/query':
+                return 200, {}, {'results': [{
+                    'statement_id': 0,
+                    'series': series,
+                }]}
+
+        server = stub_influxable(responder)
+        query = Query()\
+            .from_measurements('cpu')\
+            .where(Field('value') > 0)\
+            .limit(100)
+        result = func(query)
+        queries = [params['q'] for params in server.get_params('/query')]
+        return result, queries
+
+    def test_exists_success(self, stub_influxable):
+        serie = {'name': 'cpu', 'columns': ['time', 'value'], 'values': [
+            [10, 1.0],
+        ]}
+        result, queries = self.execute(
+            stub_influxable,
+            lambda query: query.exists(),
+            [serie],
+        )
+        assert result is True
+        assert queries == ['SELECT * FROM "cpu" WHERE "value" > 0 LIMIT 1']
+        result, _ = self.execute(stub_influxable, lambda q: q.exists(), [])
+        assert result is False
+
+    def test_count_fast_success(self, stub_influxable):
+        serie = {
+            'name': 'cpu',
+            'columns': ['time', 'count_value', 'count_other'],
+            'values': [[0, 42, 40]],
+        }
+        result, queries = self.execute(
+            stub_influxable,
+            lambda query: query.count_fast(),
+            [serie],
+        )
+        assert result == 42
+        assert queries == ['SELECT COUNT(*) FROM "cpu" WHERE "value" > 0']
+        result, queries = self.execute(
+            stub_influxable,
+            lambda query: query.count_fast('value'),
+            [],
+        )
+        assert result == 0
+        assert queries == [
+            'SELECT COUNT("value") FROM "cpu" WHERE "value" > 0',
+        ]
+
+    def test_count_fast_several_measurements_success(self, stub_influxable):
+        series = [
+            {'name': name, 'columns': ['time', 'count'], 'values': [[0, n]]}
+            for name, n in [('cpu', 10), ('mem', 7)]
+        ]
+        result, _ = self.execute(
+            stub_influxable,
+            lambda query: query.count_fast(),
+            series,
+        )
+        assert result == 17
+
+    def test_latest_success(self, stub_influxable):
+        serie = {'name': 'cpu', 'columns': ['time', 'value'], 'values': [
+            [30, 3.0],
+        ]}
+        result, queries = self.execute(
+            stub_influxable,
+            lambda query: query.latest(),
+            [serie],
+        )
+        assert result == {'time': 30, 'value': 3.0}
+        assert queries == [
+            'SELECT * FROM "cpu" WHERE "value" > 0 '
+            'ORDER BY time DESC LIMIT 1',
+        ]
+        result, _ = self.execute(stub_influxable, lambda q: q.latest(), [])
+        assert result is None
+
+    def test_earliest_group_by_tags_success(self, stub_influxable):
+        series = [
+            {
+                'name': 'cpu',
+                'tags': {'host': 'server0{}'.format(i)},
+                'columns': ['time', 'value'],
+                'values': [[i, float(i)]],
+            }
+            for i in range(1, 3)
+        ]
+        result, queries = self.execute(
+            stub_influxable,
+            lambda query: query.earliest(group_by_tags=['host']),
+            series,
+        )
+        assert result == {
+            ('server01',): {'time': 1, 'value': 1.0},
+            ('server02',): {'time': 2, 'value': 2.0},
+        }
+        assert queries == [
+            'SELECT * FROM "cpu" WHERE "value" > 0 GROUP BY host '
+            'ORDER BY time ASC LIMIT 1',
+        ]
+
+    def test_latest_invalid_tags_fail(self):
+        with pytest.raises(exceptions.InfluxDBInvalidTypeError):
+            Query().from_measurements('cpu').latest(group_by_tags=[1])
+
+    def test_latest_several_measurements_fail(self, stub_influxable):
+        series = [
+            {'name': name, 'columns': ['time', 'value'], 'values': [[1, 1.0]]}
+            for name in ['cpu', 'mem']
+        ]
+        with pytest.raises(exceptions.InfluxDBInvalidChoiceError):
+            self.execute(stub_influxable, lambda q: q.latest(), series)
+
+
+class TestDBImmutableQuery:
+    def test_builder_returns_new_query_success(self):
+        base_query = Query().from_measurements('cpu').immutable()
+        query = base_query.where(Field('value') > 0)
+        assert query is not base_query
+        assert query.is_immutable
+        assert base_query._get_prepared_query() == 'SELECT * FROM "cpu"'
+        assert query._get_prepared_query() == \
+            'SELECT * FROM "cpu" WHERE "value" > 0'
+        assert query.selected_measurements is base_query.selected_measurements
+
+    def test_compiled_query_is_memoized_success(self):
+        query = Query()\
+            .from_measurements('cpu')\
+            .where(Field('value') > 0)\
+            .immutable()
+        prepared_query = query._get_prepared_query()
+        assert query._get_prepared_query() is prepared_query
+        assert query.cache_key == query.cache_key
+        assert len(query.cache_key) == 40
+
+    def test_cache_key_is_stable_success(self):
+        base_query = Query().from_measurements('cpu').immutable()
+        query = base_query.where(Field('value') > 0)
+        other_query = base_query.where(Field('value') > 0)
+        assert query.cache_key == other_query.cache_key
+        assert query.cache_key != base_query.cache_key
+
+    def test_mutable_query_is_not_copied_success(self):
+        query = Query()
+        assert query.from_measurements('cpu') is query
+        assert not query.is_immutable
+        assert query._get_prepared_query() == 'SELECT * FROM "cpu"'
+        query.where(Field('value') > 0)
+        assert query._get_prepared_query() == \
+            'SELECT * FROM "cpu" WHERE "value" > 0'
+
+    def test_execute_immutable_query_again_success(self, stub_influxable):
+        server = stub_influxable()
+        query = Query().from_measurements('cpu').immutable()
+        query.execute()
+        query.execute()
+        queries = [params['q'] for params in server.get_params('/query')]
+        assert queries == ['SELECT * FROM "cpu"'] * 2
+
+    def test_immutable_builder_fail(self):
+        base_query = Query().from_measurements('cpu').immutable()
+        with pytest.raises(exceptions.InfluxDBInvalidTypeError):
+            base_query.limit('10')
+        assert base_query._get_prepared_query() == 'SELECT * FROM "cpu"'
+
+
+class TestDBBindParamsQuery:
+    def execute(self, stub_influxable, func):
+        server = stub_influxable()
+        func()
+        return [
+            (params['q'], json.loads(params.get('params', '{}')))
+            for params in server.get_params('/query')
+        ]
+
+    def test_param_criteria_success(self):
+        query = Query()\
+            .from_measurements('cpu')\
+            .where(
+                Field('host') == Param('host'),
+                Field('value') > Param('min_value'),
+            )
+        prepared_query = query._get_prepared_query()
+        assert prepared_query == \
+            'SELECT * FROM "cpu" WHERE "host" = $host AND "value" > $min_value'
+
+    def test_bind_success(self, stub_influxable):
+        template = Query()\
+            .from_measurements('cpu')\
+            .where(Field('host') == Param('host'))\
+            .immutable()
+        prepared_query = template._get_prepared_query()
+
+        def execute():
+            for host in ['server01', 'server02']:
+                query = template.bind(host=host)
+                assert query._get_prepared_query() is prepared_query
+                query.execute()
+        requests = self.execute(stub_influxable, execute)
+        str_query = 'SELECT * FROM "cpu" WHERE "host" = $host'
+        assert requests == [
+            (str_query, {'host': 'server01'}),
+            (str_query, {'host': 'server02'}),
+        ]
+        assert template.bind_params == {}
+
+    def test_bind_mutable_query_success(self, stub_influxable):
+        query = Query()\
+            .from_measurements('cpu')\
+            .where(Field('host') == Param('host'))
+
+        def execute():
+            assert query.bind(host='server01') is query
+            query.execute()
+            query.bind(host='server02').execute()
+        requests = self.execute(stub_influxable, execute)
+        str_query = 'SELECT * FROM "cpu" WHERE "host" = $host'
+        assert requests == [
+            (str_query, {'host': 'server01'}),
+            (str_query, {'host': 'server02'}),
+        ]
+
+    def test_bind_cache_key_success(self):
+        template = Query()\
+            .from_measurements('cpu')\
+            .where(Field('host') == Param('host'))\
+            .immutable()
+        query = template.bind(host='server01')
+        assert query.cache_key == template.bind(host='server01').cache_key
+        assert query.cache_key != template.bind(host='server02').cache_key
+        assert query.cache_key != template.cache_key
+
+    def test_bind_shortcut_query_success(self, stub_influxable):
+        query = Query()\
+            .from_measurements('cpu')\
+            .where(Field('host') == Param('host'))\
+            .bind(host='server01')
+        requests = self.execute(stub_influxable, query.exists)
+        assert requests == [(
+            'SELECT * FROM "cpu" WHERE "host" = $host LIMIT 1',
+            {'host': 'server01'},
+        )]
+
+    def test_bind_fail(self):
+        with pytest.raises(exceptions.InfluxDBInvalidTypeError):
+            Query().bind()
+        with pytest.raises(exceptions.InfluxDBInvalidTypeError):
+            Query().bind(host=None)
@@ -1,6 +1,12 @@
+import json
 import pytest
 import requests
 from influxable import Influxable, InfluxDBApi, exceptions
+from influxable.batching import AdaptiveBatchController
+from influxable.payload import split_points
+from influxable.request import InfluxDBRequest
+from influxable.response import InfluxDBResponse, merge_chunked_responses
+from .stub_server import StubInfluxDBServer
 
 
 class TestInfluxApi:
@@ -123,3 +129,299 @@ class TestInfluxApi:
                 instance.connection.request,
                 points,
             )
+
+
+class TestInfluxApiPayloadSplitting:
+    def test_split_points_success(self):
+        points = b'm value=1\nm value=2\nm value=3\n'
+        bodies = list(split_points(points, 21))
+        assert bodies == [b'm value=1\nm value=2\n', b'm value=3\n']
+
+    def test_split_points_long_line_success(self):
+        points = b'm value=123456789\nm value=1\n'
+        bodies = list(split_points(points, 5))
+        assert bodies == [b'm value=123456789\n', b'm value=1\n']
+
+    def test_write_points_split_success(self):
+        points = '\n'.join('m value={}'.format(i) for i in range(10))
+        with StubInfluxDBServer() as server:
+            request = InfluxDBRequest(server.url, 'default')
+            res = InfluxDBApi.write_points(request, points, max_body_size=25)
+            assert res is True
+            bodies = [r[3] for r in server.requests if r[1] == '/write']
+            assert len(bodies) == 5
+            assert all(len(body) <= 25 for body in bodies)
+            assert b''.join(bodies) == points.encode('utf-8')
+
+    def test_write_points_bytes_like_success(self):
+        points = b''.join(
+            'm value={}\n'.format(i).encode('utf-8') for i in range(10)
+        )
+        with StubInfluxDBServer() as server:
+            request = InfluxDBRequest(server.url, 'default')
+            for value in [points, bytearray(points), memoryview(points)]:
+                InfluxDBApi.write_points(request, value, max_body_size=25)
+            bodies = [r[3] for r in server.requests if r[1] == '/write']
+            assert len(bodies) == 15
+            assert b''.join(bodies) == points * 3
+
+    def test_write_points_chunks_success(self):
+        points = b''.join(
+            'm value={}\n'.format(i).encode('utf-8') for i in range(10)
+        )
+        chunks = (points[i:i + 7] for i in range(0, len(points), 7))
+        with StubInfluxDBServer() as server:
+            request = InfluxDBRequest(server.url, 'default')
+            InfluxDBApi.write_points(request, chunks, max_body_size=25)
+            bodies = [r[3] for r in server.requests if r[1] == '/write']
+            assert len(bodies) == 5
+            assert all(body.endswith(b'\n') for body in bodies)
+            assert b''.join(bodies) == points
+
+    def test_response_is_partial_success(self):
+        response = InfluxDBResponse({'results': [{
+            'statement_id': 0,
+            'series': [{'name': 'm', 'columns': [], 'partial': True}],
+        }]})
+        assert response.is_partial
+        assert not InfluxDBResponse({'results': [{}]}).is_partial
+
+    def test_merge_chunked_responses_success(self):
+        chunks = [
+            {'results': [{'statement_id': 0, 'series': [{
+                'name': 'm',
+                'columns': ['time', 'value'],
+                'values': [[1, 1], [2, 2]],
+                'partial': True,
+            }], 'partial': True}]},
+            {'results': [{'statement_id': 0, 'series': [{
+                'name': 'm',
+                'columns': ['time', 'value'],
+                'values': [[3, 3]],
+            }]}]},
+        ]
+        merged = merge_chunked_responses(chunks)
+        response = InfluxDBResponse(merged)
+        assert not response.is_partial
+        assert response.main_serie.values == [[1, 1], [2, 2], [3, 3]]
+
+    def test_execute_query_chunked_success(self):
+        def responder(method, path, params, body):
+            chunks = [
+                {'results': [{'statement_id': 0, 'series': [{
+                    'name': 'm',
+                    'columns': ['time', 'value'],
+                    'values': [[i, i]],
+                    'partial': i < 2,
+                }]}]}
+                for i in range(3)
+            ]
+            lines = '\n'.join(json.dumps(chunk) for chunk in chunks)
+            return 200, {}, lines.encode('utf-8')
+
+        with StubInfluxDBServer(responder=responder) as server:
+            request = InfluxDBRequest(server.url, 'default')
+            res = InfluxDBApi.execute_query(
+                request,
+                'SELECT * FROM "m"',
+                chunked=True,
+                chunk_size=1,
+            )
+            values = InfluxDBResponse(res).main_serie.values
+            assert values == [[0, 0], [1, 1], [2, 2]]
+            assert server.requests[0][2]['chunk_size'] == '1'
+
+    def test_execute_query_bind_params_success(self):
+        with StubInfluxDBServer() as server:
+            request = InfluxDBRequest(server.url, 'default')
+            InfluxDBApi.execute_query(
+                request,
+                'SELECT * FROM "m" WHERE "host" = $host',
+                bind_params={'host': 'server01'},
+            )
+            params = server.requests[0][2]
+            assert json.loads(params['params']) == {'host': 'server01'}
+
+
+class TestInfluxApiAdaptiveBatching:
+    def create_controller(self, **kwargs):
+        return AdaptiveBatchController(
+            initial_batch_size=40,
+            min_batch_size=20,
+            max_batch_size=1000,
+            batch_size_step=20,
+            **kwargs
+        )
+
+    def get_points(self, nb_points):
+        lines = ['m,tag={} value={}i'.format(i, i) for i in range(nb_points)]
+        return ''.join(line + '\n' for line in lines)
+
+    def test_write_adaptive_batches_success(self):
+        points = self.get_points(100)
+        controller = self.create_controller(max_concurrency=3)
+        with StubInfluxDBServer() as server:
+            request = InfluxDBRequest(server.url, 'default')
+            res = InfluxDBApi.write_points(
+                request,
+                points,
+                batch_controller=controller,
+            )
+            assert res is True
+            bodies = [r[3] for r in server.requests if r[1] == '/write']
+        assert len(bodies) > 1
+        assert len(bodies[1]) > len(bodies[0])
+        assert sorted(b''.join(bodies).splitlines()) == \
+            sorted(points.encode('utf-8').splitlines())
+        assert controller.metrics['batches'] == len(bodies)
+        assert controller.metrics['concurrency'] > 1
+
+    def test_write_adaptive_batches_shrink_success(self):
+        points = self.get_points(20)
+        controller = self.create_controller(target_latency=0.01)
+        with StubInfluxDBServer(delay=0.05) as server:
+            request = InfluxDBRequest(server.url, 'default')
+            InfluxDBApi.write_points(
+                request,
+                points,
+                batch_controller=controller,
+            )
+        assert controller.batch_size == 20
+
+    def test_write_adaptive_batches_fail(self):
+        def responder(method, path, params, body):
+            return 500, {}, {'error': 'timeout'}
+
+        controller = self.create_controller()
+        with StubInfluxDBServer(responder=responder) as server:
+            request = InfluxDBRequest(server.url, 'default')
+            with pytest.raises(requests.exceptions.HTTPError):
+                InfluxDBApi.write_points(
+                    request,
+                    self.get_points(10),
+                    batch_controller=controller,
+                )
+        assert controller.metrics['errors'] == 1
+
+
+class TestInfluxApiDeadLetter:
+    def create_parsing_responder(self, stored_lines, with_line_in_error=True):
+        # Like InfluxDB 1.x, the parseable lines are stored even when
+        # others are rejected, and the error is then a partial write
+        def responder(method, path, params, body):
+            if path != '/write':
+                return None
+            lines = body.split(b'\n')
+            bad_lines = [line for line in lines if b'invalid' in line]
+            if not with_line_in_error and bad_lines:
+                return 400, {}, {'error': 'invalid field format'}
+            good_lines = [line for line in lines if line not in bad_lines]
+            stored_lines.extend(good_lines)
+            if not bad_lines:
+                return None
+            error = '\n'.join(
+                'unable to parse \'{}\': invalid number'.format(
+                    line.decode('utf-8'),
+                )
+                for line in bad_lines
+            )
+            if good_lines:
+                error = 'partial write: ' + error
+            return 400, {}, {'error': error}
+        return responder
+
+    def write_points(self, responder, points, dead_letter):
+        with StubInfluxDBServer(responder=responder) as server:
+            request = InfluxDBRequest(server.url, 'default')
+            res = InfluxDBApi.write_points(
+                request,
+                points,
+                dead_letter=dead_letter,
+            )
+            assert res is True
+            return server.requests
+
+    def test_write_points_without_dead_letter_fail(self):
+        responder = self.create_parsing_responder([])
+        with StubInfluxDBServer(responder=responder) as server:
+            request = InfluxDBRequest(server.url, 'default')
+            with pytest.raises(exceptions.InfluxDBInvalidNumberError):
+                InfluxDBApi.write_points(request, 'm value=invalid')
+
+    def test_write_points_partial_write_success(self):
+        rejected = []
+        stored_lines = []
+        points = '\n'.join(['m value=1', 'm value=invalid', 'm value=3'])
+        requests = self.write_points(
+            self.create_parsing_responder(stored_lines),
+            points,
+            lambda lines, error: rejected.extend(lines),
+        )
+        assert rejected == [b'm value=invalid']
+        assert stored_lines == [b'm value=1', b'm value=3']
+        assert len(requests) == 1
+
+    def test_write_points_unidentified_partial_write_success(self, tmp_path):
+        path = tmp_path / 'rejected.lp'
+        stored_lines = []
+
+        def responder(method, path, params, body):
+            if path != '/write':
+                return None
+            stored_lines.extend(body.split(b'\n')[:-1])
+            error = 'partial write: field type conflict: input field ' \
+                '"value" on measurement "m" is type integer, already ' \
+                'exists as type float dropped=1'
+            return 400, {}, {'error': error}
+
+        points = '\n'.join(['m value=1', 'm value=2', 'm value=3i'])
+        requests = self.write_points(responder, points, str(path))
+        assert len(requests) == 1
+        assert stored_lines == [b'm value=1', b'm value=2']
+        assert path.read_bytes() == (
+            b'# unidentified rejected lines : partial write: field type '
+            b'conflict: input field "value" on measurement "m" is type '
+            b'integer, already exists as type float dropped=1\n'
+        )
+
+    def test_write_points_rejected_line_with_quote_success(self):
+        rejected = []
+        stored_lines = []
+        line = 'm text="it\': s",value=invalid'
+        points = '\n'.join(['m value=1', line])
+        self.write_points(
+            self.create_parsing_responder(stored_lines),
+            points,
+            lambda lines, error: rejected.extend(lines),
+        )
+        assert rejected == [line.encode('utf-8')]
+        assert stored_lines == [b'm value=1']
+
+    def test_write_points_bisection_success(self):
+        rejected = []
+        stored_lines = []
+        lines = ['m value={}'.format(i) for i in range(8)]
+        lines[2] = 'm value=invalid2'
+        lines[7] = 'm value=invalid7'
+        self.write_points(
+            self.create_parsing_responder(
+                stored_lines,
+                with_line_in_error=False,
+            ),
+            '\n'.join(lines),
+            lambda lines, error: rejected.extend(lines),
+        )
+        assert rejected == [b'm value=invalid2', b'm value=invalid7']
+        assert sorted(stored_lines) == sorted(
+            line.encode('utf-8') for line in lines if 'invalid' not in line
+        )
+
+    def test_write_points_dead_letter_file_success(self, tmp_path):
+        path = tmp_path / 'rejected.lp'
+        points = '\n'.join(['m value=1', 'm value=invalid'])
+        self.write_points(
+            self.create_parsing_responder([]),
+            points,
+            str(path),
+        )
+        assert path.read_bytes() == b'm value=invalid\n'
@@ -0,0 +1,122 @@
+import gzip
+import json
+import pytest
+import requests
+from influxable.loader import LoadCheckpoint, load_file
+from influxable.request import InfluxDBRequest
+from .stub_server import StubInfluxDBServer
+
+
+class TestLoader:
+    def get_points(self, nb_points):
+        return b''.join(
+            'm,tag={} value={}i {}\n'.format(i, i, i).encode('utf-8')
+            for i in range(nb_points)
+        )
+
+    def get_written_points(self, server):
+        bodies = [r[3] for r in server.requests if r[1] == '/write']
+        return sorted(b''.join(bodies).splitlines())
+
+    def test_load_file_success(self, tmp_path):
+        points = self.get_points(100)
+        file_path = tmp_path / 'points.lp'
+        file_path.write_bytes(points)
+        with StubInfluxDBServer() as server:
+            request = InfluxDBRequest(server.url, 'default')
+            stats = load_file(request, str(file_path), max_body_size=200)
+            assert self.get_written_points(server) == \
+                sorted(points.splitlines())
+            bodies = [r[3] for r in server.requests if r[1] == '/write']
+            assert all(len(body) <= 200 for body in bodies)
+            assert server.requests[0][2]['precision'] == 'ns'
+        assert stats == {
+            'resumed_from': 0,
+            'batches': len(bodies),
+            'bytes': len(points),
+        }
+        assert not (tmp_path / 'points.lp.checkpoint').exists()
+
+    def test_load_gzip_file_success(self, tmp_path):
+        points = self.get_points(100)
+        file_path = tmp_path / 'points.lp.gz'
+        file_path.write_bytes(gzip.compress(points))
+        with StubInfluxDBServer() as server:
+            request = InfluxDBRequest(server.url, 'default')
+            load_file(request, str(file_path), max_body_size=200)
+            assert self.get_written_points(server) == \
+                sorted(points.splitlines())
+
+    def test_load_empty_file_success(self, tmp_path):
+        file_path = tmp_path / 'points.lp'
+        file_path.write_bytes(b'')
+        with StubInfluxDBServer() as server:
+            request = InfluxDBRequest(server.url, 'default')
+            stats = load_file(request, str(file_path))
+            assert server.count('/write') == 0
+        assert stats['batches'] == 0
+
+    @pytest.mark.parametrize('compress', [False, True])
+    def test_load_file_resume_success(self, tmp_path, compress):
+        points = self.get_points(100)
+        file_path = tmp_path / 'points.lp'
+        file_path.write_bytes(gzip.compress(points) if compress else points)
+        checkpoint_path = tmp_path / 'load.checkpoint'
+
+        def responder(method, path, params, body):
+            if path == '/write' and b'm,tag=50 ' in body:
+                return 503, {}, {'error': 'overloaded'}
+            return None
+
+        with StubInfluxDBServer(responder=responder) as server:
+            request = InfluxDBRequest(server.url, 'default')
+            with pytest.raises(requests.exceptions.HTTPError):
+                load_file(
+                    request,
+                    str(file_path),
+                    max_body_size=200,
+                    concurrency=1,
+                    checkpoint_path=str(checkpoint_path),
+                )
+        checkpoint = json.loads(checkpoint_path.read_text())
+        assert 0 < checkpoint['offset'] < len(points)
+        assert points[checkpoint['offset'] - 1:checkpoint['offset']] == b'\n'
+
+        with StubInfluxDBServer() as server:
+            request = InfluxDBRequest(server.url, 'default')
+            stats = load_file(
+                request,
+                str(file_path),
+                max_body_size=200,
+                checkpoint_path=str(checkpoint_path),
+            )
+            written_points = self.get_written_points(server)
+        assert stats['resumed_from'] == checkpoint['offset']
+        assert written_points == sorted(
+            points[checkpoint['offset']:].splitlines()
+        )
+        assert not checkpoint_path.exists()
+
+    def test_checkpoint_out_of_order_success(self, tmp_path):
+        file_path = tmp_path / 'points.lp'
+        file_path.write_bytes(self.get_points(10))
+        checkpoint = LoadCheckpoint(str(tmp_path / 'c'), str(file_path))
+        checkpoint.mark_done(10, 20)
+        assert checkpoint.offset == 0
+        checkpoint.mark_done(0, 10)
+        assert checkpoint.offset == 20
+        assert LoadCheckpoint(
+            str(tmp_path / 'c'),
+            str(file_path),
+        ).load() == 20
+
+    def test_checkpoint_of_other_file_fail(self, tmp_path):
+        file_path = tmp_path / 'points.lp'
+        file_path.write_bytes(self.get_points(10))
+        checkpoint = LoadCheckpoint(str(tmp_path / 'c'), str(file_path))
+        checkpoint.mark_done(0, 10)
+        file_path.write_bytes(self.get_points(20))
+        assert LoadCheckpoint(
+            str(tmp_path / 'c'),
+            str(file_path),
+        ).load() == 0
@@ -1,8 +1,10 @@
 import pytest
+import pandas as pd
 from decimal import Decimal as D
 from influxable import attributes, exceptions
 from influxable.db import Query
 from influxable.measurement import Measurement, MeasurementMeta
+from influxable.response import InfluxDBResponse
 from influxable.serializers import MeasurementPointSerializer
 
 
@@ -48,6 +50,63 @@ class TestMeasurement:
         query = measurement_cls.get_query()
         assert isinstance(query, Query)
 
+    def test_get_query_projection_success(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            phase = attributes.TagFieldAttribute()
+            value = attributes.IntegerFieldAttribute()
+            state = attributes.StringFieldAttribute()
+        query = MySampleMeasurement.get_query()
+        assert query._get_prepared_query() == \
+            'SELECT "phase","value","state" FROM "mysamplemeasurement"'
+        query = MySampleMeasurement.get_query().only('time', 'value')
+        assert query._get_prepared_query() == \
+            'SELECT "value" FROM "mysamplemeasurement"'
+        query = MySampleMeasurement.get_query().defer('state')
+        assert query._get_prepared_query() == \
+            'SELECT "phase","value" FROM "mysamplemeasurement"'
+        assert query._get_count_field() == 'value'
+        query = MySampleMeasurement.get_query().only('phase', 'state')
+        assert query._get_count_field() == 'state'
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            MySampleMeasurement.get_query().only('phase')
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            MySampleMeasurement.get_query().defer('value', 'state')
+        query = MySampleMeasurement.get_query().defer('state').select('value')
+        assert query._get_prepared_query() == \
+            'SELECT value FROM "mysamplemeasurement"'
+
+    def test_get_query_immutable_projection_success(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            phase = attributes.TagFieldAttribute()
+            value = attributes.IntegerFieldAttribute()
+        base_query = MySampleMeasurement.get_query().immutable()
+        query = base_query.only('value')
+        assert query is not base_query
+        assert query.projected_attribute_names == ['value']
+        assert base_query.projected_attribute_names == ['phase', 'value']
+
+    def test_get_query_projection_without_fields_success(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+        query = MySampleMeasurement.get_query()
+        assert query._get_prepared_query() == \
+            'SELECT * FROM "mysamplemeasurement"'
+        assert query._get_count_field() == '*'
+
+    def test_get_query_projection_fail(self):
+        measurement_cls = self.create_measurement_class()
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            measurement_cls.get_query().only('unknown')
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            measurement_cls.get_query().only('time')
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            measurement_cls.get_query().defer('value')
+
     def test_meta_get_attributes_success(self):
         measurement_cls = self.create_measurement_class()
         attrs = measurement_cls._get_attributes()
@@ -60,6 +119,28 @@ class TestMeasurement:
         for attr in timestamp_attrs:
             assert isinstance(attr, attributes.TimestampFieldAttribute)
 
+    def test_meta_schema_success(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            phase = attributes.TagFieldAttribute()
+            value = attributes.IntegerFieldAttribute(is_nullable=False)
+            state = attributes.StringFieldAttribute(default='ok')
+        schema = MySampleMeasurement._schema
+        assert schema.attribute_names == ('time', 'phase', 'value', 'state')
+        assert [attr.attribute_name for attr in schema.tags] == ['phase']
+        assert [attr.attribute_name for attr in schema.fields] == [
+            'value',
+            'state',
+        ]
+        assert schema.timestamp_names == ('time',)
+        assert schema.required_attribute_names == ('value',)
+        assert schema.ext_attribute_names['phase'] == '__attribute__phase'
+        with pytest.raises(AttributeError):
+            schema.tags = ()
+        with pytest.raises(TypeError):
+            schema.ext_attribute_names['other'] = '__attribute__other'
+
     def test_measurement_name_success(self):
         measurement_cls = self.create_measurement_class()
         instance = measurement_cls()
@@ -167,6 +248,216 @@ class TestMeasurement:
         res = measurement_cls.bulk_save(measurements)
         assert res is True
 
+    def test_trusted_instance_success(self):
+        measurement_cls = self.create_measurement_class()
+        instance = measurement_cls(trusted=True, time=1570481055, value=10)
+        validated_instance = measurement_cls(time=1570481055, value=10)
+        assert instance.get_prep_value() == validated_instance.get_prep_value()
+        assert instance.dict() == validated_instance.dict()
+
+    def test_trusted_instance_skips_validation_success(self):
+        measurement_cls = self.create_measurement_class_with_required()
+        instance = measurement_cls(trusted=True, value='S')
+        assert instance.value == 'S'
+
+    def test_trusted_encode_points_success(self):
+        measurement_cls = self.create_measurement_class()
+        lines = measurement_cls.encode_points(
+            [{'time': 1570481055, 'value': 10}],
+            trusted=True,
+        )
+        assert lines == ['mysamplemeasurement value=10i 1570481055000000000']
+
+    def test_encode_points_to_buffer_success(self):
+        measurement_cls = self.create_measurement_class()
+        points = [{'time': 1570481055, 'value': 10}]
+        buffer = measurement_cls.encode_points_to_buffer(points)
+        assert buffer == bytearray(
+            b'mysamplemeasurement value=10i 1570481055000000000\n'
+        )
+        measurement_cls.encode_points_to_buffer(points, buffer)
+        assert buffer.count(b'\n') == 2
+
+    def test_from_line_protocol_success(self):
+        measurement_cls = self.create_measurement_class()
+        point = measurement_cls(time=1570481055, value=10)
+        lines = '\n'.join([point.get_prep_value(), 'other value=1i 1'])
+        points = measurement_cls.from_line_protocol(lines)
+        assert len(points) == 1
+        assert points[0].get_prep_value() == point.get_prep_value()
+        points = measurement_cls.from_line_protocol(
+            'mysamplemeasurement value=10i 1570481055',
+            precision='s',
+        )
+        assert points[0].get_prep_value() == point.get_prep_value()
+
+    def test_from_line_protocol_string_round_trip_success(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            state = attributes.StringFieldAttribute()
+        point = MySampleMeasurement(time=1570481055, state='say "hi" \\o/')
+        assert point.get_prep_value() == \
+            'mysamplemeasurement state="say \\"hi\\" \\\\o/" ' \
+            '1570481055000000000'
+        points = MySampleMeasurement.from_line_protocol(
+            point.get_prep_value(),
+        )
+        assert points[0].state == 'say "hi" \\o/'
+        assert points[0].get_prep_value() == point.get_prep_value()
+
+    def test_from_db_success(self):
+        measurement_cls = self.create_measurement_class()
+        points = measurement_cls._from_db(
+            ['time', 'value', 'other'],
+            [[1570481055000000000, 10, 'a'], [1570481065000000000, None, 'b']],
+        )
+        assert [p.dict() for p in points] == [
+            {'time': D('1570481055'), 'value': 10},
+            {'time': D('1570481065'), 'value': None},
+        ]
+        assert points[1].other == 'b'
+        assert points[0].get_prep_value() == \
+            'mysamplemeasurement value=10i 1570481055000000000'
+        assert measurement_cls._from_db(['time', 'value'], []) == []
+
+    def test_serializer_from_db_success(self):
+        measurement_cls = self.create_measurement_class()
+        response = InfluxDBResponse({'results': [{
+            'statement_id': 0,
+            'series': [{
+                'name': 'mysamplemeasurement',
+                'columns': ['time', 'value'],
+                'values': [[1570481055000000000, 10]],
+            }],
+        }]})
+        serializer = MeasurementPointSerializer(response, measurement_cls)
+        points = serializer.convert()
+        assert len(points) == 1
+        assert isinstance(points[0], measurement_cls)
+        assert points[0].value == 10
+
+    def test_from_dataframe_success(self):
+        measurement_cls = self.create_measurement_class()
+        df = pd.DataFrame({'time': [1570481055, 1570481065], 'value': [1, 2]})
+        for trusted in [False, True]:
+            points = measurement_cls.from_dataframe(df, trusted=trusted)
+            assert [p.get_prep_value() for p in points] == [
+                'mysamplemeasurement value=1i 1570481055000000000',
+                'mysamplemeasurement value=2i 1570481065000000000',
+            ]
+
+    def test_from_dataframe_trusted_casts_success(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            value = attributes.IntegerFieldAttribute()
+            ratio = attributes.FloatFieldAttribute(max_nb_decimals=2)
+        df = pd.DataFrame({
+            'time': [1570481055, 1570481065],
+            'value': [1, None],
+            'ratio': [1.23456, 2.5],
+        })
+        lines = [
+            [p.get_prep_value() for p in MySampleMeasurement.from_dataframe(
+                df,
+                trusted=trusted,
+            )]
+            for trusted in [False, True]
+        ]
+        assert lines[0] == lines[1]
+        assert lines[1][0] == \
+            'mysamplemeasurement value=1i,ratio=1.23 1570481055000000000'
+
+    def test_from_dataframe_datetime64_success(self):
+        measurement_cls = self.create_measurement_class()
+        df = pd.DataFrame({
+            'time': pd.to_datetime([1570481055500000000], unit='ns'),
+            'value': [1],
+        })
+        for trusted in [False, True]:
+            points = measurement_cls.from_dataframe(df, trusted=trusted)
+            assert points[0].get_prep_value() == \
+                'mysamplemeasurement value=1i 1570481055500000000'
+
+    def create_measurement_class_with_constraints(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            phase = attributes.StringFieldAttribute(
+                choices=['moon', 'sun'],
+                max_length=4,
+            )
+            value = attributes.IntegerFieldAttribute(
+                min_value=0,
+                max_value=100,
+                is_nullable=False,
+            )
+        measurement_cls = MySampleMeasurement
+        return measurement_cls
+
+    def test_validate_batch_success(self):
+        measurement_cls = self.create_measurement_class_with_constraints()
+        df = pd.DataFrame({
+            'time': [1570481055, 1570481065],
+            'phase': ['moon', None],
+            'value': [0, 100],
+        })
+        measurement_cls.validate_batch(df)
+
+    def test_validate_batch_reports_every_row_fail(self):
+        measurement_cls = self.create_measurement_class_with_constraints()
+        df = pd.DataFrame({
+            'time': [1570481055] * 5,
+            'phase': ['moon', 'mars', 'sun', 'moon', 'sun'],
+            'value': [10, 20, -1, None, 101],
+        })
+        with pytest.raises(exceptions.InfluxDBBatchValidationError) as err:
+            measurement_cls.validate_batch(df)
+        assert err.value.row_indexes == [1, 2, 3, 4]
+        messages = {(e['index'], e['message']) for e in err.value.errors}
+        assert (1, 'The value is not refered in choices') in messages
+        assert (3, 'The field cannot be nullable') in messages
+
+    def test_validate_batch_missing_column_fail(self):
+        measurement_cls = self.create_measurement_class_with_constraints()
+        with pytest.raises(exceptions.InfluxDBBatchValidationError) as err:
+            measurement_cls.validate_batch([{'phase': 'moon'}, {}])
+        assert err.value.row_indexes == [0, 1]
+
+    def test_validate_batch_cast_fail(self):
+        measurement_cls = self.create_measurement_class_with_constraints()
+        with pytest.raises(exceptions.InfluxDBBatchValidationError) as err:
+            measurement_cls.validate_batch([{'value': 'S'}, {'value': 5}])
+        assert err.value.row_indexes == [0]
+
+    def test_validate_batch_timestamp_cast_fail(self):
+        measurement_cls = self.create_measurement_class_with_constraints()
+        with pytest.raises(exceptions.InfluxDBBatchValidationError) as err:
+            measurement_cls.encode_points([
+                {'time': 'bad', 'phase': 'moon', 'value': 1},
+                {'time': 1570481055, 'phase': 'moon', 'value': 2},
+                {'time': 'bad2', 'phase': 'moon', 'value': 3},
+            ])
+        assert err.value.row_indexes == [0, 2]
+        assert {e['attribute'] for e in err.value.errors} == {'time'}
+
+    def test_encode_validated_dict_points_success(self):
+        measurement_cls = self.create_measurement_class_with_constraints()
+        lines = measurement_cls.encode_points([
+            {'time': 1570481055, 'phase': 'moon', 'value': '10'},
+        ])
+        assert lines == [
+            'mysamplemeasurement phase="moon",value=10i '
+            '1570481055000000000'
+        ]
+
+    def test_from_dataframe_validation_fail(self):
+        measurement_cls = self.create_measurement_class_with_constraints()
+        df = pd.DataFrame({'time': [1570481055], 'value': [1000]})
+        with pytest.raises(exceptions.InfluxDBBatchValidationError):
+            measurement_cls.from_dataframe(df)
+
     def test_bulk_fail_1(self):
         with pytest.raises(exceptions.InfluxDBAttributeValueError):
             measurement_cls = self.create_measurement_class()
@@ -0,0 +1,113 @@
+import io
+import pytest
+from influxable import exceptions
+from influxable.parser import parse_columns, parse_dataframe, parse_lines
+
+LINE_PROTOCOL = (
+    '# comment\n'
+    'cpu,host=server\\ 1,region=us\\,west value=0.64,count=3i,ok=t '
+    '1434055562000000000\n'
+    '\n'
+    'my\\ meas,tag\\=k=v\\=1 str="hello \\"world\\", bye",n=5u,b=FALSE\n'
+    'cpu,host=a value=1e3 1434055562\n'
+)
+
+
+class TestParser:
+    def test_parse_lines_success(self):
+        points = list(parse_lines(LINE_PROTOCOL))
+        assert len(points) == 3
+        assert points[0].measurement == 'cpu'
+        assert points[0].tags == {'host': 'server 1', 'region': 'us,west'}
+        assert points[0].fields == {'value': 0.64, 'count': 3, 'ok': True}
+        assert points[0].time == 1434055562000000000
+        assert points[1].measurement == 'my meas'
+        assert points[1].tags == {'tag=k': 'v=1'}
+        assert points[1].fields == {
+            'str': 'hello "world", bye',
+            'n': 5,
+            'b': False,
+        }
+        assert points[1].time is None
+        assert points[2].fields == {'value': 1000.0}
+
+    def test_parse_lines_precision_success(self):
+        point = next(parse_lines('cpu value=1 1434055562', precision='s'))
+        assert point.time == 1434055562000000000
+        point = next(parse_lines('cpu value=1 2', precision='h'))
+        assert point.time == 2 * 3600 * 10 ** 9
+
+    def test_parse_lines_sources_success(self):
+        expected_points = list(parse_lines(LINE_PROTOCOL))
+        data = LINE_PROTOCOL.encode('utf-8')
+        chunks = [data[i:i + 3] for i in range(0, len(data), 3)]
+        for source in [
+            data,
+            memoryview(data),
+            io.BytesIO(data),
+            io.StringIO(LINE_PROTOCOL),
+            iter(chunks),
+        ]:
+            assert list(parse_lines(source)) == expected_points
+
+    def test_parse_multibyte_chunks_success(self):
+        data = 'cpu,host=café value=1\n'.encode('utf-8')
+        chunks = [data[i:i + 1] for i in range(len(data))]
+        point = next(parse_lines(chunks))
+        assert point.tags == {'host': 'café'}
+
+    def test_parse_columns_success(self):
+        batches = parse_columns(LINE_PROTOCOL)
+        assert batches['cpu'] == {
+            'time': [1434055562000000000, 1434055562],
+            'host': ['server 1', 'a'],
+            'region': ['us,west', None],
+            'value': [0.64, 1000.0],
+            'count': [3, None],
+            'ok': [True, None],
+        }
+        assert batches['my meas']['time'] == [None]
+
+    @pytest.mark.parametrize('data', [
+        'cpu,host=a host=1',
+        'cpu,host=a value=1\ncpu host=1',
+        'cpu time=1',
+    ])
+    def test_parse_columns_key_collision_fail(self, data):
+        with pytest.raises(exceptions.InfluxDBInvalidLineProtocolError) as e:
+            parse_columns(data)
+        assert e.value.error.startswith('the key ')
+
+    def test_parse_dataframe_success(self):
+        df = parse_dataframe(LINE_PROTOCOL)
+        assert list(df['measurement']) == ['cpu', 'cpu', 'my meas']
+        assert list(df.columns[:2]) == ['measurement', 'time']
+        df = parse_dataframe(LINE_PROTOCOL, measurement='cpu')
+        assert list(df.columns) == [
+            'time', 'host', 'region', 'value', 'count', 'ok',
+        ]
+        assert len(df) == 2
+        assert parse_dataframe('', measurement='cpu').empty
+
+    @pytest.mark.parametrize('line', [
+        'cpu',
+        'cpu value=',
+        'cpu value=abc',
+        'cpu v="unterminated',
+        'cpu value=1 abc',
+        'cpu\\ x value=1 1 2',
+    ])
+    def test_parse_invalid_line_fail(self, line):
+        with pytest.raises(exceptions.InfluxDBInvalidLineProtocolError) as e:
+            list(parse_lines('cpu value=1\n' + line))
+        assert e.value.points == line
+        assert e.value.error.startswith('line 2 : ')
+
+    @pytest.mark.parametrize('data', [
+        b'cpu value=1\ncpu,host=\xff value=2\n',
+        io.BytesIO(b'cpu value=1\ncpu,host=\xff value=2\n'),
+    ])
+    def test_parse_invalid_utf8_fail(self, data):
+        with pytest.raises(exceptions.InfluxDBInvalidLineProtocolError) as e:
+            list(parse_lines(data))
+        assert e.value.error.startswith('invalid UTF-8 : ')
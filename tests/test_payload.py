@@ -0,0 +1,60 @@
+import io
+from influxable.payload import ChunkedBody, iter_bodies, \
+    iter_chunked_bodies, split_points
+
+
+class TestPayload:
+    def get_points(self, nb_points):
+        return b''.join(
+            'm,tag={} value={}i\n'.format(i, i).encode('utf-8')
+            for i in range(nb_points)
+        )
+
+    def test_split_memoryview_success(self):
+        points = b'm value=1\nm value=2\nm value=3\n'
+        bodies = list(split_points(memoryview(points), 21))
+        assert all(isinstance(body, memoryview) for body in bodies)
+        assert bodies == [b'm value=1\nm value=2\n', b'm value=3\n']
+
+    def test_split_bytearray_is_not_copied_success(self):
+        points = bytearray(b'm value=1\nm value=2\n')
+        body = next(split_points(points, 10))
+        points[0:1] = b'n'
+        assert body == b'n value=1\n'
+
+    def test_split_callable_size_success(self):
+        sizes = iter([10, 20])
+        points = b'm value=1\nm value=2\nm value=3\n'
+        bodies = list(split_points(points, lambda: next(sizes)))
+        assert bodies == [b'm value=1\n', b'm value=2\nm value=3\n']
+
+    def test_chunked_bodies_match_split_success(self):
+        points = self.get_points(50)
+        chunks = [points[i:i + 7] for i in range(0, len(points), 7)]
+        for max_body_size in [1, 20, 33, 100, 10000]:
+            bodies = iter_chunked_bodies(chunks, max_body_size)
+            assert [body.tobytes() for body in bodies] == \
+                [bytes(body) for body in split_points(points, max_body_size)]
+
+    def test_chunked_body_is_reiterable_success(self):
+        body = ChunkedBody([memoryview(b'm value=1\n'), b'm value=2\n'])
+        assert b''.join(body) == b''.join(body)
+        assert body.size == 20
+        assert body.tobytes() == b'm value=1\nm value=2\n'
+
+    def test_iter_bodies_success(self):
+        points = self.get_points(3)
+        for value in [
+            points,
+            points.decode('utf-8'),
+            bytearray(points),
+            memoryview(points),
+            io.BytesIO(points),
+        ]:
+            bodies = list(iter_bodies(value))
+            assert len(bodies) == 1
+            assert isinstance(bodies[0], memoryview)
+            assert bodies[0] == points
+        bodies = list(iter_bodies(iter([points[:5], points[5:]])))
+        assert isinstance(bodies[0], ChunkedBody)
+        assert bodies[0].tobytes() == points
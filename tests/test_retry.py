@@ -0,0 +1,170 @@
+import time
+import pytest
+import requests
+from influxable import InfluxDBApi, exceptions
+from influxable.request import InfluxDBRequest, RequestKind, \
+    get_request_kind
+from influxable.retry import CircuitBreaker, CircuitBreakerState, \
+    RetryPolicy
+from .stub_server import StubInfluxDBServer
+
+UNREACHABLE_URL = 'http://127.0.0.1:9'
+
+
+def create_flaky_responder(nb_failures, status=503, headers={}):
+    state = {'nb_calls': 0}
+
+    def responder(method, path, params, body):
+        state['nb_calls'] += 1
+        if state['nb_calls'] <= nb_failures:
+            return status, headers, {'error': 'unavailable'}
+        return None
+    return responder
+
+
+class TestRetryPolicy:
+    def create_request(self, base_url, **retry_policies):
+        return InfluxDBRequest(
+            base_url,
+            'default',
+            retry_policies=retry_policies,
+        )
+
+    def test_get_request_kind_success(self):
+        assert get_request_kind('/write') == RequestKind.WRITE
+        assert get_request_kind('/ping') == RequestKind.QUERY
+        assert get_request_kind(
+            'http://localhost:8086/query',
+            {'q': 'SELECT * FROM "m"'},
+        ) == RequestKind.QUERY
+        assert get_request_kind(
+            '/query',
+            {'q': 'CREATE DATABASE "db"'},
+        ) == RequestKind.ADMIN
+
+    def test_backoff_is_capped_success(self):
+        retry_policy = RetryPolicy(backoff_factor=1, max_backoff=2)
+        for attempt in range(10):
+            assert 0 <= retry_policy.get_backoff(attempt) <= 2
+
+    def test_query_retry_on_unavailable_success(self):
+        responder = create_flaky_responder(2)
+        with StubInfluxDBServer(responder=responder) as server:
+            request = self.create_request(
+                server.url,
+                query=RetryPolicy(max_retries=2, backoff_factor=0.01),
+            )
+            res = InfluxDBApi.execute_query(request, 'SHOW DATABASES')
+            assert 'results' in res
+            assert server.count('/query') == 3
+
+    def test_query_retry_exhausted_fail(self):
+        responder = create_flaky_responder(5)
+        with StubInfluxDBServer(responder=responder) as server:
+            request = self.create_request(
+                server.url,
+                query=RetryPolicy(max_retries=1, backoff_factor=0.01),
+            )
+            with pytest.raises(requests.exceptions.HTTPError):
+                InfluxDBApi.execute_query(request, 'SHOW DATABASES')
+            assert server.count('/query') == 2
+
+    def test_write_retry_honours_retry_after_success(self):
+        responder = create_flaky_responder(1, 429, {'Retry-After': '0.2'})
+        with StubInfluxDBServer(responder=responder) as server:
+            request = self.create_request(
+                server.url,
+                write=RetryPolicy(max_retries=1, backoff_factor=10),
+            )
+            start = time.monotonic()
+            InfluxDBApi.write_points(request, 'm value=1')
+            assert 0.2 <= time.monotonic() - start < 1
+            assert server.count('/write') == 2
+
+    def test_admin_command_is_not_retried_success(self):
+        responder = create_flaky_responder(1)
+        with StubInfluxDBServer(responder=responder) as server:
+            request = self.create_request(
+                server.url,
+                admin=RetryPolicy(max_retries=3, backoff_factor=0.01),
+            )
+            with pytest.raises(requests.exceptions.HTTPError):
+                InfluxDBApi.execute_query(
+                    request,
+                    'DROP DATABASE "db"',
+                    method='post',
+                )
+            assert server.count('/query') == 1
+
+    def test_admin_command_retry_on_connect_error_success(self):
+        retry_policy = RetryPolicy(max_retries=2, backoff_factor=0.01)
+        request = self.create_request(UNREACHABLE_URL, admin=retry_policy)
+        nb_calls = []
+        send = request.send
+
+        def counting_send(*args, **kwargs):
+            nb_calls.append(1)
+            return send(*args, **kwargs)
+        request.send = counting_send
+        with pytest.raises(exceptions.InfluxDBConnectionError):
+            InfluxDBApi.execute_query(
+                request,
+                'DROP DATABASE "db"',
+                method='post',
+            )
+        assert len(nb_calls) == 3
+
+
+class TestCircuitBreaker:
+    def test_open_after_threshold_success(self):
+        circuit_breaker = CircuitBreaker('endpoint', 2, recovery_timeout=60)
+        circuit_breaker.record_failure()
+        assert circuit_breaker.state == CircuitBreakerState.CLOSED
+        circuit_breaker.record_failure()
+        assert circuit_breaker.state == CircuitBreakerState.OPEN
+        with pytest.raises(exceptions.InfluxDBCircuitOpenError):
+            circuit_breaker.before_request()
+
+    def test_half_open_probe_success(self):
+        circuit_breaker = CircuitBreaker('endpoint', 1, recovery_timeout=0)
+        circuit_breaker.record_failure()
+        circuit_breaker.before_request()
+        assert circuit_breaker.state == CircuitBreakerState.HALF_OPEN
+        with pytest.raises(exceptions.InfluxDBCircuitOpenError):
+            circuit_breaker.before_request()
+        circuit_breaker.record_success()
+        assert circuit_breaker.state == CircuitBreakerState.CLOSED
+
+    def test_half_open_probe_failure_success(self):
+        circuit_breaker = CircuitBreaker('endpoint', 3, recovery_timeout=0)
+        for _ in range(3):
+            circuit_breaker.record_failure()
+        circuit_breaker.before_request()
+        circuit_breaker.record_failure()
+        assert circuit_breaker.state == CircuitBreakerState.OPEN
+
+    def test_request_fails_fast_when_open_success(self):
+        request = InfluxDBRequest(
+            UNREACHABLE_URL,
+            'default',
+            retry_policies={
+                RequestKind.QUERY: RetryPolicy(failure_threshold=1),
+            },
+        )
+        with pytest.raises(exceptions.InfluxDBConnectionError):
+            InfluxDBApi.execute_query(request, 'SHOW DATABASES')
+        with pytest.raises(exceptions.InfluxDBCircuitOpenError):
+            InfluxDBApi.execute_query(request, 'SHOW DATABASES')
+
+    def test_half_open_probe_unexpected_error_success(self):
+        circuit_breaker = CircuitBreaker('endpoint', 1, recovery_timeout=0)
+        circuit_breaker.record_failure()
+
+        def send():
+            raise requests.exceptions.ChunkedEncodingError('broken body')
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            RetryPolicy().execute(send, circuit_breaker=circuit_breaker)
+        assert circuit_breaker.state == CircuitBreakerState.OPEN
+        # The probe is released, the next request is let through
+        circuit_breaker.before_request()
+        assert circuit_breaker.state == CircuitBreakerState.HALF_OPEN
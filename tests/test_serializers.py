@@ -1,5 +1,7 @@
 import json
+import pytest
 import pandas as pd
+from decimal import Decimal as D
 from influxable import attributes, serializers
 from influxable.db import RawQuery
 from influxable.measurement import Measurement
@@ -80,3 +82,76 @@ class TestSerializer:
         assert isinstance(points, list)
         for p in points:
             assert isinstance(p, measurement_cls)
+
+
+class TestLazyMeasurementSerializer:
+    def create_measurement_class(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            date = attributes.DateTimeFieldAttribute()
+            value = attributes.FloatFieldAttribute()
+            phase = attributes.TagFieldAttribute()
+        return MySampleMeasurement
+
+    def create_response(self):
+        return InfluxDBResponse({'results': [{
+            'statement_id': 0,
+            'series': [{
+                'name': 'mysamplemeasurement',
+                'columns': ['time', 'date', 'value', 'other'],
+                'values': [
+                    [1570481055000000000, 1570481055000000000, 10, 'a'],
+                    [1570481065000000000, None, 2.5, 'b'],
+                ],
+            }],
+        }]})
+
+    def convert(self):
+        measurement_cls = self.create_measurement_class()
+        serializer = serializers.LazyMeasurementSerializer(
+            self.create_response(),
+            measurement_cls,
+        )
+        return measurement_cls, serializer.convert()
+
+    def test_lazy_rows_success(self):
+        measurement_cls, result = self.convert()
+        assert len(result) == 2
+        row = result[0]
+        assert row is result[0]
+        assert row.time == D('1570481055')
+        assert row.date == '2019-10-07 20:44:15'
+        assert row.value == D('10')
+        assert row.phase is None
+        assert row.other == 'a'
+        assert result[-1].value == D('2.5')
+        assert [r.other for r in result] == ['a', 'b']
+        assert len(result[0:1]) == 1
+
+    def test_lazy_row_cache_success(self):
+        measurement_cls, result = self.convert()
+        row = result[1]
+        assert row._cache is None
+        assert row.value == D('2.5')
+        assert row._cache == {'value': D('2.5')}
+
+    def test_lazy_row_to_measurement_success(self):
+        measurement_cls, result = self.convert()
+        point = result[0].to_measurement()
+        assert isinstance(point, measurement_cls)
+        assert point.dict() == result[0].dict() == {
+            'time': D('1570481055'),
+            'date': '2019-10-07 20:44:15',
+            'value': D('10'),
+            'phase': None,
+        }
+        assert point.other == 'a'
+        assert len(result.to_measurements()) == 2
+
+    def test_lazy_row_unknown_attribute_fail(self):
+        measurement_cls, result = self.convert()
+        with pytest.raises(AttributeError):
+            result[0].unknown
+        with pytest.raises(IndexError):
+            result[2]
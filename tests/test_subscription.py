@@ -0,0 +1,166 @@
+import gzip
+import socket
+import time
+import pytest
+import requests
+from influxable import attributes, exceptions
+from influxable.measurement import Measurement
+from influxable.subscription import SubscriptionReceiver
+
+LINES = (
+    'cpu,host=server01 value=0.64 1434055562\n'
+    'mem,host=server01 free=1024i 1434055562\n'
+    'cpu,host=server02 value=0.12 1434055563\n'
+)
+
+
+class TestSubscriptionReceiver:
+    def create_measurement_class(self):
+        class CPUMeasurement(Measurement):
+            measurement_name = 'cpu'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            host = attributes.TagFieldAttribute()
+            value = attributes.FloatFieldAttribute()
+        return CPUMeasurement
+
+    def create_receiver(self, **kwargs):
+        kwargs.setdefault('http_port', 0)
+        return SubscriptionReceiver(host='127.0.0.1', **kwargs)
+
+    def wait_for(self, condition, timeout=2):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_receive_http_write_success(self):
+        received = []
+        with self.create_receiver() as receiver:
+            receiver.register(received.append)
+            res = requests.post(
+                receiver.url + '/write',
+                params={'db': 'mydb', 'rp': 'autogen', 'precision': 's'},
+                data=LINES,
+            )
+            assert res.status_code == 204
+        assert len(received) == 1
+        points = received[0]
+        assert [p.measurement for p in points] == ['cpu', 'mem', 'cpu']
+        assert points[0].tags == {'host': 'server01'}
+        assert points[1].fields == {'free': 1024}
+        assert points[2].time == 1434055563000000000
+        assert receiver.stats == {
+            'writes': 1,
+            'points': 3,
+            'invalid_writes': 0,
+            'callback_errors': 0,
+        }
+
+    def test_receive_gzip_write_success(self):
+        received = []
+        with self.create_receiver(precision='s') as receiver:
+            receiver.register(received.append, measurement='mem')
+            res = requests.post(
+                receiver.url + '/write',
+                data=gzip.compress(LINES.encode('utf-8')),
+                headers={'Content-Encoding': 'gzip'},
+            )
+            assert res.status_code == 204
+        assert len(received) == 1
+        assert [p.fields for p in received[0]] == [{'free': 1024}]
+
+    def test_dispatch_measurements_success(self):
+        measurement_cls = self.create_measurement_class()
+        received = []
+        receiver = self.create_receiver(precision='s')
+        receiver.register(received.append, measurement=measurement_cls)
+        assert receiver.receive(LINES) == 3
+        points = received[0]
+        assert [type(p) for p in points] == [measurement_cls] * 2
+        assert points[0].host == 'server01'
+        assert points[1].value == 0.12
+        assert points[1].time == 1434055563
+
+    def test_dispatch_columns_success(self):
+        received = []
+        receiver = self.create_receiver(precision='s')
+        receiver.register(received.append, measurement='cpu', columns=True)
+        receiver.receive(LINES)
+        assert received == [{
+            'cpu': {
+                'time': [1434055562000000000, 1434055563000000000],
+                'host': ['server01', 'server02'],
+                'value': [0.64, 0.12],
+            },
+        }]
+
+    def test_unregister_success(self):
+        received = []
+        receiver = self.create_receiver()
+        subscriber = receiver.register(received.append)
+        receiver.unregister(subscriber)
+        receiver.receive(LINES)
+        assert received == []
+
+    def test_receive_udp_datagram_success(self):
+        received = []
+        receiver = self.create_receiver(http_port=None, udp_port=0)
+        with receiver:
+            receiver.register(received.append)
+            host, port = receiver.udp_server.server_address
+            sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sender.sendto(LINES.encode('utf-8'), (host, port))
+            sender.close()
+            assert self.wait_for(lambda: received)
+        assert receiver.url is None
+        assert len(received[0]) == 3
+
+    def test_callback_error_does_not_reject_write_success(self):
+        received = []
+
+        def failing_callback(points):
+            raise ValueError('failing callback')
+
+        with self.create_receiver() as receiver:
+            receiver.register(failing_callback)
+            receiver.register(received.append)
+            res = requests.post(receiver.url + '/write', data=LINES)
+            assert res.status_code == 204
+        assert len(received) == 1
+        assert receiver.stats['callback_errors'] == 1
+
+    def test_ping_success(self):
+        with self.create_receiver() as receiver:
+            assert requests.get(receiver.url + '/ping').status_code == 204
+
+    def test_receive_invalid_line_protocol_fail(self):
+        received = []
+        with self.create_receiver() as receiver:
+            receiver.register(received.append)
+            res = requests.post(
+                receiver.url + '/write',
+                data='cpu value=0.64\ncpu,host\n',
+            )
+            assert res.status_code == 400
+            assert 'line 2' in res.json()['error']
+        assert received == []
+        assert receiver.stats['invalid_writes'] == 1
+
+    def test_receive_invalid_utf8_fail(self):
+        with self.create_receiver() as receiver:
+            res = requests.post(
+                receiver.url + '/write',
+                data=b'cpu,host=\xff value=0.64\n',
+            )
+            assert res.status_code == 400
+            assert 'invalid UTF-8' in res.json()['error']
+        assert receiver.stats['invalid_writes'] == 1
+
+    def test_receive_invalid_precision_fail(self):
+        receiver = self.create_receiver()
+        with pytest.raises(exceptions.InfluxDBInvalidLineProtocolError):
+            receiver.receive(LINES, precision='y')
+
+    def test_receiver_without_port_fail(self):
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            SubscriptionReceiver(http_port=None)
@@ -0,0 +1,93 @@
+import socket
+import pytest
+from influxable import attributes, exceptions
+from influxable.measurement import Measurement
+from influxable.udp import UDPWriter
+
+
+class TestUDPWriter:
+    def create_measurement_class(self):
+        class MySampleMeasurement(Measurement):
+            measurement_name = 'mysamplemeasurement'
+            time = attributes.TimestampFieldAttribute(precision="s")
+            phase = attributes.TagFieldAttribute()
+            value = attributes.IntegerFieldAttribute()
+        return MySampleMeasurement
+
+    def create_receiver(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(('127.0.0.1', 0))
+        receiver.settimeout(1)
+        return receiver
+
+    def receive_all(self, receiver, nb_datagrams):
+        return [receiver.recv(65535) for _ in range(nb_datagrams)]
+
+    def test_write_measurements_success(self):
+        measurement_cls = self.create_measurement_class()
+        points = [
+            measurement_cls(time=1463289075, phase='moon', value=10),
+            measurement_cls(time=1463289076, phase='sun', value=11),
+        ]
+        receiver = self.create_receiver()
+        with UDPWriter(*receiver.getsockname()) as writer:
+            assert writer.write(points) == 1
+            datagram = self.receive_all(receiver, 1)[0]
+            assert datagram == (
+                b'mysamplemeasurement,phase=moon value=10i '
+                b'1463289075000000000\n'
+                b'mysamplemeasurement,phase=sun value=11i '
+                b'1463289076000000000'
+            )
+            assert writer.datagrams_sent == 1
+            assert writer.bytes_sent == len(datagram)
+        receiver.close()
+
+    def test_write_lines_are_not_split_success(self):
+        lines = '\n'.join('m,tag={} value={}'.format(i, i) for i in range(10))
+        receiver = self.create_receiver()
+        with UDPWriter(*receiver.getsockname(), mtu=40) as writer:
+            nb_datagrams = writer.write(lines)
+            datagrams = self.receive_all(receiver, nb_datagrams)
+            for datagram in datagrams:
+                assert len(datagram) <= 40
+            received_lines = b'\n'.join(datagrams).split(b'\n')
+            assert received_lines == [
+                'm,tag={} value={}'.format(i, i).encode('utf-8')
+                for i in range(10)
+            ]
+            assert writer.stats['datagrams_sent'] == nb_datagrams
+        receiver.close()
+
+    def test_write_line_larger_than_mtu_success(self):
+        receiver = self.create_receiver()
+        with UDPWriter(*receiver.getsockname(), mtu=10) as writer:
+            assert writer.write(b'm value=123456789\nm value=1') == 2
+        receiver.close()
+
+    def test_write_buffers_success(self):
+        receiver = self.create_receiver()
+        with UDPWriter(*receiver.getsockname()) as writer:
+            assert writer.write(bytearray(b'm value=1\n')) == 1
+            assert writer.write(memoryview(b'm value=2\n')) == 1
+            assert self.receive_all(receiver, 2) == [
+                b'm value=1',
+                b'm value=2',
+            ]
+        receiver.close()
+
+    def test_host_is_resolved_once_success(self):
+        receiver = self.create_receiver()
+        port = receiver.getsockname()[1]
+        with UDPWriter('localhost', port) as writer:
+            assert writer.address[0] in ('127.0.0.1', '::1')
+        receiver.close()
+
+    def test_bad_mtu_fail(self):
+        with pytest.raises(exceptions.InfluxDBAttributeValueError):
+            UDPWriter(mtu=0)
+
+    def test_write_bad_points_fail(self):
+        with UDPWriter() as writer:
+            with pytest.raises(exceptions.InfluxDBAttributeValueError):
+                writer.write([1, 2])